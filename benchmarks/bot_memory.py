@@ -0,0 +1,113 @@
+"""
+Measure memory per bot when running many bots in one process.
+
+Compares isolated ``MezonClient`` instances (each with its own message
+database, MMN/ZK clients and API client) against bots registered on a
+``MezonHost`` that shares them. No network access is needed: the bots are
+built and their message stores opened, but they never log in.
+
+tracemalloc only sees Python allocations, so the number of threads is
+reported as well: every aiosqlite connection runs on its own thread, and
+SQLite's page cache lives outside the Python heap.
+
+Usage:
+    python benchmarks/bot_memory.py --bots 40
+"""
+
+import argparse
+import asyncio
+import gc
+import tempfile
+import threading
+import tracemalloc
+from pathlib import Path
+
+from mezon import MezonClient, MezonHost
+from mezon.messages.db import MessageDB
+
+
+async def build_isolated(bots: int, workdir: Path) -> list[MezonClient]:
+    clients = []
+    for bot_id in range(1, bots + 1):
+        client = MezonClient(
+            client_id=bot_id,
+            api_key="key",
+            message_db=MessageDB(str(workdir / f"bot-{bot_id}.db")),
+        )
+        client.mmn_client = client.mmn_client or _mmn_client(client)
+        client.zk_client = client.zk_client or _zk_client(client)
+        client.api_client = client._create_api_client("https://api.example.com")
+        await client.message_db._ensure_connection()
+        clients.append(client)
+    return clients
+
+
+async def build_shared(bots: int, workdir: Path) -> MezonHost:
+    host = MezonHost(message_db_path=str(workdir / "host.db"))
+    await host.__aenter__()
+    for bot_id in range(1, bots + 1):
+        client = host.add_bot(bot_id, "key")
+        client.api_client = client._create_api_client("https://api.example.com")
+        await client.message_db._ensure_connection()
+    return host
+
+
+def _mmn_client(client: MezonClient):
+    from mmn import MmnClient, MmnClientConfig
+
+    return MmnClient(
+        MmnClientConfig(base_url=client.mmn_api_url, timeout=client.timeout_ms)
+    )
+
+
+def _zk_client(client: MezonClient):
+    from mmn import ZkClient, ZkClientConfig
+
+    return ZkClient(
+        ZkClientConfig(endpoint=client.zk_api_url, timeout=client.timeout_ms)
+    )
+
+
+async def measure(mode: str, bots: int) -> tuple[int, int]:
+    with tempfile.TemporaryDirectory() as workdir:
+        gc.collect()
+        threads = threading.active_count()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+
+        if mode == "isolated":
+            clients = await build_isolated(bots, Path(workdir))
+        else:
+            host = await build_shared(bots, Path(workdir))
+
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        used = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        threads = threading.active_count() - threads
+
+        if mode == "isolated":
+            for client in clients:
+                await client.message_db.close()
+        else:
+            await host.stop()
+
+    return used, threads
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bots", type=int, default=40)
+    args = parser.parse_args()
+
+    for mode in ("isolated", "shared"):
+        used, threads = await measure(mode, args.bots)
+        print(
+            f"{mode:>8}: {used / 1024:10.1f} KiB total, "
+            f"{used / args.bots / 1024:8.1f} KiB per bot, "
+            f"{threads} threads ({args.bots} bots)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
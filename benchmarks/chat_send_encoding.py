@@ -0,0 +1,138 @@
+"""
+Measure the CPU cost of encoding one chat message envelope.
+
+Compares three ways of producing the bytes of a ``channel_message_send``
+envelope, all from the same already serialized content:
+
+- ``copy``: build a ``ChannelMessageSend``, then ``CopyFrom`` it into an
+  envelope (the path used before messages were built in place)
+- ``in_place``: fill ``envelope.channel_message_send`` directly with
+  ``ChannelMessageBuilder.build(..., message=...)`` (the current path)
+- ``prefix``: concatenate cached bytes of the fixed fields (clan, channel,
+  mode, visibility) with the encoded variable fields, and frame the
+  envelope by hand
+
+The three outputs are checked to decode to the same envelope before timing.
+
+Usage:
+    python benchmarks/chat_send_encoding.py --iterations 50000 --mentions 3
+"""
+
+import argparse
+import json
+import timeit
+
+from mezon.models import ApiMessageMention
+from mezon.protobuf.rtapi import realtime_pb2
+from mezon.socket.message_builder import ChannelMessageBuilder
+
+CLAN_ID = 1840654271217930240
+CHANNEL_ID = 1840654271217930241
+ENVELOPE_CID_TAG = b"\x08"
+ENVELOPE_SEND_TAG = bytes(
+    [
+        realtime_pb2.Envelope.DESCRIPTOR.fields_by_name["channel_message_send"].number
+        << 3
+        | 2
+    ]
+)
+
+
+def varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def encode_copy(cid: int, content: str, mentions: list) -> bytes:
+    message = ChannelMessageBuilder.build(
+        clan_id=CLAN_ID,
+        channel_id=CHANNEL_ID,
+        mode=2,
+        is_public=True,
+        content=content,
+        mentions=mentions,
+    )
+    envelope = realtime_pb2.Envelope(cid=cid)
+    envelope.channel_message_send.CopyFrom(message)
+    return envelope.SerializeToString()
+
+
+def encode_in_place(cid: int, content: str, mentions: list) -> bytes:
+    envelope = realtime_pb2.Envelope(cid=cid)
+    ChannelMessageBuilder.build(
+        clan_id=CLAN_ID,
+        channel_id=CHANNEL_ID,
+        mode=2,
+        is_public=True,
+        content=content,
+        mentions=mentions,
+        message=envelope.channel_message_send,
+    )
+    return envelope.SerializeToString()
+
+
+PREFIX = realtime_pb2.ChannelMessageSend(
+    clan_id=CLAN_ID, channel_id=CHANNEL_ID, mode=2, is_public=True
+).SerializeToString()
+
+
+def encode_prefix(cid: int, content: str, mentions: list) -> bytes:
+    message = realtime_pb2.ChannelMessageSend(content=content)
+    if mentions:
+        ChannelMessageBuilder._add_mentions(message, mentions)
+    payload = PREFIX + message.SerializeToString()
+    return (
+        ENVELOPE_CID_TAG
+        + varint(cid)
+        + ENVELOPE_SEND_TAG
+        + varint(len(payload))
+        + payload
+    )
+
+
+VARIANTS = {
+    "copy": encode_copy,
+    "in_place": encode_in_place,
+    "prefix": encode_prefix,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--mentions", type=int, default=0)
+    parser.add_argument("--text-length", type=int, default=80)
+    args = parser.parse_args()
+
+    content = json.dumps({"t": "x" * args.text_length})
+    mentions = [
+        ApiMessageMention(user_id=CLAN_ID + i, s=0, e=5) for i in range(args.mentions)
+    ]
+
+    reference = realtime_pb2.Envelope.FromString(encode_copy(7, content, mentions))
+    for name, encode in VARIANTS.items():
+        decoded = realtime_pb2.Envelope.FromString(encode(7, content, mentions))
+        assert decoded == reference, f"{name} produced a different envelope"
+
+    baseline = None
+    for name, encode in VARIANTS.items():
+        best = min(
+            timeit.repeat(
+                lambda encode=encode: encode(7, content, mentions),
+                number=args.iterations,
+                repeat=5,
+            )
+        )
+        per_call_us = best / args.iterations * 1e6
+        baseline = baseline or per_call_us
+        print(
+            f"{name:>9}: {per_call_us:6.2f} us/message  ({baseline / per_call_us:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Measure the startup cost of importing the SDK.
+
+Runs ``python -X importtime`` in a fresh interpreter for each statement and
+reports the total import time plus the modules with the highest self time. ``import mezon`` only loads the package itself; the client,
+models and network dependencies are loaded when a public name is first used.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --statement "from mezon import MezonClient" --top 20
+"""
+
+import argparse
+import subprocess
+import sys
+
+DEFAULT_STATEMENTS = (
+    "import mezon",
+    "from mezon import Events",
+    "from mezon import MezonClient",
+)
+
+
+def measure(statement: str) -> list[tuple[str, int, int]]:
+    """
+    Import time of every module loaded by ``statement``.
+
+    Returns:
+        List of (module, self_us, cumulative_us) in import order
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--statement", action="append", help="Statement to time")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    for statement in args.statement or DEFAULT_STATEMENTS:
+        rows = measure(statement)
+        total_us = sum(self_us for _, self_us, _ in rows)
+        print(f"{statement}")
+        print(f"  modules: {len(rows)}  total: {total_us / 1000:.1f} ms")
+        slowest = sorted(rows, key=lambda row: -row[1])[: args.top]
+        for module, self_us, _ in slowest:
+            print(f"    {self_us / 1000:8.1f} ms  {module}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
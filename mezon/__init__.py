@@ -7,70 +7,144 @@ Copyright 2020 The Mezon Authors
 Licensed under the Apache License, Version 2.0
 """
 
-from importlib.metadata import version
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-__version__ = version("mezon-sdk")
+if TYPE_CHECKING:
+    from .api import MezonApi
+    from .client import MezonClient
+    from .constants import (
+        ChannelStreamMode,
+        ChannelType,
+        Events,
+        HandlerExecutor,
+        SSEConnectionState,
+        SSEEvents,
+        StreamOverflow,
+        TypeMessage,
+    )
+    from .host import MezonHost
+    from .managers import (
+        CacheManager,
+        ChannelManager,
+        Collection,
+        CommandContext,
+        CommandRouter,
+        SessionManager,
+        SocketManager,
+    )
+    from .models import (
+        ApiChannelDescList,
+        ApiChannelDescription,
+        ApiClanDesc,
+        ApiClanDescList,
+        ApiMessageAttachment,
+        ApiMessageMention,
+        ApiMessageReaction,
+        ApiMessageRef,
+        ApiSession,
+        ApiVoiceChannelUserList,
+        Channel,
+        ChannelMessageAck,
+        ChannelMessageContent,
+        MessagePayLoad,
+        Presence,
+        SSEConfig,
+        SSEMessage,
+    )
+    from .session import Session
+    from .socket import Socket, WebSocketAdapter, WebSocketAdapterPb
+    from .structures import (
+        ButtonBuilder,
+        Clan,
+        InteractiveBuilder,
+        Message,
+        MessageTemplate,
+        TextChannel,
+        User,
+    )
+    from .utils import disable_logging, enable_logging, get_logger, setup_logger
+
+# Public names are resolved on first access (PEP 562), so ``import mezon``
+# does not pay for the client, models, protobuf and network dependencies
+# until they are used.
+_LAZY_IMPORTS = {
+    # Core
+    "Session": ".session",
+    "MezonApi": ".api",
+    "MezonClient": ".client",
+    "MezonHost": ".host",
+    # Models
+    "ApiSession": ".models",
+    "ApiClanDesc": ".models",
+    "ApiClanDescList": ".models",
+    "ApiChannelDescription": ".models",
+    "ApiChannelDescList": ".models",
+    "ApiMessageAttachment": ".models",
+    "ApiMessageMention": ".models",
+    "ApiMessageReaction": ".models",
+    "ApiMessageRef": ".models",
+    "ApiVoiceChannelUserList": ".models",
+    "ChannelMessageContent": ".models",
+    "MessagePayLoad": ".models",
+    "ChannelMessageAck": ".models",
+    "Presence": ".models",
+    "SSEConfig": ".models",
+    "SSEMessage": ".models",
+    "Channel": ".models",
+    # Constants
+    "Events": ".constants",
+    "ChannelType": ".constants",
+    "ChannelStreamMode": ".constants",
+    "HandlerExecutor": ".constants",
+    "SSEEvents": ".constants",
+    "SSEConnectionState": ".constants",
+    "StreamOverflow": ".constants",
+    "TypeMessage": ".constants",
+    # Socket
+    "WebSocketAdapter": ".socket",
+    "WebSocketAdapterPb": ".socket",
+    "Socket": ".socket",
+    # Managers
+    "ChannelManager": ".managers",
+    "SessionManager": ".managers",
+    "SocketManager": ".managers",
+    "CacheManager": ".managers",
+    "Collection": ".managers",
+    "CommandRouter": ".managers",
+    "CommandContext": ".managers",
+    # Structures
+    "Clan": ".structures",
+    "Message": ".structures",
+    "TextChannel": ".structures",
+    "User": ".structures",
+    "ButtonBuilder": ".structures",
+    "InteractiveBuilder": ".structures",
+    "MessageTemplate": ".structures",
+    # Utils
+    "setup_logger": ".utils",
+    "get_logger": ".utils",
+    "disable_logging": ".utils",
+    "enable_logging": ".utils",
+}
 
-# Core imports
-from .api import MezonApi
 
-# Import client
-from .client import MezonClient
-from .constants import (
-    ChannelStreamMode,
-    ChannelType,
-    Events,
-    SSEConnectionState,
-    SSEEvents,
-    TypeMessage,
-)
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        from importlib.metadata import version
 
-# Managers imports
-from .managers import (
-    CacheManager,
-    ChannelManager,
-    Collection,
-    SessionManager,
-    SocketManager,
-)
-from .models import (
-    ApiChannelDescList,
-    ApiChannelDescription,
-    ApiClanDesc,
-    ApiClanDescList,
-    ApiMessageAttachment,
-    ApiMessageMention,
-    ApiMessageReaction,
-    ApiMessageRef,
-    # API Models
-    ApiSession,
-    ApiVoiceChannelUserList,
-    Channel,
-    ChannelMessageAck,
-    # Client Models
-    ChannelMessageContent,
-    MessagePayLoad,
-    Presence,
-    SSEConfig,
-    SSEMessage,
-)
-from .session import Session
+        value = version("mezon-sdk")
+    elif name in _LAZY_IMPORTS:
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
 
-# Socket imports
-from .socket import Socket, WebSocketAdapter, WebSocketAdapterPb
 
-# Structure imports
-from .structures import (
-    ButtonBuilder,
-    Clan,
-    InteractiveBuilder,
-    Message,
-    TextChannel,
-    User,
-)
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
 
-# Utils imports
-from .utils import disable_logging, enable_logging, get_logger, setup_logger
 
 __all__ = [
     # Version
@@ -79,6 +153,7 @@ __all__ = [
     "Session",
     "MezonApi",
     "MezonClient",
+    "MezonHost",
     # Models
     "ApiSession",
     "ApiClanDesc",
@@ -101,8 +176,10 @@ __all__ = [
     "Events",
     "ChannelType",
     "ChannelStreamMode",
+    "HandlerExecutor",
     "SSEEvents",
     "SSEConnectionState",
+    "StreamOverflow",
     "TypeMessage",
     # Socket
     "WebSocketAdapter",
@@ -113,6 +190,8 @@ __all__ = [
     "SocketManager",
     "CacheManager",
     "Collection",
+    "CommandRouter",
+    "CommandContext",
     # Structures
     "Clan",
     "Message",
@@ -120,6 +199,7 @@ __all__ = [
     "User",
     "ButtonBuilder",
     "InteractiveBuilder",
+    "MessageTemplate",
     # Utils
     "setup_logger",
     "get_logger",
@@ -0,0 +1,136 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+CacheKey = tuple[Hashable, ...]
+
+
+class ResponseCache:
+    """
+    Short-lived response cache with in-flight request coalescing.
+
+    Keys are tuples whose first element is the group (the endpoint), so a
+    whole endpoint can be invalidated at once. Concurrent lookups of a key
+    that is being fetched share the same request; a result is kept for the
+    caller's TTL unless its group was invalidated while the request was in
+    flight. Lookups after an invalidation never join a request started
+    before it.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: dict[CacheKey, tuple[float, Any]] = {}
+        self._inflight: dict[CacheKey, asyncio.Task] = {}
+        self._generations: dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_fetch(
+        self, key: CacheKey, ttl: float, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return the cached response for ``key`` or fetch it once.
+
+        Args:
+            key: Cache key; ``key[0]`` is the invalidation group
+            ttl: Seconds to keep the response (``0`` only coalesces)
+            fetch: Performs the request
+
+        Returns:
+            The response
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            generation = self._generations.get(key[0], 0)
+            task = asyncio.create_task(self._fetch(key, ttl, fetch, generation))
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self,
+        key: CacheKey,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+        generation: int,
+    ) -> Any:
+        try:
+            value = await fetch()
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+        if ttl > 0 and self._generations.get(key[0], 0) == generation:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+        return value
+
+    def invalidate(self, group: Optional[Hashable] = None) -> None:
+        """
+        Drop cached responses.
+
+        Args:
+            group: Only drop this group's responses (default: everything)
+        """
+        if group is None:
+            for existing in {key[0] for key in (*self._entries, *self._inflight)}:
+                self._generations[existing] = self._generations.get(existing, 0) + 1
+            self._entries.clear()
+            self._inflight.clear()
+            return
+
+        self._generations[group] = self._generations.get(group, 0) + 1
+        for key in [key for key in self._entries if key[0] == group]:
+            del self._entries[key]
+        for key in [key for key in self._inflight if key[0] == group]:
+            del self._inflight[key]
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict with hits, misses, coalesced requests and cached entries
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+        }
@@ -14,11 +14,13 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Awaitable, Optional
 
 import aiohttp
 from aiolimiter import AsyncLimiter
 
+from mezon.api.cache import ResponseCache
+from mezon.api.pagination import paginate
 from mezon.api.utils import (
     build_body,
     build_headers,
@@ -31,8 +33,10 @@ from mezon.models import (
     ApiClanDescList,
     ApiCreateChannelDescRequest,
     ApiQuickMenuAccess,
+    ApiRole,
     ApiRoleListEventResponse,
     ApiSession,
+    ApiVoiceChannelUser,
     ApiVoiceChannelUserList,
 )
 from mezon.protobuf.api import api_pb2
@@ -57,6 +61,7 @@ class MezonApi:
         "list_channel_voice_users": "/mezon.api.Mezon/ListChannelVoiceUsers",
         "update_role": "/mezon.api.Mezon/UpdateRole",
         "list_roles": "/mezon.api.Mezon/ListRoles",
+        "list_clan_users": "/mezon.api.Mezon/ListClanUsers",
         "add_quick_menu_access": "/mezon.api.Mezon/AddQuickMenuAccess",
         "delete_quick_menu_access": "/mezon.api.Mezon/DeleteQuickMenuAccess",
         "list_quick_menu_access": "/mezon.api.Mezon/ListQuickMenuAccess",
@@ -65,10 +70,36 @@ class MezonApi:
     # Keep ENDPOINTS for backward compatibility during migration
     ENDPOINTS = {**REST_ENDPOINTS, **RPC_ENDPOINTS}
 
+    # Read endpoints whose identical calls share one request, with the seconds
+    # a response stays cached (0 only coalesces concurrent calls)
+    DEFAULT_CACHE_TTLS = {
+        "list_clans_descs": 5.0,
+        "list_channel_descs": 5.0,
+        "get_channel_detail": 5.0,
+        "list_roles": 5.0,
+        "list_channel_voice_users": 1.0,
+        "list_quick_menu_access": 5.0,
+    }
+
+    # Cached endpoints invalidated by a successful write
+    CACHE_INVALIDATED_BY = {
+        "create_channel_desc": ("list_channel_descs",),
+        "update_role": ("list_roles",),
+        "add_quick_menu_access": ("list_quick_menu_access",),
+        "delete_quick_menu_access": ("list_quick_menu_access",),
+    }
+
     _rate_limiter = AsyncLimiter(max_rate=1, time_period=1.25)
 
     def __init__(
-        self, client_id: str | int, api_key: str, base_url: str, timeout_ms: int
+        self,
+        client_id: str | int,
+        api_key: str,
+        base_url: str,
+        timeout_ms: int,
+        session: Optional[aiohttp.ClientSession] = None,
+        rate_limiter: Optional[AsyncLimiter] = None,
+        cache_ttls: Optional[dict[str, Optional[float]]] = None,
     ):
         """
         Initialize Mezon API client.
@@ -78,12 +109,47 @@ class MezonApi:
             api_key: API key for authentication
             base_url: Base URL for API
             timeout_ms: Timeout in milliseconds
+            session: Shared HTTP session to reuse pooled connections
+                (default: a new session per request)
+            rate_limiter: Rate limiter for this client (default: the limiter
+                shared by all ``MezonApi`` instances)
+            cache_ttls: Per-endpoint response TTLs in seconds, merged over
+                ``DEFAULT_CACHE_TTLS`` (``None`` disables caching for an endpoint)
         """
         self.client_id = int(client_id)
         self.api_key = api_key
         self.base_url = base_url
         self.timeout_ms = timeout_ms
         self.client_timeout = aiohttp.ClientTimeout(total=timeout_ms / 1000)
+        self.session = session
+        if rate_limiter is not None:
+            self._rate_limiter = rate_limiter
+        self.cache_ttls = {**self.DEFAULT_CACHE_TTLS, **(cache_ttls or {})}
+        self.response_cache = ResponseCache()
+        self._cache_ttl_by_path = {
+            self.ENDPOINTS[name]: ttl
+            for name, ttl in self.cache_ttls.items()
+            if ttl is not None and name in self.ENDPOINTS
+        }
+        self._invalidations_by_path = {
+            self.ENDPOINTS[name]: targets
+            for name, targets in self.CACHE_INVALIDATED_BY.items()
+        }
+
+    def invalidate_cache(self, *endpoints: str) -> None:
+        """
+        Drop cached responses.
+
+        Args:
+            *endpoints: Endpoint names such as ``"list_channel_descs"``
+                (default: every endpoint)
+        """
+        if not endpoints:
+            self.response_cache.invalidate()
+            return
+        for name in endpoints:
+            if name in self.ENDPOINTS:
+                self.response_cache.invalidate(self.ENDPOINTS[name])
 
     async def call_api(
         self,
@@ -98,6 +164,10 @@ class MezonApi:
         """
         Make API call with optional binary protobuf request/response support.
 
+        Calls to endpoints with a cache TTL are keyed by (endpoint, token,
+        body, query): identical calls made while one is in flight, or within
+        the TTL, share its response.
+
         Args:
             method (str): HTTP method
             url_path (str): API endpoint path
@@ -115,19 +185,90 @@ class MezonApi:
             f"Proto class: {response_proto_class}"
         )
 
+        def send() -> Awaitable[Any]:
+            return self._send(
+                method,
+                url_path,
+                query_params,
+                body,
+                headers,
+                accept_binary,
+                response_proto_class,
+            )
+
+        ttl = self._cache_ttl_by_path.get(url_path)
+        if ttl is None:
+            response = await send()
+            for name in self._invalidations_by_path.get(url_path, ()):
+                self.invalidate_cache(name)
+            return response
+
+        key = (
+            url_path,
+            method,
+            (headers or {}).get("Authorization"),
+            body,
+            tuple(sorted(query_params.items())) if query_params else None,
+        )
+        return await self.response_cache.get_or_fetch(key, ttl, send)
+
+    async def _send(
+        self,
+        method: str,
+        url_path: str,
+        query_params: Optional[dict[str, Any]],
+        body: Optional[str | bytes],
+        headers: Optional[dict[str, Any]],
+        accept_binary: bool,
+        response_proto_class: Optional[type],
+    ) -> Any:
+        """Send a request through the rate limiter."""
         async with self._rate_limiter:
+            if self.session is not None and not self.session.closed:
+                return await self._request(
+                    self.session,
+                    method,
+                    url_path,
+                    query_params,
+                    body,
+                    headers,
+                    accept_binary,
+                    response_proto_class,
+                )
             async with aiohttp.ClientSession(timeout=self.client_timeout) as session:
-                async with session.request(
+                return await self._request(
+                    session,
                     method,
-                    f"{self.base_url}{url_path}",
-                    params=query_params,
-                    data=body,
-                    headers=headers,
-                ) as resp:
-                    resp.raise_for_status()
-                    return await parse_response(
-                        resp, accept_binary, response_proto_class
-                    )
+                    url_path,
+                    query_params,
+                    body,
+                    headers,
+                    accept_binary,
+                    response_proto_class,
+                )
+
+    async def _request(
+        self,
+        session: aiohttp.ClientSession,
+        method: str,
+        url_path: str,
+        query_params: Optional[dict[str, Any]],
+        body: Optional[str | bytes],
+        headers: Optional[dict[str, Any]],
+        accept_binary: bool,
+        response_proto_class: Optional[type],
+    ) -> Any:
+        """Send a request on the given session and parse the response."""
+        async with session.request(
+            method,
+            f"{self.base_url}{url_path}",
+            params=query_params,
+            data=body,
+            headers=headers,
+            timeout=self.client_timeout,
+        ) as resp:
+            resp.raise_for_status()
+            return await parse_response(resp, accept_binary, response_proto_class)
 
     async def mezon_authenticate(
         self,
@@ -264,6 +405,44 @@ class MezonApi:
 
         return ApiChannelDescList.from_protobuf(response)
 
+    def iter_channel_descs(
+        self,
+        token: str,
+        channel_type: int = 0,
+        clan_id: int = 0,
+        state: int = 0,
+        page_size: int = 0,
+        prefetch: bool = True,
+    ) -> AsyncIterator[ApiChannelDescription]:
+        """
+        Iterate channel descriptions across all pages.
+
+        Args:
+            token: Bearer token for authentication
+            channel_type: Channel type to filter
+            clan_id: Clan ID to filter channels
+            state: Channel state filter
+            page_size: Results per request (``0`` for the server default)
+            prefetch: Request the next page while the current one is consumed
+
+        Returns:
+            AsyncIterator[ApiChannelDescription]: Channel descriptions
+        """
+        return paginate(
+            lambda cursor: self.list_channel_descs(
+                token,
+                channel_type=channel_type,
+                clan_id=clan_id,
+                limit=page_size,
+                state=state,
+                cursor=cursor,
+            ),
+            items=lambda page: page.channeldesc if page else None,
+            next_cursor=lambda page: getattr(page, "cursor", None),
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+
     async def create_channel_desc(
         self,
         token: str,
@@ -401,6 +580,47 @@ class MezonApi:
 
         return ApiVoiceChannelUserList.from_protobuf(response)
 
+    def iter_channel_voice_users(
+        self,
+        token: str,
+        clan_id: int = 0,
+        channel_id: int = 0,
+        channel_type: int = 0,
+        state: int = 0,
+        page_size: int = 0,
+        prefetch: bool = True,
+    ) -> AsyncIterator[ApiVoiceChannelUser]:
+        """
+        Iterate voice channel users across all pages.
+
+        Args:
+            token: Bearer token for authentication
+            clan_id: Clan ID to filter
+            channel_id: Channel ID
+            channel_type: Channel type
+            state: State filter
+            page_size: Results per request (``0`` for the server default)
+            prefetch: Request the next page while the current one is consumed
+
+        Returns:
+            AsyncIterator[ApiVoiceChannelUser]: Voice channel users
+        """
+        return paginate(
+            lambda cursor: self.list_channel_voice_users(
+                token,
+                clan_id=clan_id,
+                channel_id=channel_id,
+                channel_type=channel_type,
+                limit=page_size,
+                state=state,
+                cursor=cursor,
+            ),
+            items=lambda page: page.voice_channel_users if page else None,
+            next_cursor=lambda page: getattr(page, "cursor", None),
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+
     async def update_role(
         self,
         token: str,
@@ -493,6 +713,80 @@ class MezonApi:
 
         return ApiRoleListEventResponse.from_protobuf(response)
 
+    def iter_roles(
+        self,
+        token: str,
+        clan_id: int = 0,
+        state: int = 0,
+        page_size: int = 0,
+        prefetch: bool = True,
+    ) -> AsyncIterator[ApiRole]:
+        """
+        Iterate the roles of a clan across all pages.
+
+        Args:
+            token: Bearer token for authentication
+            clan_id: Clan ID to list roles for
+            state: State filter
+            page_size: Results per request (``0`` for the server default)
+            prefetch: Request the next page while the current one is consumed
+
+        Returns:
+            AsyncIterator[ApiRole]: Roles
+        """
+        return paginate(
+            lambda cursor: self.list_roles(
+                token,
+                clan_id=clan_id,
+                limit=page_size,
+                state=state,
+                cursor=cursor,
+            ),
+            items=lambda page: page.roles.roles if page and page.roles else None,
+            next_cursor=lambda page: (
+                (page.roles and page.roles.next_cursor) or page.cursor
+            ),
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+
+    async def list_clan_users(
+        self,
+        token: str,
+        clan_id: int,
+        options: Optional[dict[str, Any]] = None,
+    ) -> api_pb2.ClanUserList:
+        """
+        List every member of a clan.
+
+        The protobuf response is returned as is: converting a list of
+        100k members to Pydantic models would cost more than the request.
+
+        Args:
+            token: Bearer token for authentication
+            clan_id: Clan ID
+            options: Additional options for the request
+
+        Returns:
+            api_pb2.ClanUserList: Clan members with their user, nick and role
+        """
+        request = api_pb2.ListClanUsersRequest(clan_id=clan_id)
+
+        headers = build_headers(
+            bearer_token=token, accept_binary=True, send_binary=True
+        )
+        body = encode_protobuf(request)
+
+        return await self.call_api(
+            method="POST",
+            url_path=self.RPC_ENDPOINTS["list_clan_users"],
+            query_params=None,
+            body=body,
+            headers=headers,
+            accept_binary=True,
+            response_proto_class=api_pb2.ClanUserList,
+        )
+
     async def add_quick_menu_access(
         self,
         bearer_token: str,
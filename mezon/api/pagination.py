@@ -0,0 +1,90 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional, TypeVar
+
+from mezon.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PageT = TypeVar("PageT")
+ItemT = TypeVar("ItemT")
+
+
+async def paginate(
+    fetch: Callable[[str], Awaitable[PageT]],
+    items: Callable[[PageT], Optional[Iterable[ItemT]]],
+    next_cursor: Callable[[PageT], Optional[str]],
+    page_size: int = 0,
+    prefetch: bool = True,
+) -> AsyncIterator[ItemT]:
+    """
+    Iterate the items of a cursor-paginated endpoint.
+
+    Pages are requested with the cursor of the previous page until a page
+    comes back empty, without a new cursor, or shorter than ``page_size``.
+    Every page goes through ``fetch``, so the API client's rate limiter
+    applies. A full page without a cursor is logged, since the endpoint may
+    have truncated the result.
+
+    Args:
+        fetch: Requests the page for a cursor (``""`` for the first page)
+        items: Extracts the items of a page
+        next_cursor: Extracts the cursor of the following page
+        page_size: Expected items per page (``0`` for the server default)
+        prefetch: Request the next page while the current one is consumed
+
+    Yields:
+        The items of every page in order
+    """
+    cursor = ""
+    seen_cursors = {cursor}
+    next_page: Optional[asyncio.Task] = None
+    try:
+        page = await fetch(cursor)
+        while True:
+            page_items = list(items(page) or [])
+            cursor = next_cursor(page) or ""
+            more = (
+                bool(page_items)
+                and bool(cursor)
+                and cursor not in seen_cursors
+                and not (page_size and len(page_items) < page_size)
+            )
+            if not more and page_size and len(page_items) >= page_size:
+                logger.warning(
+                    f"Got a full page of {len(page_items)} items without a next "
+                    "cursor; the result may be truncated"
+                )
+
+            if more:
+                seen_cursors.add(cursor)
+                if prefetch:
+                    next_page = asyncio.create_task(fetch(cursor))
+
+            for item in page_items:
+                yield item
+
+            if not more:
+                return
+            if next_page is not None:
+                page, next_page = await next_page, None
+            else:
+                page = await fetch(cursor)
+    finally:
+        if next_page is not None and not next_page.done():
+            next_page.cancel()
@@ -18,58 +18,102 @@ import asyncio
 import inspect
 import json
 import logging
-from collections.abc import Callable
-from typing import Any, Literal
+from collections.abc import AsyncIterator, Callable
+from typing import TYPE_CHECKING, Any, Literal
 from urllib.parse import urlencode
 
 import aiohttp
-from mmn import (
-    AddTxResponse,
-    EphemeralKeyPair,
-    ExtraInfo,
-    MmnClient,
-    MmnClientConfig,
-    SendTransactionRequest,
-    TransferType,
-    ZkClient,
-    ZkClientConfig,
-    ZkClientType,
-    ZkProof,
-)
+from aiolimiter import AsyncLimiter
 
 from mezon.api.mezon_api import MezonApi
 from mezon.api.utils import build_url, parse_url_components
-from mezon.constants import ChannelType, Events, SSEEvents, TypeMessage
+from mezon.constants import (
+    ChannelType,
+    Events,
+    HandlerExecutor,
+    SSEEvents,
+    StreamOverflow,
+    TypeMessage,
+)
+from mezon.managers.batch import EventBatcher
+from mezon.managers.broadcast import (
+    DEFAULT_BROADCAST_CONCURRENCY,
+    DEFAULT_BROADCAST_RETRIES,
+    BroadcastReport,
+    BroadcastResult,
+    fan_out,
+)
 from mezon.managers.cache import CacheManager
-from mezon.managers.channel import ChannelManager
-from mezon.managers.event import EventManager
-from mezon.managers.session import SessionManager
+from mezon.managers.channel import DEFAULT_DM_CREATE_CONCURRENCY, ChannelManager
+from mezon.managers.clan_directory import ClanDirectory
+from mezon.managers.command import CommandContext, CommandRouter
+from mezon.managers.dedup import (
+    DEFAULT_DEDUP_MAX_SIZE,
+    DEFAULT_DEDUP_WINDOW_S,
+    DuplicateFilter,
+)
+from mezon.managers.event import DEFAULT_SLOW_HANDLER_THRESHOLD_MS, EventManager
+from mezon.managers.session import DEFAULT_REFRESH_MARGIN_S, SessionManager
+from mezon.managers.signals import (
+    DEFAULT_SIGNAL_FLUSH_INTERVAL_S,
+    DEFAULT_SIGNAL_MAX_PER_FLUSH,
+    DEFAULT_TYPING_INTERVAL_S,
+    SignalCoalescer,
+)
 from mezon.managers.socket import SocketManager
+from mezon.managers.stream import EventStream
+from mezon.managers.voice import (
+    DEFAULT_VOICE_RECONCILE_INTERVAL_S,
+    VoicePresenceTracker,
+)
+from mezon.managers.worker import WorkerHandler, WorkerPool
 from mezon.messages.db import MessageDB
+from mezon.messages.outbox import DEFAULT_OUTBOX_RATE, Outbox
+from mezon.messages.snapshot import (
+    DEFAULT_SNAPSHOT_MAX_AGE_S,
+    StateSnapshot,
+    snapshot_path_for,
+)
 from mezon.models import (
     AIAgentSessionEndedEvent,
     AIAgentSessionStartedEvent,
     AIAgentSessionSummaryDoneEvent,
     ApiChannelDescription,
+    ApiClanDesc,
+    ApiMessageAttachment,
+    ApiMessageMention,
     ApiQuickMenuAccess,
     ApiSentTokenRequest,
+    ApiVoiceChannelUser,
     ChannelCreatedEvent,
     ChannelMessage,
+    ChannelMessageAck,
     ChannelMessageContent,
     ChannelUpdatedEvent,
+    ClanUpdatedEvent,
     RoomMetadataEvent,
     SSEMessage,
     UserInitData,
+    UserProfileUpdatedEvent,
 )
 from mezon.protobuf.api import api_pb2
 from mezon.protobuf.rtapi import realtime_pb2
 from mezon.session import Session
+from mezon.socket import Socket
+from mezon.socket.message_builder import ChannelMessageBuilder
 from mezon.structures.clan import Clan
 from mezon.structures.message import Message
 from mezon.structures.text_channel import TextChannel
 from mezon.structures.user import User
-from mezon.utils.helper import generate_snowflake_id
+from mezon.utils.helper import (
+    convert_channeltype_to_channel_mode,
+    generate_snowflake_id,
+)
 from mezon.utils.logger import get_logger, setup_logger
+from mezon.utils.metrics import PhaseTimer
+
+if TYPE_CHECKING:
+    from mmn import AddTxResponse, EphemeralKeyPair, MmnClient, ZkClient, ZkProof
 
 DEFAULT_HOST = "gw.mezon.ai"
 DEFAULT_PORT = "443"
@@ -82,6 +126,24 @@ DEFAULT_MESSAGE_PER_TIME = 5
 DEFAULT_MMN_API = "https://dong.mezon.ai/mmn-api/"
 DEFAULT_ZK_API = "https://dong.mezon.ai/zk-api/"
 
+# Realtime events that make cached API responses stale
+API_CACHE_INVALIDATION_EVENTS: dict[str, tuple[str, ...]] = {
+    Events.CHANNEL_CREATED: ("list_channel_descs", "get_channel_detail"),
+    Events.CHANNEL_UPDATED: ("list_channel_descs", "get_channel_detail"),
+    Events.CHANNEL_DELETED: ("list_channel_descs", "get_channel_detail"),
+    Events.USER_CHANNEL_ADDED: ("list_channel_descs",),
+    Events.USER_CHANNEL_REMOVED: ("list_channel_descs",),
+    Events.ADD_CLAN_USER: ("list_clans_descs",),
+    Events.USER_CLAN_REMOVED: ("list_clans_descs",),
+    Events.CLAN_UPDATED: ("list_clans_descs",),
+    Events.CLAN_DELETED: ("list_clans_descs",),
+    Events.ROLE_EVENT: ("list_roles",),
+    Events.ROLE_ASSIGN: ("list_roles",),
+    Events.VOICE_JOINED_EVENT: ("list_channel_voice_users",),
+    Events.VOICE_LEAVED_EVENT: ("list_channel_voice_users",),
+    Events.QUICK_MENU: ("list_quick_menu_access",),
+}
+
 logger = get_logger(__name__)
 
 
@@ -129,6 +191,31 @@ class MezonClient:
         agent_event_url: str | None = None,
         log_level: int = logging.INFO,
         enable_logging: bool = False,
+        handler_executor: HandlerExecutor | str = HandlerExecutor.INLINE,
+        handler_executor_workers: int | None = None,
+        slow_handler_threshold_ms: float | None = DEFAULT_SLOW_HANDLER_THRESHOLD_MS,
+        message_db: MessageDB | None = None,
+        http_session: aiohttp.ClientSession | None = None,
+        api_rate_limiter: AsyncLimiter | None = None,
+        mmn_client: "MmnClient | None" = None,
+        zk_client: "ZkClient | None" = None,
+        command_prefix: str | list[str] = "*",
+        session_refresh_margin: float | None = DEFAULT_REFRESH_MARGIN_S,
+        api_cache_ttls: dict[str, float | None] | None = None,
+        warm_start: bool = False,
+        snapshot_path: str | None = None,
+        snapshot_max_age: float = DEFAULT_SNAPSHOT_MAX_AGE_S,
+        signal_flush_interval: float = DEFAULT_SIGNAL_FLUSH_INTERVAL_S,
+        typing_interval: float = DEFAULT_TYPING_INTERVAL_S,
+        signal_max_per_flush: int = DEFAULT_SIGNAL_MAX_PER_FLUSH,
+        max_unacked_sends: int = Socket.DEFAULT_MAX_UNACKED_SENDS,
+        outbox: bool = False,
+        outbox_rate: float = DEFAULT_OUTBOX_RATE,
+        dedup_window: float | None = DEFAULT_DEDUP_WINDOW_S,
+        dedup_max_size: int = DEFAULT_DEDUP_MAX_SIZE,
+        dedup_keys: dict[str, Callable[[Any], Any] | None] | None = None,
+        voice_presence: bool = False,
+        voice_reconcile_interval: float | None = DEFAULT_VOICE_RECONCILE_INTERVAL_S,
     ):
         """
         Initialize the MezonClient.
@@ -145,6 +232,44 @@ class MezonClient:
             agent_event_url: Base URL for AI agent SSE endpoints
             log_level: The logging level (default: logging.INFO)
             enable_logging: Whether to enable logging output (default: True)
+            handler_executor: Where sync event handlers run: ``inline`` on the
+                event loop, a ``shared`` thread pool, or a ``dedicated`` pool per handler
+            handler_executor_workers: Worker count for the shared handler pool
+            slow_handler_threshold_ms: Warn when an inline sync handler blocks the
+                event loop longer than this (``None`` disables the warning)
+            message_db: Message store to use instead of the default SQLite file
+            http_session: Shared HTTP session for API calls (default: one session per call)
+            api_rate_limiter: Rate limiter for this client's API calls
+                (default: the limiter shared by every ``MezonApi``)
+            mmn_client: Existing MMN client to reuse instead of creating one
+            zk_client: Existing ZK client to reuse instead of creating one
+            command_prefix: Prefix or prefixes for commands registered with ``command()``
+            session_refresh_margin: Seconds before the session expires to refresh it
+                in the background (``None`` disables the refresh)
+            api_cache_ttls: Per-endpoint API response TTLs in seconds, merged over
+                ``MezonApi.DEFAULT_CACHE_TTLS`` (``None`` disables an endpoint's cache)
+            warm_start: Restore clans, channels and DM channels from a snapshot on
+                login and reconcile with the API in the background
+            snapshot_path: Snapshot file (default: next to the message database)
+            snapshot_max_age: Ignore snapshots older than this many seconds
+            signal_flush_interval: Seconds between flushes of coalesced
+                last-seen and typing signals
+            typing_interval: Minimum seconds between typing signals of a channel
+            signal_max_per_flush: Maximum last-seen and typing signals written
+                per flush, bounding their share of the socket's send budget
+            max_unacked_sends: Maximum number of ``send_nowait`` messages
+                awaiting their ack; further sends wait for a slot
+            outbox: Enable the durable outbox used by ``TextChannel.send_queued``
+            outbox_rate: Maximum outbox messages sent per second
+            dedup_window: Seconds a received event is remembered to drop
+                redelivered duplicates (``None`` disables the filter)
+            dedup_max_size: Maximum number of remembered events
+            dedup_keys: Key functions per event name, merged over
+                ``DEFAULT_DEDUP_KEYS`` (``None`` disables an event's filtering)
+            voice_presence: Track who is in which voice channel in
+                ``client.voice_presence``
+            voice_reconcile_interval: Seconds between re-fetches of the voice
+                users of tracked clans (``None`` disables them)
         """
         if enable_logging:
             setup_logger(log_level=log_level)
@@ -158,6 +283,7 @@ class MezonClient:
         self.login_url = build_url(use_ssl and "https" or "http", host=host, port=port)
         self.timeout_ms = timeout
         self.clans: CacheManager[int, Clan] = CacheManager(None, max_size=1000)
+        self.clan_directory = ClanDirectory()
         self.channels: CacheManager[int, TextChannel] = CacheManager(
             self.get_channel_from_id, max_size=1000
         )
@@ -165,18 +291,87 @@ class MezonClient:
             self.get_user_from_id, max_size=1000
         )
 
-        self.event_manager = EventManager()
-        self.message_db = MessageDB()
+        self._event_manager_options = {
+            "executor_policy": handler_executor,
+            "max_workers": handler_executor_workers,
+            "slow_handler_threshold_ms": slow_handler_threshold_ms,
+        }
+        self.event_manager = EventManager(**self._event_manager_options)
+        self.message_db = message_db or MessageDB()
+        self.http_session = http_session
+        self.api_rate_limiter = api_rate_limiter
+        self.api_cache_ttls = api_cache_ttls
+        self.mmn_client = mmn_client
+        self.zk_client = zk_client
         self._agent_sse_session: aiohttp.ClientSession | None = None
         self._agent_sse_task: asyncio.Task | None = None
         self._agent_sse_response: aiohttp.ClientResponse | None = None
         self._enable_auto_reconnect = False
         self._is_hard_disconnect = False
         self._reconnect_task: asyncio.Task | None = None
+        self.worker_pool: WorkerPool | None = None
+        self._batchers: list[EventBatcher] = []
+        self.command_router = CommandRouter(
+            prefixes=command_prefix, ignored_sender_ids=[self.client_id]
+        )
+        self.session_refresh_margin = session_refresh_margin
+        self.login_timings: PhaseTimer | None = None
+        self.zk_proof: "ZkProof | None" = None
+        self._zk_task: asyncio.Task | None = None
+        self.snapshot: StateSnapshot | None = None
+        if warm_start:
+            self.snapshot = StateSnapshot(
+                snapshot_path
+                or snapshot_path_for(self.message_db.db_path, self.client_id),
+                max_age_s=snapshot_max_age,
+            )
+        self._snapshot_task: asyncio.Task | None = None
+        self.max_unacked_sends = max_unacked_sends
+        self.signals = SignalCoalescer(
+            lambda: self.socket_manager.get_socket(),
+            flush_interval=signal_flush_interval,
+            typing_interval=typing_interval,
+            max_per_flush=signal_max_per_flush,
+        )
+        self.duplicate_filter: DuplicateFilter | None = None
+        if dedup_window is not None:
+            self.duplicate_filter = DuplicateFilter(
+                window=dedup_window, max_size=dedup_max_size, keys=dedup_keys
+            )
+        self.outbox: Outbox | None = None
+        if outbox:
+            self.outbox = Outbox(
+                self.message_db,
+                self.client_id,
+                send=self._send_outbox_message,
+                is_ready=self._is_socket_open,
+                rate=outbox_rate,
+            )
+        self.voice_presence: VoicePresenceTracker | None = None
+        if voice_presence:
+            self.voice_presence = VoicePresenceTracker(
+                self._iter_clan_voice_users,
+                reconcile_interval=voice_reconcile_interval,
+            )
 
         logger.info(f"MezonClient initialized for client_id: {client_id}")
 
         self._register_auto_bound_handlers()
+        self._register_cache_invalidation()
+
+    def _register_cache_invalidation(self) -> None:
+        """Drop cached API responses made stale by realtime events."""
+        for event_name, endpoints in API_CACHE_INVALIDATION_EVENTS.items():
+
+            async def invalidate(
+                message: Any, endpoints: tuple[str, ...] = endpoints
+            ) -> None:
+                api_client = getattr(self, "api_client", None)
+                if api_client is not None:
+                    api_client.invalidate_cache(*endpoints)
+
+            invalidate._is_default_handler = True  # type: ignore[attr-defined]
+            self.event_manager.on(event_name, invalidate)
 
     def _register_auto_bound_handlers(self) -> None:
         """
@@ -210,22 +405,54 @@ class MezonClient:
             The session for the client.
         """
         temp_session_manager = SessionManager(
-            api_client=MezonApi(
-                self.client_id,
-                self.api_key,
-                self.login_url,
-                self.timeout_ms,
-            )
+            api_client=self._create_api_client(self.login_url)
         )
         session = await temp_session_manager.authenticate(self.client_id, self.api_key)
         return Session(session)
 
-    async def initialize_managers(self, sock_session: Session) -> None:
+    def _create_api_client(self, base_url: str) -> MezonApi:
+        """
+        Create an API client bound to this client's HTTP session and rate limiter.
+
+        Args:
+            base_url: Base URL for the API
+
+        Returns:
+            The API client
+        """
+        return MezonApi(
+            self.client_id,
+            self.api_key,
+            base_url,
+            self.timeout_ms,
+            session=self.http_session,
+            rate_limiter=self.api_rate_limiter,
+            cache_ttls=self.api_cache_ttls,
+        )
+
+    async def _on_session_refreshed(self, session: Session) -> None:
+        """
+        Propagate a refreshed session token and emit ``SESSION_REFRESHED``.
+
+        Args:
+            session: The refreshed session
+        """
+        for clan in self.clans.values():
+            clan.session_token = session.token
+        await self.event_manager.emit(Events.SESSION_REFRESHED, session)
+
+    async def initialize_managers(
+        self, sock_session: Session, timer: PhaseTimer | None = None
+    ) -> None:
         """
         Initialize or reinitialize managers for the client.
 
+        The socket connection (followed by joining every clan) and the DM
+        channel lookup run concurrently, since the latter only needs HTTP.
+
         Args:
             sock_session: Session object with authentication token
+            timer: Records the duration of each phase
         """
         url_components = parse_url_components(
             sock_session.api_url, use_ssl=self.use_ssl
@@ -235,15 +462,12 @@ class MezonClient:
         )
         ws_url = sock_session.ws_url.removeprefix("wss://").removeprefix("ws://")
 
-        self.api_client = MezonApi(
-            self.client_id,
-            self.api_key,
+        self.api_client = self._create_api_client(
             build_url(
                 url_components["scheme"],
                 url_components["hostname"],
                 url_components["port"],
-            ),
-            self.timeout_ms,
+            )
         )
 
         if not hasattr(self, "socket_manager"):
@@ -254,27 +478,270 @@ class MezonClient:
                 event_manager=self.event_manager,
                 mezon_client=self,
                 message_db=self.message_db,
+                max_unacked_sends=self.max_unacked_sends,
             )
         else:
             self.socket_manager.api_client = self.api_client
+        self.socket_manager.get_socket().command_router = self.command_router
+        self.socket_manager.get_socket().duplicate_filter = self.duplicate_filter
 
+        if hasattr(self, "session_manager"):
+            self.session_manager.stop_auto_refresh()
         self.session_manager = SessionManager(
-            api_client=self.api_client, session=sock_session
+            api_client=self.api_client,
+            session=sock_session,
+            auth_api_client=self._create_api_client(self.login_url),
+            refresh_margin_s=self.session_refresh_margin or 0,
+            on_refresh=self._on_session_refreshed,
         )
+        if self.session_refresh_margin is not None:
+            self.session_manager.start_auto_refresh(self.client_id, self.api_key)
+        dm_channels = None
+        if hasattr(self, "channel_manager"):
+            self.channel_manager.stop()
+            dm_channels = self.channel_manager.all_dm_channels
         self.channel_manager = ChannelManager(
             api_client=self.api_client,
             socket_manager=self.socket_manager,
             session_manager=self.session_manager,
+            dm_store=self.message_db,
+            owner_id=self.client_id,
+        )
+        self.channel_manager.all_dm_channels = dm_channels
+
+        self._ensure_wallet_clients()
+        timer = timer or PhaseTimer()
+
+        async def connect_and_join() -> None:
+            with timer.phase("socket_connect"):
+                await self.socket_manager.connect(sock_session)
+            if sock_session.token:
+                with timer.phase("join_clans"):
+                    await self.socket_manager.connect_socket(sock_session.token)
+
+        async def init_dm_channels() -> None:
+            with timer.phase("dm_channels"):
+                await self.channel_manager.load_dm_channels(sock_session.token)
+
+        snapshot = None
+        if self.snapshot and sock_session.token:
+            with timer.phase("load_snapshot"):
+                snapshot = await self.snapshot.load_async(self.client_id)
+
+        if snapshot:
+            with timer.phase("socket_connect"):
+                await self.socket_manager.connect(sock_session)
+            with timer.phase("warm_start"):
+                await self._apply_snapshot(snapshot, sock_session.token)
+            self._start_snapshot_task(self._reconcile_snapshot(sock_session.token))
+        elif sock_session.token:
+            await asyncio.gather(connect_and_join(), init_dm_channels())
+            if self.snapshot:
+                self._start_snapshot_task(self.save_snapshot())
+        else:
+            await connect_and_join()
+
+        if self.outbox:
+            self.outbox.start()
+            self.outbox.notify()
+        if self.voice_presence:
+            self.voice_presence.start()
+
+    def _is_socket_open(self) -> bool:
+        return (
+            hasattr(self, "socket_manager")
+            and self.socket_manager.get_socket().is_open()
+        )
+
+    async def _send_outbox_message(
+        self, payload: dict[str, Any], message_id: int
+    ) -> ChannelMessageAck:
+        """
+        Send a message stored by the outbox.
+
+        Args:
+            payload: Message fields stored by ``TextChannel.send_queued``
+            message_id: Idempotency ID of the message
+
+        Returns:
+            Acknowledgement of the sent message
+        """
+        payload = dict(payload)
+        payload["mentions"] = [
+            ApiMessageMention.model_validate(m) for m in payload["mentions"]
+        ]
+        payload["attachments"] = [
+            ApiMessageAttachment.model_validate(a) for a in payload["attachments"]
+        ]
+        return await self.socket_manager.write_chat_message(
+            **payload, message_id=message_id
+        )
+
+    async def _iter_clan_voice_users(
+        self, clan_id: int
+    ) -> AsyncIterator[ApiVoiceChannelUser]:
+        """
+        Iterate every voice user of a cached clan for the voice presence tracker.
+
+        Voice events carry no channel type, so both Google Meet and native
+        Mezon voice channels are listed.
+
+        Args:
+            clan_id: Clan ID
+
+        Raises:
+            LookupError: If the clan is not cached
+        """
+        clan = self.clans.get(clan_id)
+        if clan is None:
+            raise LookupError(f"Clan {clan_id} is not cached")
+        for channel_type in (
+            ChannelType.CHANNEL_TYPE_GMEET_VOICE,
+            ChannelType.CHANNEL_TYPE_MEZON_VOICE,
+        ):
+            async for voice_user in clan.iter_channel_voice_users(
+                channel_type=channel_type
+            ):
+                yield voice_user
+
+    def _start_snapshot_task(self, coro: Any) -> None:
+        if self._snapshot_task and not self._snapshot_task.done():
+            self._snapshot_task.cancel()
+        self._snapshot_task = asyncio.create_task(coro)
+
+    async def _apply_snapshot(self, snapshot: dict[str, Any], token: str) -> None:
+        """
+        Rebuild clans, channels and the DM map from a snapshot.
+
+        Args:
+            snapshot: Snapshot returned by ``StateSnapshot.load``
+            token: Session token for the restored clans
+        """
+        clans = [ApiClanDesc.model_validate(clan) for clan in snapshot["clans"]]
+        await self.socket_manager.join_all_clans(clans, token)
+
+        for data in snapshot["channels"]:
+            channel_desc = ApiChannelDescription.model_validate(data)
+            clan = self.clans.get(channel_desc.clan_id or 0)
+            if not clan:
+                continue
+            channel = TextChannel(
+                init_channel_data=channel_desc,
+                clan=clan,
+                socket_manager=self.socket_manager,
+                message_db=self.message_db,
+            )
+            clan.channels.set(channel.id, channel)
+            clan._channels_loaded = True
+            self.channels.set(channel.id, channel)
+
+        self.channel_manager.all_dm_channels = snapshot["dm_channels"]
+        logger.info(
+            f"Warm start from snapshot: {len(clans)} clans, "
+            f"{len(snapshot['channels'])} channels"
         )
 
-        if self.mmn_api_url:
+    async def _reconcile_snapshot(self, token: str) -> None:
+        """
+        Refresh state restored from a snapshot against the API, then save it.
+
+        Args:
+            token: Session token
+        """
+        try:
+            clans_response = await self.api_client.list_clans_descs(token)
+            clan_descs = list(clans_response.clandesc) + [
+                ApiClanDesc(clan_id=0, clan_name="")
+            ]
+            live_ids = {desc.clan_id for desc in clan_descs}
+
+            self.clan_directory.replace(clan_descs)
+            for clan in [c for c in self.clans.values() if c.id not in live_ids]:
+                self.clans.delete(clan.id)
+            new_clans = []
+            for desc in clan_descs:
+                clan = self.clans.get(desc.clan_id)
+                if clan is None:
+                    new_clans.append(desc)
+                elif desc.clan_id:
+                    clan.name = desc.clan_name
+                    clan.welcome_channel_id = desc.welcome_channel_id
+            if new_clans:
+                await self.socket_manager.join_all_clans(new_clans, token)
+
+            async def reload_channels(clan: Clan) -> None:
+                clan._channels_loaded = False
+                await clan.load_channels()
+
+            restored = [
+                clan
+                for clan in self.clans.values()
+                if clan.id and clan._channels_loaded
+            ]
+            await asyncio.gather(
+                self.channel_manager.init_all_dm_channels(token),
+                *(reload_channels(clan) for clan in restored),
+            )
+            await self.save_snapshot()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to reconcile state snapshot: {e}")
+
+    async def save_snapshot(self) -> None:
+        """Write the current clans, loaded channels and DM map to the snapshot file."""
+        if not self.snapshot or not hasattr(self, "channel_manager"):
+            return
+
+        clans = [
+            ApiClanDesc(
+                clan_id=clan.id,
+                clan_name=clan.name,
+                welcome_channel_id=clan.welcome_channel_id or None,
+            )
+            for clan in self.clans.values()
+        ]
+        channels = [
+            ApiChannelDescription(
+                channel_id=channel.id,
+                clan_id=channel.clan.id,
+                channel_label=channel.name,
+                type=channel.channel_type,
+                channel_private=int(channel.is_private),
+                category_id=channel.category_id,
+                category_name=channel.category_name,
+                parent_id=channel.parent_id,
+                meeting_code=channel.meeting_code,
+            )
+            for channel in self.channels.values()
+            if channel.id and channel.clan
+        ]
+        try:
+            await self.snapshot.save_async(
+                self.client_id,
+                clans,
+                channels,
+                self.channel_manager.get_all_dm_channels(),
+            )
+        except OSError as e:
+            logger.warning(f"Failed to save state snapshot: {e}")
+
+    def _ensure_wallet_clients(self) -> None:
+        """Create the MMN and ZK clients if they are configured and missing."""
+        if not (self.mmn_api_url and self.mmn_client is None) and not (
+            self.zk_api_url and self.zk_client is None
+        ):
+            return
+        from mmn import MmnClient, MmnClientConfig, ZkClient, ZkClientConfig
+
+        if self.mmn_api_url and self.mmn_client is None:
             self.mmn_client = MmnClient(
                 MmnClientConfig(
                     base_url=self.mmn_api_url,
                     timeout=self.timeout_ms,
                 )
             )
-        if self.zk_api_url:
+        if self.zk_api_url and self.zk_client is None:
             self.zk_client = ZkClient(
                 ZkClientConfig(
                     endpoint=self.zk_api_url,
@@ -282,14 +749,6 @@ class MezonClient:
                 )
             )
 
-        await self.socket_manager.connect(sock_session)
-
-        if sock_session.token:
-            await asyncio.gather(
-                self.socket_manager.connect_socket(sock_session.token),
-                self.channel_manager.init_all_dm_channels(sock_session.token),
-            )
-
     async def _invoke_handler(
         self, handler: EventHandler, *args: Any, **kwargs: Any
     ) -> None:
@@ -305,7 +764,7 @@ class MezonClient:
         if inspect.iscoroutinefunction(handler):
             await handler(*args, **kwargs)
         else:
-            handler(*args, **kwargs)
+            await self.event_manager.run_sync_handler(handler, *args, **kwargs)
 
     def _build_agent_sse_url(self, path: str) -> str:
         if not self.agent_event_url:
@@ -419,15 +878,28 @@ class MezonClient:
         """
         Authenticate and initialize the client.
 
+        Login runs as a small dependency graph: once authenticated, the socket
+        connection, clan joins and DM channel lookup proceed while the MMN/ZK
+        wallet setup runs in the background; ``send_token`` waits for it when
+        needed. Phase timings are available in ``login_timings``.
+
         Args:
             enable_auto_reconnect: Whether to enable automatic reconnection on disconnect
         """
-        session = await self.get_session()
-        await self.initialize_managers(session)
+        timer = PhaseTimer()
+        self.login_timings = timer
+
+        with timer.phase("authenticate"):
+            session = await self.get_session()
+
+        self._ensure_wallet_clients()
+        self.zk_proof = None
+        if self.mmn_client and self.zk_client:
+            self._start_zk_setup(session.id_token)
 
-        self.ephemeral_key_pair = self.get_ephemeral_key_pair()
-        self.address = self.get_address_from_user_id(self.client_id)
-        self.zk_proof = await self.get_zk_proof()
+        with timer.phase("initialize_managers"):
+            await self.initialize_managers(session, timer)
+        logger.info(f"Login completed in {timer.elapsed_ms:.0f} ms")
 
         self._enable_auto_reconnect = enable_auto_reconnect
         self._is_hard_disconnect = False
@@ -436,7 +908,7 @@ class MezonClient:
         if enable_auto_reconnect:
             self._setup_reconnect_handlers()
 
-    def get_ephemeral_key_pair(self) -> EphemeralKeyPair:
+    def get_ephemeral_key_pair(self) -> "EphemeralKeyPair":
         """
         Generate an ephemeral key pair for secure transactions.
 
@@ -467,10 +939,13 @@ class MezonClient:
             return self.mmn_client.get_address_from_user_id(user_id)
         raise ValueError("MMN client not initialized!")
 
-    async def get_zk_proof(self) -> ZkProof:
+    async def get_zk_proof(self, jwt: str | None = None) -> "ZkProof":
         """
         Get a zero-knowledge proof for the current session.
 
+        Args:
+            jwt (str | None): ID token to prove (default: the active session's).
+
         Returns:
             ZkProof: The zero-knowledge proof.
 
@@ -478,15 +953,67 @@ class MezonClient:
             ValueError: If ZK client is not initialized.
         """
         if self.zk_client:
+            from mmn import ZkClientType
+
             return await self.zk_client.get_zk_proofs(
                 user_id=self.client_id,
                 ephemeral_public_key=self.ephemeral_key_pair.public_key,
-                jwt=self.session_manager.get_session().id_token,
+                jwt=jwt or self.session_manager.get_session().id_token,
                 address=self.address,
                 client_type=ZkClientType.MEZON,
             )
         raise ValueError("ZK client not initialized!")
 
+    def _start_zk_setup(self, jwt: str | None) -> asyncio.Task:
+        """
+        Start generating the ephemeral key pair, address and ZK proof in the background.
+
+        Args:
+            jwt: ID token to prove
+
+        Returns:
+            The background task
+        """
+
+        async def setup() -> "ZkProof":
+            timer = self.login_timings or PhaseTimer()
+            with timer.phase("zk_keys"):
+                self.ephemeral_key_pair = self.get_ephemeral_key_pair()
+                self.address = self.get_address_from_user_id(self.client_id)
+            with timer.phase("zk_proof"):
+                self.zk_proof = await self.get_zk_proof(jwt)
+            return self.zk_proof
+
+        def log_failure(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception():
+                logger.warning(f"Background ZK setup failed: {task.exception()}")
+
+        self._zk_task = asyncio.create_task(setup())
+        self._zk_task.add_done_callback(log_failure)
+        return self._zk_task
+
+    async def ensure_zk_proof(self) -> "ZkProof":
+        """
+        Wait for the ZK proof prepared at login, retrying the setup if it failed.
+
+        Returns:
+            ZkProof: The zero-knowledge proof.
+
+        Raises:
+            ValueError: If MMN or ZK client is not initialized.
+        """
+        if self.zk_proof is not None:
+            return self.zk_proof
+        task = self._zk_task
+        if task is None or (
+            task.done() and (task.cancelled() or task.exception() is not None)
+        ):
+            jwt = None
+            if hasattr(self, "session_manager"):
+                jwt = self.session_manager.get_session().id_token
+            task = self._start_zk_setup(jwt)
+        return await asyncio.shield(task)
+
     async def get_current_nonce(
         self, user_id: str, tag: Literal["latest", "pending"] = "latest"
     ) -> int:
@@ -510,7 +1037,7 @@ class MezonClient:
             )
         raise ValueError("MMN client not initialized!")
 
-    async def send_token(self, token_event: ApiSentTokenRequest) -> AddTxResponse:
+    async def send_token(self, token_event: ApiSentTokenRequest) -> "AddTxResponse":
         """
         Send tokens to another user.
 
@@ -526,6 +1053,9 @@ class MezonClient:
         if not self.mmn_client:
             raise ValueError("MMN client not initialized")
 
+        from mmn import ExtraInfo, SendTransactionRequest, TransferType
+
+        zk_proof = await self.ensure_zk_proof()
         sender_id = self.client_id
         receiver_id = token_event.receiver_id
 
@@ -546,8 +1076,8 @@ class MezonClient:
             extra_info=extra_info,
             public_key=self.ephemeral_key_pair.public_key,
             private_key=self.ephemeral_key_pair.private_key,
-            zk_proof=self.zk_proof.proof,
-            zk_pub=self.zk_proof.public_input,
+            zk_proof=zk_proof.proof,
+            zk_pub=zk_proof.public_input,
         )
 
         logger.debug(f"Sending transaction: {tx_request}")
@@ -564,6 +1094,172 @@ class MezonClient:
         """
         self.event_manager.on(event_name, handler)
 
+    async def wait_for(
+        self,
+        event: str,
+        predicate: Callable[[Any], bool] | None = None,
+        *,
+        channel_id: int | None = None,
+        user_id: int | None = None,
+        timeout: float | None = None,
+    ) -> Any:
+        """
+        Wait for the next event payload matching the given filters.
+
+        Example:
+            await channel.send(ChannelMessageContent(t="Continue? (yes/no)"))
+            reply = await client.wait_for(
+                Events.CHANNEL_MESSAGE,
+                lambda m: m.content.get("t") in ("yes", "no"),
+                channel_id=channel.id,
+                user_id=user_id,
+                timeout=30,
+            )
+
+        Args:
+            event: Event name to wait for
+            predicate: Extra check on the payload
+            channel_id: Only match payloads from this channel
+            user_id: Only match payloads from this sender/user
+            timeout: Seconds to wait before raising ``asyncio.TimeoutError``
+
+        Returns:
+            The matching payload
+
+        Raises:
+            asyncio.TimeoutError: If no matching payload arrived in time
+        """
+        return await self.event_manager.waiters.wait_for(
+            event,
+            predicate,
+            channel_id=channel_id,
+            user_id=user_id,
+            timeout=timeout,
+        )
+
+    def stream(
+        self,
+        event: str,
+        clan_id: int | None = None,
+        channel_id: int | None = None,
+        buffer: int = 1000,
+        overflow: StreamOverflow | str = StreamOverflow.DROP_OLDEST,
+    ) -> EventStream:
+        """
+        Stream an event's payloads through a bounded buffer.
+
+        Example:
+            async with client.stream(Events.CHANNEL_MESSAGE, channel_id=1) as messages:
+                async for message in messages:
+                    print(message.content)
+
+        Args:
+            event: Event name to stream
+            clan_id: Only deliver payloads from this clan
+            channel_id: Only deliver payloads from this channel
+            buffer: Maximum number of buffered payloads
+            overflow: Policy when the buffer is full; ``drop_oldest`` discards
+                the oldest payload and counts it in ``stream.dropped``
+
+        Returns:
+            Async iterator of payloads; close it (or leave ``async with``) to unsubscribe
+        """
+        return self.event_manager.subscribe(
+            event,
+            clan_id=clan_id,
+            channel_id=channel_id,
+            buffer=buffer,
+            overflow=overflow,
+        )
+
+    def command(
+        self,
+        name: str,
+        aliases: list[str] | tuple[str, ...] = (),
+        clan_ids: list[int] | None = None,
+        channel_ids: list[int] | None = None,
+    ) -> Callable[[Callable[[CommandContext], Any]], Callable[[CommandContext], Any]]:
+        """
+        Decorator registering a command handler.
+
+        Commands are matched against the text of incoming channel messages
+        using ``command_prefix``. Handlers receive a ``CommandContext`` with the
+        decoded message and lazily parsed arguments.
+
+        Example:
+            @client.command("ping", aliases=["p"])
+            async def ping(ctx: CommandContext):
+                print(ctx.args)
+
+        Args:
+            name: Command name without prefix (may contain spaces, e.g. ``"role add"``)
+            aliases: Alternative names
+            clan_ids: Clans where the command is enabled (default: all)
+            channel_ids: Channels where the command is enabled (default: all)
+
+        Returns:
+            Decorator registering the handler and returning it unchanged
+        """
+
+        def decorator(
+            handler: Callable[[CommandContext], Any],
+        ) -> Callable[[CommandContext], Any]:
+            async def wrapper(context: CommandContext) -> None:
+                await self._invoke_handler(handler, context)
+
+            self.command_router.add(name, wrapper, aliases, clan_ids, channel_ids)
+            return handler
+
+        return decorator
+
+    async def start_worker_pool(
+        self,
+        handlers: dict[str, list[WorkerHandler] | WorkerHandler],
+        processes: int | None = None,
+    ) -> WorkerPool:
+        """
+        Handle selected events in a pool of worker processes.
+
+        This process keeps the websocket and forwards the raw envelopes of the
+        given events to the workers, which decode them and run the handlers.
+        Handlers are called as ``handler(payload, ctx)`` and send replies
+        through ``ctx`` (a ``WorkerContext``); the sends are executed here, so
+        rate limits stay shared across workers. Handlers registered with
+        ``on()`` for the same events still run in this process.
+
+        Args:
+            handlers: Mapping of event name to a module-level handler or list of handlers
+            processes: Number of worker processes (default: CPU count)
+
+        Returns:
+            The running worker pool
+
+        Raises:
+            RuntimeError: If the client is not logged in or a pool is already running
+        """
+        if not hasattr(self, "socket_manager"):
+            raise RuntimeError("Client must be logged in before starting workers")
+        if self.worker_pool and self.worker_pool.is_running:
+            raise RuntimeError("Worker pool is already running")
+
+        self.worker_pool = WorkerPool(
+            socket_manager=self.socket_manager,
+            handlers=handlers,
+            processes=processes,
+        )
+        self.worker_pool.start()
+        self.socket_manager.get_socket().envelope_forwarder = self.worker_pool.forward
+        return self.worker_pool
+
+    async def stop_worker_pool(self) -> None:
+        """Stop forwarding events and shut down the worker processes."""
+        if not self.worker_pool:
+            return
+        if hasattr(self, "socket_manager"):
+            self.socket_manager.get_socket().envelope_forwarder = None
+        await self.worker_pool.stop()
+        self.worker_pool = None
+
     def _register_event_handler(self, event_name: str, handler: EventHandler) -> None:
         """
         Register an event handler with automatic async wrapper.
@@ -608,17 +1304,7 @@ class MezonClient:
 
         clan = self.clans.get(clan_id)
         if not clan:
-            clans_response = await self.api_client.list_clans_descs(token=session.token)
-            clan_desc = None
-            for desc in (
-                clans_response.clandesc
-                if clans_response and clans_response.clandesc
-                else []
-            ):
-                if desc.clan_id == clan_id:
-                    clan_desc = desc
-                    break
-
+            clan_desc = await self._resolve_clan_desc(clan_id)
             if clan_desc:
                 clan = Clan(
                     clan_id=clan_desc.clan_id,
@@ -643,15 +1329,206 @@ class MezonClient:
         self.channels.set(channel_id, channel)
         return channel
 
+    async def _resolve_clan_desc(self, clan_id: int) -> ApiClanDesc | None:
+        """
+        Find the description of a clan through the clan directory.
+
+        Reloads the clan list only if the directory does not know the clan.
+        Only clans the bot belongs to are ever returned.
+
+        Args:
+            clan_id: Clan ID
+
+        Returns:
+            The clan description, or None if the bot is not in the clan
+        """
+        clan_desc = self.clan_directory.get(clan_id)
+        if clan_desc is not None:
+            return clan_desc
+
+        clans_response = await self.api_client.list_clans_descs(
+            token=self.session_manager.get_session().token
+        )
+        self.clan_directory.add_many(clans_response.clandesc if clans_response else [])
+        return self.clan_directory.get(clan_id)
+
+    async def broadcast(
+        self,
+        content: ChannelMessageContent | dict,
+        channel_ids: list[int],
+        *,
+        concurrency: int = DEFAULT_BROADCAST_CONCURRENCY,
+        retries: int = DEFAULT_BROADCAST_RETRIES,
+        rate_limiter: AsyncLimiter | None = None,
+        on_progress: Callable[[int, int, BroadcastResult], Any] | None = None,
+        **send_options: Any,
+    ) -> BroadcastReport:
+        """
+        Send the same message to many channels.
+
+        The content is serialized once and every channel is resolved before
+        the first send. The sends are then pipelined, with up to
+        ``concurrency`` messages awaiting their ack at a time. Failed sends are
+        retried with backoff under the same message ID, so a retry after a
+        lost ack is not delivered twice.
+
+        Example:
+            report = await client.broadcast(
+                ChannelMessageContent(t="Maintenance at 22:00"),
+                channel_ids,
+                on_progress=lambda done, total, result: print(done, total),
+            )
+            print(report.stats()["p95_ms"], [r.channel_id for r in report.failed])
+
+        Args:
+            content: Message content
+            channel_ids: Channels to send to
+            concurrency: Maximum number of sends awaiting an ack
+            retries: Extra attempts for a failed send
+            rate_limiter: Limiter every send attempt is acquired from
+            on_progress: Called as ``on_progress(done, total, result)`` after
+                each channel completes; may be async
+            **send_options: Extra arguments for ``TextChannel.send`` such as
+                ``mentions`` or ``attachments``
+
+        Returns:
+            Per-channel results with throughput and ack latency percentiles.
+            Channels that could not be resolved fail with the lookup error.
+        """
+        serialized = ChannelMessageBuilder._prepare_content(content)
+        channel_ids = list(dict.fromkeys(channel_ids))
+        lookups = await asyncio.gather(
+            *(self.get_channel_from_id(channel_id) for channel_id in channel_ids),
+            return_exceptions=True,
+        )
+        channels: dict[int, TextChannel] = {}
+        unresolved: list[BroadcastResult] = []
+        for channel_id, lookup in zip(channel_ids, lookups):
+            if isinstance(lookup, BaseException):
+                logger.warning(f"Broadcast channel {channel_id} not found: {lookup}")
+                unresolved.append(
+                    BroadcastResult(channel_id=channel_id, error=lookup, attempts=1)
+                )
+            else:
+                channels[channel_id] = lookup
+
+        async def send(channel_id: int, message_id: int) -> Any:
+            return await channels[channel_id].send(
+                serialized, message_id=message_id, **send_options
+            )
+
+        report = await fan_out(
+            send,
+            list(channels),
+            concurrency=concurrency,
+            retries=retries,
+            rate_limiter=rate_limiter,
+            on_progress=on_progress,
+        )
+        if unresolved:
+            position = {channel_id: i for i, channel_id in enumerate(channel_ids)}
+            report.results.extend(unresolved)
+            report.results.sort(key=lambda result: position[result.channel_id])
+        stats = report.stats()
+        logger.info(
+            f"Broadcast to {len(report.results)} channels: {stats['sent']} sent, "
+            f"{stats['failed']} failed, {stats['throughput']:.1f} msg/s, "
+            f"p50 {stats['p50_ms']:.0f} ms, p99 {stats['p99_ms']:.0f} ms"
+        )
+        return report
+
+    async def send_dm_bulk(
+        self,
+        user_ids: list[int],
+        content: ChannelMessageContent | dict,
+        *,
+        concurrency: int = DEFAULT_BROADCAST_CONCURRENCY,
+        create_concurrency: int = DEFAULT_DM_CREATE_CONCURRENCY,
+        retries: int = DEFAULT_BROADCAST_RETRIES,
+        rate_limiter: AsyncLimiter | None = None,
+        on_progress: Callable[[int, int, BroadcastResult], Any] | None = None,
+        code: int = TypeMessage.CHAT,
+        attachments: list[ApiMessageAttachment] | None = None,
+    ) -> BroadcastReport:
+        """
+        Send the same direct message to many users.
+
+        DM channels already known from the DM channel map are reused. The
+        missing ones are created first, with at most ``create_concurrency``
+        creation requests in flight under the API rate limiter, and are added
+        to the map. The messages are then pipelined as in ``broadcast``.
+
+        Args:
+            user_ids: Users to message
+            content: Message content
+            concurrency: Maximum number of sends awaiting an ack
+            create_concurrency: Maximum number of DM channel creations in flight
+            retries: Extra attempts for a failed send
+            rate_limiter: Limiter every send attempt is acquired from
+            on_progress: Called as ``on_progress(done, total, result)`` after
+                each message completes; may be async
+            code: Message type code
+            attachments: Attachments of the message
+
+        Returns:
+            One result per user, with ``user_id`` set. Users whose DM channel
+            could not be created have ``channel_id`` 0 and the creation error.
+        """
+        serialized = ChannelMessageBuilder._prepare_content(content)
+        user_ids = list(dict.fromkeys(user_ids))
+        known = len(self.channel_manager.get_all_dm_channels() or {})
+        dm_channels, errors = await self.channel_manager.ensure_dm_channels(
+            user_ids, concurrency=create_concurrency
+        )
+        if len(self.channel_manager.get_all_dm_channels() or {}) > known:
+            await self.save_snapshot()
+
+        mode = convert_channeltype_to_channel_mode(ChannelType.CHANNEL_TYPE_DM)
+
+        async def send(channel_id: int, message_id: int) -> Any:
+            return await self.socket_manager.write_chat_message(
+                clan_id=0,
+                channel_id=channel_id,
+                mode=mode,
+                is_public=False,
+                content=serialized,
+                code=code,
+                attachments=attachments,
+                message_id=message_id,
+            )
+
+        report = await fan_out(
+            send,
+            [dm_channels[user_id] for user_id in user_ids if user_id in dm_channels],
+            concurrency=concurrency,
+            retries=retries,
+            rate_limiter=rate_limiter,
+            on_progress=on_progress,
+        )
+        user_by_channel = {
+            channel_id: user_id for user_id, channel_id in dm_channels.items()
+        }
+        for result in report.results:
+            result.user_id = user_by_channel.get(result.channel_id)
+        report.results.extend(
+            BroadcastResult(channel_id=0, user_id=user_id, error=error, attempts=1)
+            for user_id, error in errors.items()
+        )
+        logger.info(
+            f"DM broadcast to {len(user_ids)} users: {len(report.succeeded)} sent, "
+            f"{len(report.failed)} failed"
+        )
+        return report
+
     async def get_user_from_id(self, user_id: int) -> User:
-        dm_channel = await self.channel_manager.create_dm_channel(user_id)
-        if not dm_channel or not dm_channel.channel_id:
+        dm_channel_id = await self.channel_manager.ensure_dm_channel(user_id)
+        if not dm_channel_id:
             raise ValueError(f"User {user_id} not found in this clan {self.client_id}!")
 
         user = User(
             user_init_data=UserInitData(
                 sender_id=user_id,
-                dm_channel_id=dm_channel.channel_id,
+                dm_channel_id=dm_channel_id,
             ),
             socket_manager=self.socket_manager,
             channel_manager=self.channel_manager,
@@ -896,6 +1773,46 @@ class MezonClient:
         """
         self._register_event_handler(Events.CHANNEL_MESSAGE, handler)
 
+    def on_channel_message_batch(
+        self,
+        handler: Callable[[list[ChannelMessage]], Any],
+        max_items: int = 64,
+        max_delay_ms: float = 50,
+        key: Callable[[ChannelMessage], Any] | None = None,
+    ) -> EventBatcher:
+        """
+        Register a handler that receives channel messages in batches.
+
+        Messages are grouped by ``key`` and the handler is called once per
+        batch, when it holds ``max_items`` messages or its oldest message has
+        waited ``max_delay_ms``. Pending batches are flushed on ``disconnect()``.
+
+        Example:
+            batcher = client.on_channel_message_batch(
+                summarize, max_items=32, max_delay_ms=100, key=lambda m: m.channel_id
+            )
+            print(batcher.get_metrics()["batch_size"])
+
+        Args:
+            handler (Callable): Callback receiving a list of messages.
+            max_items (int): Maximum messages per batch.
+            max_delay_ms (float): Maximum wait of the oldest message in a batch.
+            key (Callable | None): Groups messages into separate batches.
+
+        Returns:
+            EventBatcher: The batcher, exposing batch size and latency histograms.
+        """
+
+        async def run(batch: list[ChannelMessage]) -> None:
+            await self._invoke_handler(handler, batch)
+
+        batcher = EventBatcher(
+            run, max_items=max_items, max_delay_ms=max_delay_ms, key=key
+        )
+        self._batchers.append(batcher)
+        self.event_manager.on(Events.CHANNEL_MESSAGE, batcher.add)
+        return batcher
+
     @auto_bind(Events.CHANNEL_MESSAGE)
     async def _handle_channel_message_default(self, message: ChannelMessage) -> None:
         """
@@ -909,6 +1826,21 @@ class MezonClient:
         """
         await self._init_channel_message_cache(message)
         await self._init_user_clan_cache(message)
+        self._index_message_sender(message)
+
+    def _index_message_sender(self, message: ChannelMessage) -> None:
+        """Add the sender of a message to its clan's member index."""
+        clan = self.clans.get(message.clan_id)
+        if clan is None or message.sender_id in clan.members:
+            return
+        clan.members.upsert(
+            message.sender_id,
+            username=message.username,
+            display_name=message.display_name,
+            avatar=message.avatar,
+            clan_nick=message.clan_nick,
+            clan_avatar=message.clan_avatar,
+        )
 
     def on_channel_created(
         self,
@@ -922,6 +1854,15 @@ class MezonClient:
         """
         self._register_event_handler(Events.CHANNEL_CREATED, handler)
 
+    def on_session_refreshed(self, handler: Callable[[Session], None]) -> None:
+        """
+        Register a user-defined handler for session refreshes.
+
+        Args:
+            handler (Callable): Callback receiving the refreshed ``Session``.
+        """
+        self._register_event_handler(Events.SESSION_REFRESHED, handler)
+
     @auto_bind(Events.CHANNEL_CREATED)
     async def _handle_channel_created_default(
         self,
@@ -1072,6 +2013,63 @@ class MezonClient:
         """
         for user_id in message.user_ids:
             self.users.delete(user_id)
+        clan = self.clans.get(message.clan_id)
+        if clan:
+            for user_id in message.user_ids:
+                clan.members.remove(user_id)
+        if self.client_id in message.user_ids:
+            self._forget_clan(message.clan_id)
+
+    def _forget_clan(self, clan_id: int) -> None:
+        """Drop a clan the bot no longer belongs to from the directory and cache."""
+        self.clan_directory.remove(clan_id)
+        self.clans.delete(clan_id)
+        if self.voice_presence:
+            self.voice_presence.forget_clan(clan_id)
+
+    def on_clan_updated(self, handler: Callable[[ClanUpdatedEvent], None]) -> None:
+        """
+        Register a user-defined handler for clan updated events.
+
+        Args:
+            handler (Callable): Callback to invoke when a clan is updated.
+        """
+        self._register_event_handler(Events.CLAN_UPDATED, handler)
+
+    @auto_bind(Events.CLAN_UPDATED)
+    async def _handle_clan_updated_default(self, message: ClanUpdatedEvent) -> None:
+        """
+        Default handler for clan updated events.
+
+        Keeps the clan directory and the cached ``Clan`` in sync.
+        """
+        clan_desc = self.clan_directory.apply_update(message)
+        clan = self.clans.get(message.clan_id)
+        if clan and clan_desc:
+            clan.name = clan_desc.clan_name
+            clan.welcome_channel_id = clan_desc.welcome_channel_id
+
+    def on_clan_deleted(
+        self, handler: Callable[[realtime_pb2.ClanDeletedEvent], None]
+    ) -> None:
+        """
+        Register a user-defined handler for clan deleted events.
+
+        Args:
+            handler (Callable): Callback to invoke when a clan is deleted.
+        """
+        self._register_event_handler(Events.CLAN_DELETED, handler)
+
+    @auto_bind(Events.CLAN_DELETED)
+    async def _handle_clan_deleted_default(
+        self, message: realtime_pb2.ClanDeletedEvent
+    ) -> None:
+        """
+        Default handler for clan deleted events.
+
+        Removes the clan from the directory and the clan cache.
+        """
+        self._forget_clan(message.clan_id)
 
     def on_user_channel_added(
         self, handler: Callable[[realtime_pb2.UserChannelAdded], None]
@@ -1093,8 +2091,25 @@ class MezonClient:
         Default handler for ``UserChannelAdded`` events.
 
         Automatically joins channels when the current client is added, keeping
-        the socket subscription state in sync.
+        the socket subscription state in sync, and records new DM channels in
+        the DM channel map.
         """
+        channel_desc = message.channel_desc
+        if (
+            channel_desc
+            and channel_desc.type == ChannelType.CHANNEL_TYPE_DM
+            and channel_desc.channel_id
+        ):
+            peers = [
+                user.user_id
+                for user in [*message.users, message.caller]
+                if user and user.user_id and user.user_id != self.client_id
+            ]
+            if peers:
+                await self.channel_manager.record_dm_channels(
+                    {peers[0]: channel_desc.channel_id}
+                )
+
         if message.users:
             for user in message.users:
                 if user.user_id == self.client_id:
@@ -1234,6 +2249,56 @@ class MezonClient:
         """
         self._register_event_handler(Events.VOICE_LEAVED_EVENT, handler)
 
+    @auto_bind(Events.VOICE_STARTED_EVENT)
+    async def _handle_voice_started_default(
+        self, message: realtime_pb2.VoiceStartedEvent
+    ) -> None:
+        """Default handler for voice started events: tracks the call."""
+        if self.voice_presence is None:
+            return
+        self.voice_presence.start_channel(message.clan_id, message.voice_channel_id)
+        self.voice_presence.request_seed(message.clan_id)
+
+    @auto_bind(Events.VOICE_ENDED_EVENT)
+    async def _handle_voice_ended_default(
+        self, message: realtime_pb2.VoiceEndedEvent
+    ) -> None:
+        """Default handler for voice ended events: empties the channel."""
+        if self.voice_presence is None:
+            return
+        if str(message.voice_channel_id).isdigit():
+            self.voice_presence.end_channel(
+                message.clan_id, int(message.voice_channel_id)
+            )
+        self.voice_presence.request_seed(message.clan_id)
+
+    @auto_bind(Events.VOICE_JOINED_EVENT)
+    async def _handle_voice_joined_default(
+        self, message: realtime_pb2.VoiceJoinedEvent
+    ) -> None:
+        """Default handler for voice joined events: tracks the participant."""
+        if self.voice_presence is None:
+            return
+        self.voice_presence.join(
+            message.clan_id, message.voice_channel_id, message.user_id, message.id
+        )
+        self.voice_presence.request_seed(message.clan_id)
+
+    @auto_bind(Events.VOICE_LEAVED_EVENT)
+    async def _handle_voice_leaved_default(
+        self, message: realtime_pb2.VoiceLeavedEvent
+    ) -> None:
+        """Default handler for voice left events: drops the participant."""
+        if self.voice_presence is None:
+            return
+        self.voice_presence.leave(
+            message.clan_id,
+            message.voice_channel_id,
+            message.voice_user_id,
+            message.id,
+        )
+        self.voice_presence.request_seed(message.clan_id)
+
     def on_quick_menu_event(self, handler: Callable[[Any], None]) -> None:
         """
         Register a user-defined handler for quick menu events.
@@ -1298,6 +2363,54 @@ class MezonClient:
         """
         self._register_event_handler(Events.ROLE_ASSIGN, handler)
 
+    @auto_bind(Events.ROLE_ASSIGN)
+    async def _handle_role_assign_default(
+        self, message: realtime_pb2.RoleAssignedEvent
+    ) -> None:
+        """
+        Default handler for role assignment events.
+
+        Keeps the role index of the clan's members current.
+        """
+        clan = self.clans.get(int(message.ClanId or 0))
+        if clan:
+            clan.members.add_role(message.role_id, message.user_ids_assigned)
+            clan.members.remove_role(message.role_id, message.user_ids_removed)
+
+    def on_user_profile_updated(
+        self, handler: Callable[[UserProfileUpdatedEvent], None]
+    ) -> None:
+        """
+        Register a user-defined handler for user profile updates.
+
+        Args:
+            handler (Callable): Callback to invoke when a user changes their
+                display name or avatar.
+        """
+        self._register_event_handler(Events.USER_PROFILE_UPDATED, handler)
+
+    @auto_bind(Events.USER_PROFILE_UPDATED)
+    async def _handle_user_profile_updated_default(
+        self, message: UserProfileUpdatedEvent
+    ) -> None:
+        """
+        Default handler for user profile updates.
+
+        Updates the user in the member index of every cached clan.
+        """
+        clans = (
+            [self.clans.get(message.clan_id)]
+            if message.clan_id
+            else list(self.clans.values())
+        )
+        for clan in clans:
+            if clan and message.user_id in clan.members:
+                clan.members.upsert(
+                    message.user_id,
+                    display_name=message.display_name,
+                    avatar=message.avatar,
+                )
+
     def on_notification(
         self, handler: Callable[[realtime_pb2.Notifications], None]
     ) -> None:
@@ -1345,6 +2458,8 @@ class MezonClient:
         if message.user and message.user.user_id == self.client_id:
             socket = self.socket_manager.get_socket()
             await socket.join_clan_chat(message.clan_id)
+            if message.clan_id not in self.clan_directory:
+                self.clan_directory.add(ApiClanDesc(clan_id=message.clan_id))
 
             clan = self.clans.get(message.clan_id)
             if not clan:
@@ -1362,6 +2477,15 @@ class MezonClient:
                 self.clans.set(message.clan_id, clan_obj)
             return
 
+        clan = self.clans.get(message.clan_id)
+        if clan and message.user:
+            clan.members.upsert(
+                message.user.user_id,
+                username=message.user.username,
+                display_name=message.user.display_name,
+                avatar=message.user.avatar,
+            )
+
         user_init_data = UserInitData(
             id=message.user.user_id if message.user else 0,
             username=message.user.username if message.user else "",
@@ -1382,7 +2506,8 @@ class MezonClient:
 
     async def close_socket(self) -> None:
         await self.socket_manager.get_socket().close()
-        self.event_manager = EventManager()
+        self.event_manager.shutdown()
+        self.event_manager = EventManager(**self._event_manager_options)
 
     def _setup_reconnect_handlers(self) -> None:
         """Setup event handlers for automatic reconnection."""
@@ -1480,7 +2605,24 @@ class MezonClient:
             except (asyncio.CancelledError, RuntimeError, Exception):
                 pass
 
+        if hasattr(self, "session_manager"):
+            self.session_manager.stop_auto_refresh()
+        if hasattr(self, "channel_manager"):
+            self.channel_manager.stop()
+        if self._zk_task and not self._zk_task.done():
+            self._zk_task.cancel()
+        if self._snapshot_task and not self._snapshot_task.done():
+            self._snapshot_task.cancel()
+        await self.save_snapshot()
+        await self.signals.close()
+        if self.outbox:
+            await self.outbox.stop()
+        if self.voice_presence:
+            await self.voice_presence.stop()
         await self.disconnect_ai_agent_sse()
+        for batcher in self._batchers:
+            await batcher.flush()
+        await self.stop_worker_pool()
         await self.close_socket()
         await self.message_db.close()
         logger.info("Client disconnected")
@@ -6,9 +6,11 @@ from .enum import (
     ChannelStreamMode,
     ChannelType,
     Events,
+    HandlerExecutor,
     InternalAgentEvents,
     InternalEventsSocket,
     SSEConnectionState,
     SSEEvents,
+    StreamOverflow,
     TypeMessage,
 )
@@ -29,6 +29,7 @@ class InternalEventsSocket(str, Enum):
     CHANNEL_UPDATED_EVENT = "channel_updated_event"
     CLAN_PROFILE_UPDATED_EVENT = "clan_profile_updated_event"
     CLAN_UPDATED_EVENT = "clan_updated_event"
+    CLAN_DELETED_EVENT = "clan_deleted_event"
     STATUS_PRESENCE_EVENT = "status_presence_event"
     STREAM_PRESENCE_EVENT = "stream_presence_event"
     STREAM_DATA = "stream_data"
@@ -83,9 +84,18 @@ class Events(str, Enum):
     # Listen to user removed from the channel
     USER_CHANNEL_REMOVED = InternalEventsSocket.USER_CHANNEL_REMOVED_EVENT.value
 
+    # Listen to clan name, logo or settings updated
+    CLAN_UPDATED = InternalEventsSocket.CLAN_UPDATED_EVENT.value
+
+    # Listen to clan deleted
+    CLAN_DELETED = InternalEventsSocket.CLAN_DELETED_EVENT.value
+
     # Listen to user leaved/removed in the clan
     USER_CLAN_REMOVED = InternalEventsSocket.USER_CLAN_REMOVED_EVENT.value
 
+    # Listen to user display name or avatar updated
+    USER_PROFILE_UPDATED = InternalEventsSocket.USER_PROFILE_UPDATED_EVENT.value
+
     # Listen to user added in the channel
     USER_CHANNEL_ADDED = InternalEventsSocket.USER_CHANNEL_ADDED_EVENT.value
 
@@ -152,6 +162,9 @@ class Events(str, Enum):
     # Listen to AI agent enabled event
     AI_AGENT_ENABLE = InternalEventsSocket.AI_AGENT_ENABLE.value
 
+    # Listen to the client's session token being refreshed (emitted by the SDK)
+    SESSION_REFRESHED = "session_refreshed"
+
     # Listen to agent session started (SSE — routing key, not the SSE payload event_type)
     AI_AGENT_SESSION_STARTED = InternalAgentEvents.SESSION_STARTED.value
 
@@ -211,6 +224,26 @@ class TypeMessage(IntEnum):
     POLL = 18
 
 
+class HandlerExecutor(str, Enum):
+    """Where synchronous event handlers are executed"""
+
+    # Run on the event loop thread (blocks the websocket reader while running)
+    INLINE = "inline"
+
+    # Run in a thread pool shared by every sync handler
+    SHARED = "shared"
+
+    # Run in a single-thread pool owned by each handler (preserves per-handler order)
+    DEDICATED = "dedicated"
+
+
+class StreamOverflow(str, Enum):
+    """What an event stream does when its buffer is full"""
+
+    # Discard the oldest buffered event and count it as dropped
+    DROP_OLDEST = "drop_oldest"
+
+
 class SSEEvents(str, Enum):
     """Events for SSE (Server-Sent Events) connection lifecycle"""
 
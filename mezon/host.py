@@ -0,0 +1,218 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Optional
+
+import aiohttp
+from aiolimiter import AsyncLimiter
+
+from mezon.client import (
+    DEFAULT_MMN_API,
+    DEFAULT_TIMEOUT_MS,
+    DEFAULT_ZK_API,
+    MezonClient,
+)
+from mezon.messages.db import MessageDB
+from mezon.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from mmn import MmnClient, ZkClient
+
+logger = get_logger(__name__)
+
+DEFAULT_HOST_DB_PATH = "./mezon-cache/mezon-host-messages-cache.db"
+
+
+class MezonHost:
+    """
+    Run many bot identities in one process.
+
+    Every bot keeps its own socket, caches and API rate limiter, while the
+    host shares the HTTP connection pool, the MMN/ZK clients and a single
+    SQLite message store (one table per bot) between them. Logins are
+    staggered through a concurrency limit so a large fleet does not hit
+    the auth endpoint all at once.
+
+    Example:
+        async with MezonHost() as host:
+            support = host.add_bot(SUPPORT_BOT_ID, SUPPORT_API_KEY)
+            support.on_channel_message(handle_support)
+            await host.start()
+    """
+
+    def __init__(
+        self,
+        message_db_path: str = DEFAULT_HOST_DB_PATH,
+        timeout: int = DEFAULT_TIMEOUT_MS,
+        mmn_api_url: str = DEFAULT_MMN_API,
+        zk_api_url: str = DEFAULT_ZK_API,
+        connection_limit: int = 100,
+        login_concurrency: int = 5,
+        **client_options: Any,
+    ):
+        """
+        Initialize the host.
+
+        Args:
+            message_db_path: Path of the shared SQLite message store
+            timeout: Request timeout in milliseconds for every bot
+            mmn_api_url: The URL for the MMN API
+            zk_api_url: The URL for the ZK API
+            connection_limit: Maximum open connections in the shared HTTP pool
+            login_concurrency: Number of bots logging in at the same time
+            **client_options: Default keyword arguments for every ``MezonClient``
+        """
+        self.timeout_ms = timeout
+        self.mmn_api_url = mmn_api_url
+        self.zk_api_url = zk_api_url
+        self.connection_limit = connection_limit
+        self.login_concurrency = login_concurrency
+        self.client_options = client_options
+        self.message_db = MessageDB(message_db_path)
+        self.mmn_client: Optional["MmnClient"] = None
+        self.zk_client: Optional["ZkClient"] = None
+        if mmn_api_url or zk_api_url:
+            from mmn import MmnClient, MmnClientConfig, ZkClient, ZkClientConfig
+
+            if mmn_api_url:
+                self.mmn_client = MmnClient(
+                    MmnClientConfig(base_url=mmn_api_url, timeout=timeout)
+                )
+            if zk_api_url:
+                self.zk_client = ZkClient(
+                    ZkClientConfig(endpoint=zk_api_url, timeout=timeout)
+                )
+        self.bots: dict[int, MezonClient] = {}
+        self.http_session: Optional[aiohttp.ClientSession] = None
+
+    def add_bot(
+        self,
+        client_id: str | int,
+        api_key: str,
+        rate_limiter: Optional[AsyncLimiter] = None,
+        **options: Any,
+    ) -> MezonClient:
+        """
+        Create a client for a bot identity and register it with the host.
+
+        Args:
+            client_id: The bot ID
+            api_key: The bot API key
+            rate_limiter: API rate limiter for this bot (default: a new limiter
+                with the same budget as ``MezonApi``)
+            **options: Keyword arguments overriding the host's client options
+
+        Returns:
+            The client, ready to register handlers on
+
+        Raises:
+            ValueError: If the bot is already registered
+        """
+        bot_id = int(client_id)
+        if bot_id in self.bots:
+            raise ValueError(f"Bot {bot_id} is already registered")
+
+        client = MezonClient(
+            client_id=bot_id,
+            api_key=api_key,
+            timeout=self.timeout_ms,
+            mmn_api_url=self.mmn_api_url,
+            zk_api_url=self.zk_api_url,
+            message_db=self.message_db.for_tenant(bot_id),
+            http_session=self.http_session,
+            api_rate_limiter=rate_limiter or AsyncLimiter(max_rate=1, time_period=1.25),
+            mmn_client=self.mmn_client,
+            zk_client=self.zk_client,
+            **{**self.client_options, **options},
+        )
+        self.bots[bot_id] = client
+        return client
+
+    def get_bot(self, client_id: str | int) -> Optional[MezonClient]:
+        """
+        Get a registered client by bot ID.
+
+        Args:
+            client_id: The bot ID
+
+        Returns:
+            The client, or None if the bot is not registered
+        """
+        return self.bots.get(int(client_id))
+
+    def _ensure_http_session(self) -> aiohttp.ClientSession:
+        """Create the shared HTTP session and hand it to every bot."""
+        if self.http_session is None or self.http_session.closed:
+            self.http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connection_limit)
+            )
+        for client in self.bots.values():
+            client.http_session = self.http_session
+        return self.http_session
+
+    async def start(
+        self, enable_auto_reconnect: bool = True
+    ) -> dict[int, Optional[Exception]]:
+        """
+        Log in every registered bot.
+
+        A bot that fails to log in does not stop the others.
+
+        Args:
+            enable_auto_reconnect: Whether bots reconnect automatically on disconnect
+
+        Returns:
+            Mapping of bot ID to the login error, or None on success
+        """
+        self._ensure_http_session()
+        semaphore = asyncio.Semaphore(self.login_concurrency)
+
+        async def login(bot_id: int, client: MezonClient) -> Optional[Exception]:
+            async with semaphore:
+                try:
+                    await client.login(enable_auto_reconnect=enable_auto_reconnect)
+                    return None
+                except Exception as e:
+                    logger.error(f"Bot {bot_id} failed to log in: {e}")
+                    return e
+
+        bot_ids = list(self.bots)
+        results = await asyncio.gather(
+            *(login(bot_id, self.bots[bot_id]) for bot_id in bot_ids)
+        )
+        started = sum(result is None for result in results)
+        logger.info(f"Host started {started}/{len(bot_ids)} bots")
+        return dict(zip(bot_ids, results))
+
+    async def stop(self) -> None:
+        """Disconnect every bot and release the shared resources."""
+        await asyncio.gather(
+            *(client.disconnect() for client in self.bots.values()),
+            return_exceptions=True,
+        )
+        await self.message_db.close()
+        if self.http_session is not None and not self.http_session.closed:
+            await self.http_session.close()
+        self.http_session = None
+        logger.info("Host stopped")
+
+    async def __aenter__(self) -> "MezonHost":
+        self._ensure_http_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
@@ -1,5 +1,60 @@
-from .cache import CacheManager, Collection
-from .channel import ChannelManager
-from .event import EventManager
-from .session import SessionManager
-from .socket import SocketManager
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .batch import EventBatcher
+    from .broadcast import BroadcastReport, BroadcastResult
+    from .cache import CacheManager, Collection
+    from .channel import ChannelManager
+    from .clan_directory import ClanDirectory
+    from .command import CommandContext, CommandRouter
+    from .dedup import DuplicateFilter
+    from .event import EventManager
+    from .members import ClanMember, ClanMemberIndex
+    from .session import SessionManager
+    from .signals import SignalCoalescer
+    from .socket import SocketManager
+    from .stream import EventStream
+    from .voice import VoicePresenceTracker
+    from .waiter import WaiterManager
+
+# Resolved on first access (PEP 562). ``mezon.socket`` imports
+# ``mezon.managers.event`` while it is still initialising; an eager package
+# init would import ``managers.socket`` -> ``mezon.socket`` at that point and
+# fail on the half-initialised module.
+_LAZY_IMPORTS = {
+    "EventBatcher": ".batch",
+    "BroadcastReport": ".broadcast",
+    "BroadcastResult": ".broadcast",
+    "CacheManager": ".cache",
+    "Collection": ".cache",
+    "ChannelManager": ".channel",
+    "ClanDirectory": ".clan_directory",
+    "CommandContext": ".command",
+    "CommandRouter": ".command",
+    "DuplicateFilter": ".dedup",
+    "EventManager": ".event",
+    "ClanMember": ".members",
+    "ClanMemberIndex": ".members",
+    "SessionManager": ".session",
+    "SignalCoalescer": ".signals",
+    "SocketManager": ".socket",
+    "EventStream": ".stream",
+    "VoicePresenceTracker": ".voice",
+    "WaiterManager": ".waiter",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+__all__ = list(_LAZY_IMPORTS)
@@ -0,0 +1,158 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from mezon.utils.logger import get_logger
+from mezon.utils.metrics import Histogram, TimingStats
+
+logger = get_logger(__name__)
+
+BATCH_SIZE_BOUNDS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+BATCH_LATENCY_BOUNDS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class _Batch:
+    __slots__ = ("items", "started", "timer")
+
+    def __init__(self, started: float):
+        self.items: list[Any] = []
+        self.started = started
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class EventBatcher:
+    """
+    Collect event payloads into per-key batches for a list handler.
+
+    A batch is flushed when it reaches ``max_items`` or when its oldest
+    payload has waited ``max_delay_ms``, whichever comes first. Batch sizes,
+    the wait of the oldest payload and handler durations are recorded so the
+    size/latency trade-off can be tuned.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[Any]], Awaitable[Any]],
+        max_items: int = 64,
+        max_delay_ms: float = 50,
+        key: Optional[Callable[[Any], Hashable]] = None,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            handler: Async callable receiving each batch as a list
+            max_items: Flush a batch once it holds this many payloads
+            max_delay_ms: Flush a batch once its oldest payload waited this long
+            key: Groups payloads into separate batches (default: one batch)
+
+        Raises:
+            ValueError: If ``max_items`` is not positive or ``max_delay_ms`` is negative
+        """
+        if max_items < 1:
+            raise ValueError("max_items must be at least 1")
+        if max_delay_ms < 0:
+            raise ValueError("max_delay_ms must not be negative")
+
+        self.handler = handler
+        self.max_items = max_items
+        self.max_delay_ms = max_delay_ms
+        self.key = key
+        self.batch_sizes = Histogram(BATCH_SIZE_BOUNDS)
+        self.batch_latency_ms = Histogram(BATCH_LATENCY_BOUNDS_MS)
+        self.handler_timing = TimingStats()
+        self._batches: dict[Hashable, _Batch] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """Number of payloads waiting in open batches."""
+        return sum(len(batch.items) for batch in self._batches.values())
+
+    async def add(self, payload: Any) -> None:
+        """
+        Add a payload to its batch, flushing the batch if it is full.
+
+        Args:
+            payload: The event payload
+        """
+        try:
+            batch_key = self.key(payload) if self.key else None
+        except Exception as e:
+            logger.error(f"Error computing batch key: {e}")
+            return
+
+        batch = self._batches.get(batch_key)
+        if batch is None:
+            loop = asyncio.get_running_loop()
+            batch = _Batch(time.perf_counter())
+            batch.timer = loop.call_later(
+                self.max_delay_ms / 1000, self._flush, batch_key
+            )
+            self._batches[batch_key] = batch
+
+        batch.items.append(payload)
+        if len(batch.items) >= self.max_items:
+            self._flush(batch_key)
+
+    def _flush(self, batch_key: Hashable) -> None:
+        """Close the batch for ``batch_key`` and run the handler on it."""
+        batch = self._batches.pop(batch_key, None)
+        if batch is None or not batch.items:
+            return
+        if batch.timer:
+            batch.timer.cancel()
+
+        self.batch_sizes.observe(len(batch.items))
+        self.batch_latency_ms.observe((time.perf_counter() - batch.started) * 1000)
+
+        task = asyncio.create_task(self._run(batch.items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: list[Any]) -> None:
+        try:
+            with self.handler_timing.time():
+                await self.handler(items)
+        except Exception as e:
+            logger.error(
+                f"Error in batch handler ({len(items)} items): {e}", exc_info=True
+            )
+
+    async def flush(self) -> None:
+        """Flush every open batch and wait for the running handlers."""
+        for batch_key in list(self._batches):
+            self._flush(batch_key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """
+        Get the batching metrics.
+
+        Returns:
+            Dict with ``batch_size`` and ``latency_ms`` histograms, handler timing
+            and the number of pending payloads
+        """
+        return {
+            "batch_size": self.batch_sizes.snapshot(),
+            "latency_ms": self.batch_latency_ms.snapshot(),
+            "handler": self.handler_timing.snapshot(),
+            "pending": self.pending,
+        }
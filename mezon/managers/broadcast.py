@@ -0,0 +1,184 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from aiolimiter import AsyncLimiter
+
+from mezon.utils.helper import generate_snowflake_id
+from mezon.utils.logger import get_logger
+from mezon.utils.metrics import TimingStats
+
+logger = get_logger(__name__)
+
+DEFAULT_BROADCAST_CONCURRENCY = 16
+DEFAULT_BROADCAST_RETRIES = 2
+DEFAULT_BROADCAST_RETRY_DELAY_S = 0.5
+
+
+@dataclass
+class BroadcastResult:
+    """Outcome of sending to one channel."""
+
+    channel_id: int
+    ack: Any = None
+    error: Optional[BaseException] = None
+    attempts: int = 0
+    latency_ms: float = 0.0
+    user_id: Optional[int] = None
+    message_id: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the message was acknowledged."""
+        return self.error is None
+
+
+@dataclass
+class BroadcastReport:
+    """Per-channel results and timing of a broadcast."""
+
+    results: list[BroadcastResult]
+    duration_s: float = 0.0
+    timing: TimingStats = field(default_factory=TimingStats)
+
+    @property
+    def succeeded(self) -> list[BroadcastResult]:
+        """Results of the channels that acknowledged the message."""
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> list[BroadcastResult]:
+        """Results of the channels that still failed after retries."""
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def throughput(self) -> float:
+        """Acknowledged messages per second."""
+        return len(self.succeeded) / self.duration_s if self.duration_s else 0.0
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the broadcast statistics as a plain dict.
+
+        Returns:
+            Dict with sent/failed counts, duration, throughput and the
+            avg/max/p50/p95/p99 ack latency in milliseconds
+        """
+        timing = self.timing.snapshot()
+        return {
+            "sent": len(self.succeeded),
+            "failed": len(self.failed),
+            "duration_s": self.duration_s,
+            "throughput": self.throughput,
+            **{
+                key: timing[key]
+                for key in ("avg_ms", "max_ms", "p50_ms", "p95_ms", "p99_ms")
+            },
+        }
+
+
+async def fan_out(
+    send: Callable[[int, int], Awaitable[Any]],
+    channel_ids: Iterable[int],
+    concurrency: int = DEFAULT_BROADCAST_CONCURRENCY,
+    retries: int = DEFAULT_BROADCAST_RETRIES,
+    retry_delay: float = DEFAULT_BROADCAST_RETRY_DELAY_S,
+    rate_limiter: Optional[AsyncLimiter] = None,
+    on_progress: Optional[Callable[[int, int, BroadcastResult], Any]] = None,
+) -> BroadcastReport:
+    """
+    Send to many channels with a bounded number of unacknowledged messages.
+
+    Up to ``concurrency`` sends wait for their ack at the same time, so the
+    round trips overlap instead of running one after another. A failed send
+    is retried with exponential backoff; the in-flight slot is released while
+    waiting. Duplicate channel IDs are sent to once.
+
+    Each channel gets one snowflake message ID that every attempt reuses, so
+    a retry after a lost ack is recognized by the server instead of
+    delivering the message twice.
+
+    Args:
+        send: Called as ``send(channel_id, message_id)``; sends the message
+            and returns its ack
+        channel_ids: Channels to send to
+        concurrency: Maximum number of sends awaiting an ack
+        retries: Extra attempts for a failed send
+        retry_delay: Delay before the first retry in seconds, doubled per retry
+        rate_limiter: Limiter every attempt is acquired from
+        on_progress: Called as ``on_progress(done, total, result)`` after each
+            channel completes; may be async
+
+    Returns:
+        The report, with results in the order of ``channel_ids``
+    """
+    ordered_ids = list(dict.fromkeys(channel_ids))
+    total = len(ordered_ids)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    timing = TimingStats(window=max(1, total))
+    done = 0
+
+    async def deliver(channel_id: int) -> BroadcastResult:
+        nonlocal done
+        result = BroadcastResult(
+            channel_id=channel_id, message_id=generate_snowflake_id()
+        )
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(retry_delay * 2 ** (attempt - 1))
+            result.attempts = attempt + 1
+            async with semaphore:
+                if rate_limiter is not None:
+                    await rate_limiter.acquire()
+                start = time.perf_counter()
+                try:
+                    result.ack = await send(channel_id, result.message_id)
+                    result.error = None
+                except Exception as e:
+                    result.error = e
+                result.latency_ms = (time.perf_counter() - start) * 1000
+            if result.ok:
+                break
+
+        timing.record(result.latency_ms, error=not result.ok)
+        if not result.ok:
+            logger.warning(
+                f"Broadcast to channel {channel_id} failed after "
+                f"{result.attempts} attempts: {result.error}"
+            )
+
+        done += 1
+        if on_progress is not None:
+            try:
+                progress = on_progress(done, total, result)
+                if inspect.isawaitable(progress):
+                    await progress
+            except Exception as e:
+                logger.error(f"Broadcast progress callback failed: {e}")
+        return result
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(deliver(channel_id) for channel_id in ordered_ids))
+    return BroadcastReport(
+        results=list(results),
+        duration_s=time.perf_counter() - start,
+        timing=timing,
+    )
@@ -1,12 +1,21 @@
-from typing import Optional
+import asyncio
+from typing import TYPE_CHECKING, Iterable, Optional
 
 import mezon.api as api
 from mezon.constants import ChannelType
 from mezon.models import ApiChannelDescription, ApiCreateChannelDescRequest
+from mezon.utils.logger import get_logger
 
 from .session import SessionManager
 from .socket import SocketManager
 
+if TYPE_CHECKING:
+    from mezon.messages.db import MessageDB
+
+logger = get_logger(__name__)
+
+DEFAULT_DM_CREATE_CONCURRENCY = 4
+
 
 class ChannelManager:
     """
@@ -21,18 +30,104 @@ class ChannelManager:
         api_client: api.MezonApi,
         socket_manager: SocketManager,
         session_manager: SessionManager,
+        dm_store: Optional["MessageDB"] = None,
+        owner_id: Optional[int] = None,
     ):
+        """
+        Initialize the channel manager.
+
+        Args:
+            api_client: API client for channel requests
+            socket_manager: Socket manager used to join created channels
+            session_manager: Session manager providing the token
+            dm_store: Database persisting the DM channel map (optional)
+            owner_id: Bot ID the persisted DM channels belong to
+        """
         self.api_client = api_client
         self.socket_manager = socket_manager
         self.session_manager = session_manager
+        self.dm_store = dm_store if owner_id is not None else None
+        self.owner_id = owner_id
         self.all_dm_channels: Optional[dict[int, int]] = None
+        self._dm_creations: dict[int, asyncio.Task] = {}
+        self._dm_reconcile_task: Optional[asyncio.Task] = None
+
+    async def load_dm_channels(self, session_token: str) -> None:
+        """
+        Make the DM channel map available without downloading it if possible.
+
+        A map already held in memory (e.g. after a reconnect) is kept as is.
+        Otherwise the persisted map is loaded and reconciled with the API in
+        the background; only when nothing is persisted is the full DM channel
+        list downloaded before returning.
+
+        Args:
+            session_token: Session token for authentication
+        """
+        if self.all_dm_channels is not None or not session_token:
+            return
+
+        persisted: dict[int, int] = {}
+        if self.dm_store is not None:
+            try:
+                persisted = await self.dm_store.get_dm_channels(self.owner_id)
+            except Exception as e:
+                logger.warning(f"Failed to load persisted DM channels: {e}")
+
+        if not persisted:
+            await self.init_all_dm_channels(session_token)
+            return
+
+        self.all_dm_channels = persisted
+        self._dm_reconcile_task = asyncio.create_task(
+            self._reconcile_dm_channels(session_token)
+        )
+
+    async def _reconcile_dm_channels(self, session_token: str) -> None:
+        try:
+            await self.init_all_dm_channels(session_token)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to reconcile DM channels: {e}")
+
+    def stop(self) -> None:
+        """Cancel a pending background reconciliation of the DM channel map."""
+        if self._dm_reconcile_task and not self._dm_reconcile_task.done():
+            self._dm_reconcile_task.cancel()
+        self._dm_reconcile_task = None
+
+    async def record_dm_channels(self, channels: dict[int, int]) -> None:
+        """
+        Add DM channels to the map and persist them.
+
+        Args:
+            channels: Mapping of user ID to DM channel ID
+        """
+        channels = {
+            user_id: channel_id
+            for user_id, channel_id in channels.items()
+            if user_id and channel_id
+        }
+        if not channels:
+            return
+        if self.all_dm_channels is None:
+            self.all_dm_channels = {}
+        self.all_dm_channels.update(channels)
+
+        if self.dm_store is None:
+            return
+        try:
+            await self.dm_store.save_dm_channels(self.owner_id, channels)
+        except Exception as e:
+            logger.warning(f"Failed to persist DM channels: {e}")
 
     async def init_all_dm_channels(self, session_token: str) -> None:
         """
         Initialize and cache all DM channels for quick lookup.
 
-        This method fetches all DM channels and creates a mapping from user_id to channel_id
-        for faster access when creating or finding DM channels.
+        This method fetches all DM channels and merges the mapping from user_id
+        to channel_id into the DM channel map, persisting the changed entries.
 
         Args:
             session_token: Session token for authentication
@@ -40,16 +135,12 @@ class ChannelManager:
         if not session_token:
             return
 
-        channels_response = await self.api_client.list_channel_descs(
-            token=session_token,
-            channel_type=ChannelType.CHANNEL_TYPE_DM,
+        channels = self.api_client.iter_channel_descs(
+            token=session_token, channel_type=ChannelType.CHANNEL_TYPE_DM
         )
 
-        if not channels_response or not channels_response.channeldesc:
-            return
-
         dm_mapping = {}
-        for channel in channels_response.channeldesc:
+        async for channel in channels:
             user_ids = channel.user_ids
             channel_type = channel.type
             channel_id = channel.channel_id
@@ -57,7 +148,15 @@ class ChannelManager:
             if user_ids and channel_type == ChannelType.CHANNEL_TYPE_DM and channel_id:
                 dm_mapping[user_ids[0]] = channel_id
 
-        self.all_dm_channels = dm_mapping
+        if self.all_dm_channels is None:
+            self.all_dm_channels = {}
+        await self.record_dm_channels(
+            {
+                user_id: channel_id
+                for user_id, channel_id in dm_mapping.items()
+                if self.all_dm_channels.get(user_id) != channel_id
+            }
+        )
 
     def get_all_dm_channels(self) -> Optional[dict[int, int]]:
         """
@@ -97,4 +196,94 @@ class ChannelManager:
             is_public=False,
         )
 
+        await self.record_dm_channels({user_id: channel_dm_desc.channel_id})
         return channel_dm_desc
+
+    def get_dm_channel_id(self, user_id: int) -> Optional[int]:
+        """
+        Look up the cached DM channel of a user.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            The DM channel ID, or None if no DM channel is known
+        """
+        return (self.all_dm_channels or {}).get(user_id)
+
+    async def ensure_dm_channel(self, user_id: int) -> int:
+        """
+        Get the DM channel of a user, creating it only if none is cached.
+
+        Concurrent calls for the same user share one creation request.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            The DM channel ID
+        """
+        channel_id = self.get_dm_channel_id(user_id)
+        if channel_id:
+            return channel_id
+
+        task = self._dm_creations.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self.create_dm_channel(user_id))
+            self._dm_creations[user_id] = task
+            task.add_done_callback(lambda _: self._dm_creations.pop(user_id, None))
+        channel_dm_desc = await asyncio.shield(task)
+        return channel_dm_desc.channel_id
+
+    async def ensure_dm_channels(
+        self,
+        user_ids: Iterable[int],
+        concurrency: int = DEFAULT_DM_CREATE_CONCURRENCY,
+    ) -> tuple[dict[int, int], dict[int, Exception]]:
+        """
+        Resolve the DM channels of many users, creating the missing ones.
+
+        Cached channels are returned without a request. Missing channels are
+        created with at most ``concurrency`` requests in flight; the requests
+        are still paced by the API client's rate limiter.
+
+        Args:
+            user_ids: User IDs
+            concurrency: Maximum number of creation requests in flight
+
+        Returns:
+            Tuple of the user ID to DM channel ID mapping and the errors of
+            the users whose DM channel could not be created
+        """
+        channels: dict[int, int] = {}
+        missing: list[int] = []
+        for user_id in dict.fromkeys(user_ids):
+            channel_id = self.get_dm_channel_id(user_id)
+            if channel_id:
+                channels[user_id] = channel_id
+            else:
+                missing.append(user_id)
+
+        errors: dict[int, Exception] = {}
+        if not missing:
+            return channels, errors
+
+        logger.info(
+            f"Creating {len(missing)} DM channels ({len(channels)} already cached)"
+        )
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def create(user_id: int) -> None:
+            async with semaphore:
+                try:
+                    channel_id = await self.ensure_dm_channel(user_id)
+                except Exception as e:
+                    errors[user_id] = e
+                    return
+            if channel_id:
+                channels[user_id] = channel_id
+            else:
+                errors[user_id] = ValueError(f"No DM channel created for {user_id}")
+
+        await asyncio.gather(*(create(user_id) for user_id in missing))
+        return channels, errors
@@ -0,0 +1,124 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from typing import Any, Iterable, Iterator, Optional
+
+from mezon.models import ApiClanDesc
+
+
+class ClanDirectory:
+    """
+    Clan descriptions of every clan the bot belongs to, indexed by clan ID.
+
+    Unlike the ``Clan`` object cache, the directory is unbounded and only
+    holds descriptions, so resolving the clan of an unknown channel never
+    needs the full clan list again once it has been loaded.
+    """
+
+    def __init__(self):
+        """Initialize an empty directory."""
+        self._clans: dict[int, ApiClanDesc] = {}
+
+    def __len__(self) -> int:
+        return len(self._clans)
+
+    def __contains__(self, clan_id: object) -> bool:
+        return clan_id in self._clans
+
+    def __iter__(self) -> Iterator[ApiClanDesc]:
+        return iter(list(self._clans.values()))
+
+    def get(self, clan_id: int) -> Optional[ApiClanDesc]:
+        """
+        Look up a clan description.
+
+        Args:
+            clan_id: Clan ID
+
+        Returns:
+            The description, or None if the clan is unknown
+        """
+        return self._clans.get(clan_id)
+
+    def add(self, desc: ApiClanDesc) -> None:
+        """
+        Add or replace a clan description.
+
+        Args:
+            desc: Clan description with a ``clan_id``
+        """
+        if desc.clan_id is not None:
+            self._clans[desc.clan_id] = desc
+
+    def add_many(self, descs: Iterable[ApiClanDesc]) -> None:
+        """
+        Add or replace several clan descriptions.
+
+        Args:
+            descs: Clan descriptions
+        """
+        for desc in descs:
+            self.add(desc)
+
+    def replace(self, descs: Iterable[ApiClanDesc]) -> None:
+        """
+        Replace the whole directory.
+
+        Args:
+            descs: Every clan the bot belongs to
+        """
+        self._clans = {desc.clan_id: desc for desc in descs if desc.clan_id is not None}
+
+    def apply_update(self, event: Any) -> Optional[ApiClanDesc]:
+        """
+        Apply a ``clan_updated_event`` payload to a known clan.
+
+        Args:
+            event: Payload with ``clan_id`` and any updated description fields
+
+        Returns:
+            The updated description, or None if the clan is unknown
+        """
+        desc = self._clans.get(getattr(event, "clan_id", None))
+        if desc is None:
+            return None
+
+        changes = {}
+        for field, source in (
+            ("clan_name", "clan_name"),
+            ("welcome_channel_id", "welcome_channel_id"),
+            ("logo", "clan_logo"),
+            ("logo", "logo"),
+            ("banner", "banner"),
+        ):
+            value = getattr(event, source, None)
+            if value:
+                changes[field] = value
+        desc = desc.model_copy(update=changes)
+        self._clans[desc.clan_id] = desc
+        return desc
+
+    def remove(self, clan_id: int) -> Optional[ApiClanDesc]:
+        """
+        Remove a clan.
+
+        Args:
+            clan_id: Clan ID
+
+        Returns:
+            The removed description, or None if the clan was unknown
+        """
+        return self._clans.pop(clan_id, None)
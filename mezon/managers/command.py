@@ -0,0 +1,298 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import inspect
+import json
+import shlex
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Callable, Iterable, Optional
+
+from mezon.utils.logger import get_logger
+from mezon.utils.metrics import TimingStats
+
+logger = get_logger(__name__)
+
+CommandHandler = Callable[["CommandContext"], Any]
+
+
+@dataclass
+class Command:
+    """A registered command and its scope."""
+
+    name: str
+    handler: CommandHandler
+    aliases: tuple[str, ...] = ()
+    clan_ids: Optional[frozenset[int]] = None
+    channel_ids: Optional[frozenset[int]] = None
+
+    @property
+    def specificity(self) -> int:
+        """Channel-scoped commands win over clan-scoped ones, which win over global ones."""
+        return (2 if self.channel_ids else 0) + (1 if self.clan_ids else 0)
+
+    def in_scope(self, clan_id: int, channel_id: int) -> bool:
+        """Whether the command is enabled for the given clan and channel."""
+        if self.clan_ids is not None and clan_id not in self.clan_ids:
+            return False
+        if self.channel_ids is not None and channel_id not in self.channel_ids:
+            return False
+        return True
+
+
+@dataclass
+class CommandMatch:
+    """Result of matching a message text against the router."""
+
+    command: Command
+    trigger: str
+    raw_args: str
+
+
+class CommandContext:
+    """
+    Invocation context passed to command handlers.
+
+    ``args`` is only parsed when a handler reads it.
+    """
+
+    def __init__(self, match: CommandMatch, message: Any):
+        """
+        Initialize the command context.
+
+        Args:
+            match: The matched command
+            message: The ``ChannelMessage`` that triggered the command
+        """
+        self.command = match.command
+        self.trigger = match.trigger
+        self.raw_args = match.raw_args
+        self.message = message
+
+    @property
+    def name(self) -> str:
+        """Canonical name of the command."""
+        return self.command.name
+
+    @cached_property
+    def args(self) -> list[str]:
+        """Arguments split shell-style, falling back to whitespace on bad quoting."""
+        try:
+            return shlex.split(self.raw_args)
+        except ValueError:
+            return self.raw_args.split()
+
+
+@dataclass
+class _TrieNode:
+    children: dict[str, "_TrieNode"] = field(default_factory=dict)
+    commands: list[Command] = field(default_factory=list)
+
+
+class CommandRouter:
+    """
+    Prefix/alias command router for channel messages.
+
+    Triggers (prefix + name or alias) are stored in a character trie, so a
+    message is matched in one pass over its text regardless of how many
+    commands are registered. Multi-word names such as ``"role add"`` are
+    supported and the longest trigger wins. Matching only needs the raw
+    content text of the message, so it can run before the rest of the
+    message is decoded.
+    """
+
+    def __init__(
+        self,
+        prefixes: str | Iterable[str] = "*",
+        ignored_sender_ids: Iterable[int] = (),
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            prefixes: Command prefix or prefixes (default: ``*``)
+            ignored_sender_ids: Senders whose messages never trigger commands,
+                typically the bot itself
+        """
+        self.prefixes = (prefixes,) if isinstance(prefixes, str) else tuple(prefixes)
+        self.ignored_sender_ids = set(ignored_sender_ids)
+        self.commands: dict[str, Command] = {}
+        self.metrics: dict[str, TimingStats] = {}
+        self._root = _TrieNode()
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def add(
+        self,
+        name: str,
+        handler: CommandHandler,
+        aliases: Iterable[str] = (),
+        clan_ids: Optional[Iterable[int]] = None,
+        channel_ids: Optional[Iterable[int]] = None,
+    ) -> Command:
+        """
+        Register a command.
+
+        The same name may be registered several times with different scopes;
+        the most specific command in scope handles the message.
+
+        Args:
+            name: Command name without prefix
+            handler: Callable receiving a ``CommandContext``
+            aliases: Alternative names
+            clan_ids: Clans where the command is enabled (default: all)
+            channel_ids: Channels where the command is enabled (default: all)
+
+        Returns:
+            The registered command
+        """
+        command = Command(
+            name=name,
+            handler=handler,
+            aliases=tuple(aliases),
+            clan_ids=frozenset(int(c) for c in clan_ids) if clan_ids else None,
+            channel_ids=frozenset(int(c) for c in channel_ids) if channel_ids else None,
+        )
+        key = self._key(command)
+        self.commands[key] = command
+        self.metrics.setdefault(name, TimingStats())
+
+        for trigger_name in (name, *command.aliases):
+            for prefix in self.prefixes:
+                node = self._root
+                for char in f"{prefix}{trigger_name}".lower():
+                    node = node.children.setdefault(char, _TrieNode())
+                node.commands = [c for c in node.commands if self._key(c) != key]
+                node.commands.append(command)
+                node.commands.sort(key=lambda c: c.specificity, reverse=True)
+
+        return command
+
+    def command(
+        self,
+        name: str,
+        aliases: Iterable[str] = (),
+        clan_ids: Optional[Iterable[int]] = None,
+        channel_ids: Optional[Iterable[int]] = None,
+    ) -> Callable[[CommandHandler], CommandHandler]:
+        """
+        Decorator form of ``add``.
+
+        Args:
+            name: Command name without prefix
+            aliases: Alternative names
+            clan_ids: Clans where the command is enabled (default: all)
+            channel_ids: Channels where the command is enabled (default: all)
+
+        Returns:
+            Decorator registering the handler and returning it unchanged
+        """
+
+        def decorator(handler: CommandHandler) -> CommandHandler:
+            self.add(name, handler, aliases, clan_ids, channel_ids)
+            return handler
+
+        return decorator
+
+    @staticmethod
+    def _key(command: Command) -> str:
+        return f"{command.name}|{sorted(command.clan_ids or ())}|{sorted(command.channel_ids or ())}"
+
+    def match_text(
+        self, text: str, clan_id: int = 0, channel_id: int = 0
+    ) -> Optional[CommandMatch]:
+        """
+        Match a message text against the registered commands.
+
+        Args:
+            text: Message text
+            clan_id: Clan the message was sent in
+            channel_id: Channel the message was sent in
+
+        Returns:
+            The match, or None if no command in scope matches
+        """
+        text = text.lstrip()
+        node = self._root
+        best: Optional[CommandMatch] = None
+
+        for index, char in enumerate(text):
+            node = node.children.get(char.lower())
+            if node is None:
+                break
+            end = index + 1
+            if node.commands and (end == len(text) or text[end].isspace()):
+                for command in node.commands:
+                    if command.in_scope(clan_id, channel_id):
+                        best = CommandMatch(command, text[:end], text[end:].strip())
+                        break
+
+        return best
+
+    def match(self, message: Any) -> Optional[CommandMatch]:
+        """
+        Match a raw ``api_pb2.ChannelMessage`` using only its content text.
+
+        Args:
+            message: Protobuf channel message (content is a JSON string)
+
+        Returns:
+            The match, or None
+        """
+        if not self.commands or not message.content:
+            return None
+        if message.sender_id in self.ignored_sender_ids:
+            return None
+        try:
+            text = json.loads(message.content).get("t")
+        except (json.JSONDecodeError, AttributeError, TypeError):
+            return None
+        if not isinstance(text, str):
+            return None
+        return self.match_text(text, message.clan_id, message.channel_id)
+
+    async def dispatch(self, match: CommandMatch, message: Any) -> None:
+        """
+        Run the handler of a matched command and record its timing.
+
+        Errors are logged and counted, never raised.
+
+        Args:
+            match: The matched command
+            message: The decoded ``ChannelMessage``
+        """
+        context = CommandContext(match, message)
+        stats = self.metrics[match.command.name]
+        try:
+            with stats.time():
+                if inspect.iscoroutinefunction(match.command.handler):
+                    await match.command.handler(context)
+                else:
+                    result = match.command.handler(context)
+                    if inspect.isawaitable(result):
+                        await result
+        except Exception as e:
+            logger.error(f"Error in command '{match.command.name}': {e}", exc_info=True)
+
+    def get_metrics(self) -> dict[str, dict[str, float]]:
+        """
+        Get per-command timing metrics.
+
+        Returns:
+            Mapping of command name to its timing snapshot
+        """
+        return {name: stats.snapshot() for name, stats in self.metrics.items()}
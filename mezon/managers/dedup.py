@@ -0,0 +1,128 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+DEFAULT_DEDUP_WINDOW_S = 300.0
+DEFAULT_DEDUP_MAX_SIZE = 10000
+
+
+def _channel_message_key(message: Any) -> Hashable:
+    # Edits reuse the message ID, so the update time tells them apart
+    return (
+        message.channel_id,
+        message.message_id,
+        message.code,
+        message.update_time_seconds,
+    )
+
+
+DEFAULT_DEDUP_KEYS: dict[str, Callable[[Any], Hashable]] = {
+    "channel_message": _channel_message_key,
+}
+
+
+class DuplicateFilter:
+    """
+    Drop realtime events already seen within a time window.
+
+    After a reconnect the server can deliver an event a second time. Each
+    event type with a key function in ``keys`` is identified by that key
+    (for ``channel_message``: channel ID, message ID, code and update time),
+    computed from the protobuf payload before it is converted or dispatched.
+    Keys are kept in insertion order and evicted once older than ``window``
+    seconds or when more than ``max_size`` are stored, so memory stays bounded.
+    """
+
+    def __init__(
+        self,
+        window: float = DEFAULT_DEDUP_WINDOW_S,
+        max_size: int = DEFAULT_DEDUP_MAX_SIZE,
+        keys: Optional[dict[str, Optional[Callable[[Any], Hashable]]]] = None,
+    ):
+        """
+        Initialize the filter.
+
+        Args:
+            window: Seconds a key is remembered
+            max_size: Maximum number of remembered keys
+            keys: Key functions per event name, merged over
+                ``DEFAULT_DEDUP_KEYS`` (``None`` disables an event's filtering)
+        """
+        self.window = window
+        self.max_size = max_size
+        self.keys = {
+            event_name: key
+            for event_name, key in {**DEFAULT_DEDUP_KEYS, **(keys or {})}.items()
+            if key is not None
+        }
+        self.suppressed: dict[str, int] = {}
+        self._seen: OrderedDict[tuple[str, Hashable], float] = OrderedDict()
+
+    def is_duplicate(self, event_name: str, payload: Any) -> bool:
+        """
+        Record an event and report whether it was seen within the window.
+
+        Args:
+            event_name: Envelope field name of the event
+            payload: Protobuf payload of the event
+
+        Returns:
+            True if the event should be dropped
+        """
+        key_of = self.keys.get(event_name)
+        if key_of is None:
+            return False
+
+        now = time.monotonic()
+        self._evict(now)
+        key = (event_name, key_of(payload))
+        if key in self._seen:
+            self.suppressed[event_name] = self.suppressed.get(event_name, 0) + 1
+            return True
+
+        self._seen[key] = now
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return False
+
+    def _evict(self, now: float) -> None:
+        seen = self._seen
+        while seen:
+            key, seen_at = next(iter(seen.items()))
+            if now - seen_at <= self.window:
+                break
+            del seen[key]
+
+    def clear(self) -> None:
+        """Forget every remembered key."""
+        self._seen.clear()
+
+    def get_metrics(self) -> dict[str, Any]:
+        """
+        Get the suppression counters.
+
+        Returns:
+            Dict with the total ``suppressed`` count, the count per event
+            name in ``suppressed_by_event``, and the number of ``tracked`` keys
+        """
+        return {
+            "suppressed": sum(self.suppressed.values()),
+            "suppressed_by_event": dict(self.suppressed),
+            "tracked": len(self._seen),
+        }
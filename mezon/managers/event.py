@@ -1,11 +1,18 @@
 import asyncio
+import functools
 import logging
-from typing import Callable
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
 
-from mezon.constants import Events
+from mezon.constants import Events, HandlerExecutor, StreamOverflow
+from mezon.managers.stream import EventStream
+from mezon.managers.waiter import WaiterManager
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SLOW_HANDLER_THRESHOLD_MS = 100
+
 
 class EventManager:
     """
@@ -15,8 +22,31 @@ class EventManager:
     called when those events are emitted from the websocket connection.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        executor_policy: HandlerExecutor | str = HandlerExecutor.INLINE,
+        max_workers: Optional[int] = None,
+        slow_handler_threshold_ms: Optional[float] = DEFAULT_SLOW_HANDLER_THRESHOLD_MS,
+    ):
+        """
+        Initialize the EventManager.
+
+        Args:
+            executor_policy: Where synchronous handlers run: inline on the event
+                loop, in a shared thread pool, or in a dedicated pool per handler
+            max_workers: Worker count for the shared thread pool
+                (default: ThreadPoolExecutor default)
+            slow_handler_threshold_ms: Warn when an inline sync handler blocks
+                the event loop for longer than this. ``None`` disables the check.
+        """
         self.event_handlers: dict[str, list[Callable]] = {}
+        self.executor_policy = HandlerExecutor(executor_policy)
+        self.max_workers = max_workers
+        self.slow_handler_threshold_ms = slow_handler_threshold_ms
+        self._shared_executor: Optional[ThreadPoolExecutor] = None
+        self._dedicated_executors: dict[Callable, ThreadPoolExecutor] = {}
+        self.waiters = WaiterManager()
+        self.streams: dict[str, list[EventStream]] = {}
 
     def on(self, event_name: Events, handler: Callable) -> None:
         """
@@ -54,19 +84,19 @@ class EventManager:
         """
         Emit an event to all registered handlers.
 
-        Default handlers run first in parallel and are awaited.
-        User handlers are fired and forgotten (run concurrently without blocking).
+        Default handlers run first in parallel and are awaited, then pending
+        ``wait_for`` calls and streams receive the payload. User handlers are
+        fired and forgotten (run concurrently without blocking).
 
         Args:
             event_name: The name of the event to emit
             *args: Positional arguments to pass to handlers
             **kwargs: Keyword arguments to pass to handlers
         """
-        if event_name not in self.event_handlers:
-            return
-
-        handlers = self.event_handlers[event_name]
+        handlers = self.event_handlers.get(event_name)
         if not handlers:
+            if args:
+                await self._deliver(event_name, args[0])
             return
 
         default_handlers = [
@@ -84,7 +114,7 @@ class EventManager:
 
             for handler in sync_default_handlers:
                 try:
-                    handler(*args, **kwargs)
+                    await self.run_sync_handler(handler, *args, **kwargs)
                 except Exception as e:
                     logger.error(
                         f"Error in sync default handler for '{event_name}': {e}",
@@ -103,6 +133,9 @@ class EventManager:
                             exc_info=exc,
                         )
 
+        if args:
+            await self._deliver(event_name, args[0])
+
         for handler in user_handlers:
             try:
                 if asyncio.iscoroutinefunction(handler):
@@ -110,14 +143,140 @@ class EventManager:
                     task.add_done_callback(
                         lambda t, ev=event_name: self._handle_task_exception(t, ev)
                     )
+                elif self.executor_policy != HandlerExecutor.INLINE:
+                    task = asyncio.create_task(
+                        self.run_sync_handler(handler, *args, **kwargs)
+                    )
+                    task.add_done_callback(
+                        lambda t, ev=event_name: self._handle_task_exception(t, ev)
+                    )
                 else:
-                    handler(*args, **kwargs)
+                    self._run_inline(handler, *args, **kwargs)
             except Exception as e:
                 logger.error(
                     f"Error scheduling user handler for '{event_name}': {e}",
                     exc_info=True,
                 )
 
+    async def _deliver(self, event_name: str, payload: Any) -> None:
+        """Hand a payload to pending waiters and subscribed streams."""
+        self.waiters.dispatch(event_name, payload)
+        for stream in list(self.streams.get(event_name, ())):
+            if stream.matches(payload):
+                await stream.put(payload)
+
+    def subscribe(
+        self,
+        event_name: Events | str,
+        clan_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        buffer: int = 1000,
+        overflow: StreamOverflow | str = StreamOverflow.DROP_OLDEST,
+    ) -> EventStream:
+        """
+        Subscribe a buffered stream to an event.
+
+        Args:
+            event_name: The name of the event to stream
+            clan_id: Only deliver payloads from this clan
+            channel_id: Only deliver payloads from this channel
+            buffer: Maximum number of buffered payloads
+            overflow: Policy when the buffer is full
+
+        Returns:
+            The stream; closing it unsubscribes
+        """
+        stream = EventStream(
+            event_name,
+            clan_id=clan_id,
+            channel_id=channel_id,
+            buffer=buffer,
+            overflow=overflow,
+            on_close=self._unsubscribe,
+        )
+        self.streams.setdefault(stream.event, []).append(stream)
+        return stream
+
+    def _unsubscribe(self, stream: EventStream) -> None:
+        streams = self.streams.get(stream.event)
+        if streams and stream in streams:
+            streams.remove(stream)
+            if not streams:
+                del self.streams[stream.event]
+
+    async def run_sync_handler(self, handler: Callable, *args, **kwargs) -> Any:
+        """
+        Run a synchronous handler according to the executor policy.
+
+        Args:
+            handler: The synchronous callable to run
+            *args: Positional arguments to pass to the handler
+            **kwargs: Keyword arguments to pass to the handler
+
+        Returns:
+            The handler's return value
+        """
+        if self.executor_policy == HandlerExecutor.INLINE:
+            return self._run_inline(handler, *args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(handler),
+            functools.partial(handler, *args, **kwargs),
+        )
+
+    def _run_inline(self, handler: Callable, *args, **kwargs) -> Any:
+        """Run a sync handler on the loop thread and warn if it blocks too long."""
+        started = time.perf_counter()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            threshold = self.slow_handler_threshold_ms
+            if threshold is not None and elapsed_ms > threshold:
+                logger.warning(
+                    f"Sync handler {getattr(handler, '__qualname__', handler)} "
+                    f"blocked the event loop for {elapsed_ms:.1f}ms "
+                    f"(threshold {threshold}ms); consider an executor policy"
+                )
+
+    def _get_executor(self, handler: Callable) -> ThreadPoolExecutor:
+        """Return the thread pool that should run ``handler``."""
+        if self.executor_policy == HandlerExecutor.DEDICATED:
+            executor = self._dedicated_executors.get(handler)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix=f"mezon-{getattr(handler, '__name__', 'handler')}",
+                )
+                self._dedicated_executors[handler] = executor
+            return executor
+
+        if self._shared_executor is None:
+            self._shared_executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="mezon-handler"
+            )
+        return self._shared_executor
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Shut down any thread pools created for sync handlers.
+
+        Args:
+            wait: Whether to block until running handlers finish
+        """
+        executors = list(self._dedicated_executors.values())
+        if self._shared_executor is not None:
+            executors.append(self._shared_executor)
+        for executor in executors:
+            executor.shutdown(wait=wait)
+        self._shared_executor = None
+        self._dedicated_executors = {}
+        self.waiters.cancel_all()
+        for streams in list(self.streams.values()):
+            for stream in list(streams):
+                stream.close()
+
     def _handle_task_exception(self, task: asyncio.Task, event_name: str) -> None:
         """Handle exceptions from background event handler tasks."""
         try:
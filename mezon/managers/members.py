@@ -0,0 +1,272 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from typing import Any, Iterable, Iterator, Optional
+
+_EMPTY: frozenset[int] = frozenset()
+
+
+class ClanMember:
+    """
+    A member of a clan as seen by the member index.
+
+    Uses ``__slots__`` and stores empty strings as ``None`` so an index of
+    100k members stays small.
+    """
+
+    __slots__ = (
+        "user_id",
+        "username",
+        "display_name",
+        "avatar",
+        "clan_nick",
+        "clan_avatar",
+        "role_ids",
+    )
+
+    def __init__(
+        self,
+        user_id: int,
+        username: Optional[str] = None,
+        display_name: Optional[str] = None,
+        avatar: Optional[str] = None,
+        clan_nick: Optional[str] = None,
+        clan_avatar: Optional[str] = None,
+        role_ids: tuple[int, ...] = (),
+    ):
+        self.user_id = user_id
+        self.username = username or None
+        self.display_name = display_name or None
+        self.avatar = avatar or None
+        self.clan_nick = clan_nick or None
+        self.clan_avatar = clan_avatar or None
+        self.role_ids = role_ids
+
+    def __repr__(self) -> str:
+        return f"<ClanMember id={self.user_id} username={self.username}>"
+
+    @property
+    def name(self) -> Optional[str]:
+        """Name shown in the clan: clan nick, display name or username."""
+        return self.clan_nick or self.display_name or self.username
+
+    @property
+    def shown_avatar(self) -> Optional[str]:
+        """Avatar shown in the clan: clan avatar or user avatar."""
+        return self.clan_avatar or self.avatar
+
+
+class ClanMemberIndex:
+    """
+    Members of one clan indexed by user ID and by role ID.
+
+    The index is filled by a bulk fetch (``Clan.load_members``) and by the
+    senders of incoming messages, and kept current from member, role and
+    profile events. Both lookups are dict/set operations; ``loaded`` tells
+    whether the index holds the full member list or only the members seen
+    so far.
+
+    Updates made between ``begin_load`` and ``replace`` are recorded and
+    applied again on top of the fetched list, so events that arrive while
+    the fetch is in flight are not lost.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._members: dict[int, ClanMember] = {}
+        self._roles: dict[int, set[int]] = {}
+        self._journal: Optional[list[tuple[str, tuple]]] = None
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._members
+
+    def __iter__(self) -> Iterator[ClanMember]:
+        return iter(list(self._members.values()))
+
+    def get(self, user_id: int) -> Optional[ClanMember]:
+        """
+        Look up a member.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            The member, or None if the user is not known to be a member
+        """
+        return self._members.get(user_id)
+
+    def with_role(self, role_id: int) -> frozenset[int]:
+        """
+        Get the IDs of the members holding a role.
+
+        Args:
+            role_id: Role ID
+
+        Returns:
+            A copy of the member IDs at the time of the call
+        """
+        return frozenset(self._roles.get(role_id, _EMPTY))
+
+    def has_role(self, user_id: int, role_id: int) -> bool:
+        """
+        Check whether a member holds a role.
+
+        Args:
+            user_id: User ID
+            role_id: Role ID
+
+        Returns:
+            True if the member holds the role
+        """
+        return user_id in self._roles.get(role_id, _EMPTY)
+
+    def upsert(self, user_id: int, **fields: Any) -> ClanMember:
+        """
+        Add a member or update the given fields of a known one.
+
+        Args:
+            user_id: User ID
+            **fields: ``ClanMember`` fields; empty values leave a known field unchanged
+
+        Returns:
+            The stored member
+        """
+        self._record("_upsert", user_id, fields)
+        return self._upsert(user_id, fields)
+
+    def _upsert(self, user_id: int, fields: dict[str, Any]) -> ClanMember:
+        fields = dict(fields)
+        role_ids = tuple(fields.pop("role_ids", ()) or ())
+        member = self._members.get(user_id)
+        if member is None:
+            member = ClanMember(user_id, **fields)
+            self._members[user_id] = member
+        else:
+            for field, value in fields.items():
+                if value:
+                    setattr(member, field, value)
+        for role_id in role_ids:
+            self._add_role(role_id, (user_id,))
+        return member
+
+    def remove(self, user_id: int) -> Optional[ClanMember]:
+        """
+        Remove a member and its role assignments.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            The removed member, or None if it was unknown
+        """
+        self._record("_remove", user_id)
+        return self._remove(user_id)
+
+    def _remove(self, user_id: int) -> Optional[ClanMember]:
+        member = self._members.pop(user_id, None)
+        if member is not None:
+            for role_id in member.role_ids:
+                self._discard_role(role_id, user_id)
+        return member
+
+    def add_role(self, role_id: int, user_ids: Iterable[int]) -> None:
+        """
+        Assign a role to members; unknown users are added as members.
+
+        Args:
+            role_id: Role ID
+            user_ids: IDs of the members receiving the role
+        """
+        user_ids = tuple(user_ids)
+        self._record("_add_role", role_id, user_ids)
+        self._add_role(role_id, user_ids)
+
+    def _add_role(self, role_id: int, user_ids: tuple[int, ...]) -> None:
+        for user_id in user_ids:
+            member = self._members.get(user_id)
+            if member is None:
+                member = self._members[user_id] = ClanMember(user_id)
+            if role_id not in member.role_ids:
+                member.role_ids += (role_id,)
+        self._roles.setdefault(role_id, set()).update(user_ids)
+
+    def remove_role(self, role_id: int, user_ids: Iterable[int]) -> None:
+        """
+        Take a role away from members.
+
+        Args:
+            role_id: Role ID
+            user_ids: IDs of the members losing the role
+        """
+        user_ids = tuple(user_ids)
+        self._record("_remove_role", role_id, user_ids)
+        self._remove_role(role_id, user_ids)
+
+    def _remove_role(self, role_id: int, user_ids: tuple[int, ...]) -> None:
+        for user_id in user_ids:
+            member = self._members.get(user_id)
+            if member is not None and role_id in member.role_ids:
+                member.role_ids = tuple(r for r in member.role_ids if r != role_id)
+            self._discard_role(role_id, user_id)
+
+    def _discard_role(self, role_id: int, user_id: int) -> None:
+        holders = self._roles.get(role_id)
+        if holders is not None:
+            holders.discard(user_id)
+            if not holders:
+                del self._roles[role_id]
+
+    def _record(self, method: str, *args: Any) -> None:
+        if self._journal is not None:
+            self._journal.append((method, args))
+
+    def begin_load(self) -> None:
+        """Start recording updates to apply again after the next ``replace``."""
+        self._journal = []
+
+    def cancel_load(self) -> None:
+        """Stop recording updates after a failed fetch."""
+        self._journal = None
+
+    def replace(self, members: Iterable[ClanMember]) -> None:
+        """
+        Replace the whole index with a full member list and mark it loaded.
+
+        Updates recorded since ``begin_load`` are applied on top of the list.
+
+        Args:
+            members: Every member of the clan
+        """
+        journal, self._journal = self._journal or [], None
+        self._members = {}
+        self._roles = {}
+        for member in members:
+            self._members[member.user_id] = member
+            for role_id in member.role_ids:
+                self._roles.setdefault(role_id, set()).add(member.user_id)
+        for method, args in journal:
+            getattr(self, method)(*args)
+        self.loaded = True
+
+    def clear(self) -> None:
+        """Forget every member."""
+        self._members = {}
+        self._roles = {}
+        self.loaded = False
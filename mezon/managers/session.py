@@ -1,4 +1,6 @@
-from typing import Optional
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
 
 from mezon.api.mezon_api import MezonApi
 from mezon.models import (
@@ -6,12 +8,44 @@ from mezon.models import (
     ApiAuthenticateRequest,
 )
 from mezon.session import Session
+from mezon.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_REFRESH_MARGIN_S = 300
+REFRESH_RETRY_DELAY_S = 30
+MIN_REFRESH_DELAY_S = 1
 
 
 class SessionManager:
-    def __init__(self, api_client: MezonApi, session: Optional[Session] = None):
+    def __init__(
+        self,
+        api_client: MezonApi,
+        session: Optional[Session] = None,
+        auth_api_client: Optional[MezonApi] = None,
+        refresh_margin_s: float = DEFAULT_REFRESH_MARGIN_S,
+        on_refresh: Optional[Callable[[Session], Awaitable[None]]] = None,
+    ):
+        """
+        Initialize the session manager.
+
+        Args:
+            api_client: API client for the session's API host
+            session: The current session
+            auth_api_client: API client for the login host used to refresh the
+                session (default: ``api_client``)
+            refresh_margin_s: Seconds before ``expires_at`` to refresh the token
+            on_refresh: Awaited with the session after every refresh
+        """
         self.api_client = api_client
         self.session = session
+        self.auth_api_client = auth_api_client
+        self.refresh_margin_s = refresh_margin_s
+        self.on_refresh = on_refresh
+        self._credentials: Optional[tuple[str | int, str]] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresh_loop_task: Optional[asyncio.Task] = None
+        self._stopped = False
 
     def get_session(self) -> Session:
         return self.session
@@ -24,3 +58,100 @@ class SessionManager:
                 account=ApiAccountApp(appid=str(client_id), token=client_secret)
             ),
         )
+
+    def start_auto_refresh(self, client_id: str | int, client_secret: str) -> None:
+        """
+        Refresh the session in the background before it expires.
+
+        Args:
+            client_id: Bot ID used to re-authenticate
+            client_secret: API key used to re-authenticate
+        """
+        self._credentials = (client_id, client_secret)
+        self._stopped = False
+        if self._refresh_loop_task is None or self._refresh_loop_task.done():
+            self._refresh_loop_task = asyncio.create_task(self._refresh_loop())
+
+    def stop_auto_refresh(self) -> None:
+        """Stop the background refresh; a refresh in flight is discarded."""
+        self._stopped = True
+        if self._refresh_loop_task and not self._refresh_loop_task.done():
+            self._refresh_loop_task.cancel()
+        self._refresh_loop_task = None
+
+    def next_refresh_delay(self, now: Optional[float] = None) -> float:
+        """
+        Seconds until the session should be refreshed.
+
+        Tokens that live shorter than twice the margin are refreshed halfway
+        through their remaining lifetime instead.
+
+        Args:
+            now: Current UNIX timestamp (default: ``time.time()``)
+
+        Returns:
+            Delay in seconds, at least ``MIN_REFRESH_DELAY_S``
+        """
+        if self.session is None or self.session.expires_at is None:
+            return MIN_REFRESH_DELAY_S
+        remaining = self.session.expires_at - (time.time() if now is None else now)
+        return max(
+            remaining - self.refresh_margin_s, remaining / 2, MIN_REFRESH_DELAY_S
+        )
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.next_refresh_delay())
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"Session refresh failed, retrying in {REFRESH_RETRY_DELAY_S}s: {e}"
+                )
+                await asyncio.sleep(REFRESH_RETRY_DELAY_S)
+
+    async def refresh(self) -> Session:
+        """
+        Re-authenticate and swap the new token into the current session.
+
+        Concurrent calls share a single request. The ``Session`` object is
+        updated in place, so every holder sees the new token at once.
+
+        Returns:
+            The refreshed session
+
+        Raises:
+            RuntimeError: If no credentials were provided via ``start_auto_refresh``
+        """
+        if self._credentials is None:
+            raise RuntimeError("No credentials to refresh the session with")
+
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._do_refresh())
+        return await asyncio.shield(self._refresh_task)
+
+    async def _do_refresh(self) -> Session:
+        client_id, client_secret = self._credentials
+        auth_client = self.auth_api_client or self.api_client
+        api_session = await auth_client.mezon_authenticate(
+            basic_auth_username=client_id,
+            basic_auth_password=client_secret,
+            body=ApiAuthenticateRequest(
+                account=ApiAccountApp(appid=str(client_id), token=client_secret)
+            ),
+        )
+        if self._stopped:
+            logger.debug("Session refresh finished after stop, discarding it")
+            return self.session
+
+        if self.session is None:
+            self.session = Session(api_session)
+        else:
+            self.session.update(api_session.token, api_session.refresh_token or None)
+        logger.info(f"Session refreshed, expires at {self.session.expires_at}")
+
+        if self.on_refresh:
+            await self.on_refresh(self.session)
+        return self.session
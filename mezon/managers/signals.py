@@ -0,0 +1,225 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import itertools
+import time
+from typing import TYPE_CHECKING, Callable, Optional
+
+from mezon.protobuf.rtapi import realtime_pb2
+from mezon.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from mezon.socket.default_socket import Socket
+
+logger = get_logger(__name__)
+
+DEFAULT_SIGNAL_FLUSH_INTERVAL_S = 1.0
+DEFAULT_TYPING_INTERVAL_S = 5.0
+DEFAULT_SIGNAL_MAX_PER_FLUSH = 8
+
+
+class SignalCoalescer:
+    """
+    Coalesce last-seen and typing signals before they reach the socket.
+
+    Only the latest last-seen message of each channel is kept, and at most one
+    typing signal per channel is sent per ``typing_interval``. Pending signals
+    are flushed together every ``flush_interval`` seconds without a command
+    ID, so the server sends no acknowledgement and no caller waits on one.
+
+    The frames still pass through the socket adapter's rate limiter, which
+    chat sends use too. At most ``max_per_flush`` signals are written per
+    flush, so signals take a bounded share of that budget; the rest wait for
+    the next flush. Typing and last-seen signals take turns within the cap,
+    so a backlog of last-seen signals cannot hold typing signals back.
+    """
+
+    def __init__(
+        self,
+        get_socket: Callable[[], "Socket"],
+        flush_interval: float = DEFAULT_SIGNAL_FLUSH_INTERVAL_S,
+        typing_interval: float = DEFAULT_TYPING_INTERVAL_S,
+        max_per_flush: int = DEFAULT_SIGNAL_MAX_PER_FLUSH,
+    ):
+        """
+        Initialize the coalescer.
+
+        Args:
+            get_socket: Returns the socket the signals are written to
+            flush_interval: Seconds between flushes of the pending signals
+            typing_interval: Minimum seconds between typing signals of a channel
+            max_per_flush: Maximum signals written per flush
+        """
+        self.get_socket = get_socket
+        self.flush_interval = flush_interval
+        self.typing_interval = typing_interval
+        self.max_per_flush = max(1, max_per_flush)
+        self.sent = 0
+        self.coalesced = 0
+        self._last_seen: dict[int, realtime_pb2.LastSeenMessageEvent] = {}
+        self._typing: dict[int, realtime_pb2.MessageTypingEvent] = {}
+        self._typing_sent_at: dict[int, float] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of signals waiting for the next flush."""
+        return len(self._last_seen) + len(self._typing)
+
+    def mark_seen(
+        self,
+        clan_id: int,
+        channel_id: int,
+        mode: int,
+        message_id: int,
+        timestamp_seconds: Optional[int] = None,
+    ) -> None:
+        """
+        Queue a last-seen signal, replacing an older one for the channel.
+
+        Args:
+            clan_id: Clan ID
+            channel_id: Channel ID
+            mode: Channel mode
+            message_id: ID of the last seen message
+            timestamp_seconds: When the message was seen (default: now)
+        """
+        if timestamp_seconds is None:
+            timestamp_seconds = int(time.time())
+        queued = self._last_seen.get(channel_id)
+        if queued is not None:
+            self.coalesced += 1
+            if queued.timestamp_seconds > timestamp_seconds:
+                return
+
+        self._last_seen[channel_id] = realtime_pb2.LastSeenMessageEvent(
+            clan_id=clan_id,
+            channel_id=channel_id,
+            mode=mode,
+            message_id=message_id,
+            timestamp_seconds=timestamp_seconds,
+        )
+        self._schedule_flush()
+
+    def typing(self, clan_id: int, channel_id: int, mode: int, is_public: bool) -> None:
+        """
+        Queue a typing signal unless one was sent for the channel recently.
+
+        Args:
+            clan_id: Clan ID
+            channel_id: Channel ID
+            mode: Channel mode
+            is_public: Whether the channel is public
+        """
+        sent_at = self._typing_sent_at.get(channel_id)
+        if channel_id in self._typing or (
+            sent_at is not None and time.monotonic() - sent_at < self.typing_interval
+        ):
+            self.coalesced += 1
+            return
+
+        self._typing[channel_id] = realtime_pb2.MessageTypingEvent(
+            clan_id=clan_id,
+            channel_id=channel_id,
+            mode=mode,
+            is_public=is_public,
+        )
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.flush_interval, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self) -> None:
+        """
+        Write up to ``max_per_flush`` pending signals to the socket now.
+
+        Typing and last-seen signals alternate, typing first. Signals beyond
+        the cap stay pending and another flush is scheduled.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        typing = [("message_typing_event", e) for e in self._typing.values()]
+        last_seen = [("last_seen_message_event", e) for e in self._last_seen.values()]
+        signals = [
+            signal
+            for pair in itertools.zip_longest(typing, last_seen)
+            for signal in pair
+            if signal is not None
+        ]
+        if not signals:
+            return
+        signals, deferred = signals[: self.max_per_flush], signals[self.max_per_flush :]
+        for field_name, event in signals:
+            if field_name == "last_seen_message_event":
+                del self._last_seen[event.channel_id]
+            else:
+                del self._typing[event.channel_id]
+        if deferred:
+            self._schedule_flush()
+
+        try:
+            socket = self.get_socket()
+        except Exception as e:
+            logger.warning(f"Dropping {len(signals)} signals: {e}")
+            return
+
+        now = time.monotonic()
+        for field_name, event in signals:
+            try:
+                await socket.send_without_ack(field_name, event)
+                self.sent += 1
+            except Exception as e:
+                logger.warning(f"Failed to send {field_name}: {e}")
+                continue
+            if field_name == "message_typing_event":
+                self._typing_sent_at[event.channel_id] = now
+
+        for channel_id in [
+            channel_id
+            for channel_id, sent_at in self._typing_sent_at.items()
+            if now - sent_at >= self.typing_interval
+        ]:
+            del self._typing_sent_at[channel_id]
+
+    async def close(self) -> None:
+        """Flush every pending signal and stop the timer."""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        while self.pending:
+            await self.flush()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def get_metrics(self) -> dict[str, int]:
+        """
+        Get the coalescing counters.
+
+        Returns:
+            Dict with sent, coalesced and pending signal counts
+        """
+        return {"sent": self.sent, "coalesced": self.coalesced, "pending": self.pending}
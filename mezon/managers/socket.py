@@ -18,7 +18,7 @@ from mezon.models import (
     ChannelMessageAck,
 )
 from mezon.session import Session
-from mezon.socket import Socket, WebSocketAdapterPb
+from mezon.socket import SendHandle, Socket, WebSocketAdapterPb
 from mezon.structures.clan import Clan
 
 
@@ -35,6 +35,7 @@ class SocketManager:
         event_manager: EventManager,
         mezon_client: "MezonClient",
         message_db: MessageDB,
+        max_unacked_sends: int = Socket.DEFAULT_MAX_UNACKED_SENDS,
     ):
         self.ws_url = ws_url
         self.use_ssl = use_ssl
@@ -48,6 +49,7 @@ class SocketManager:
             use_ssl=use_ssl,
             adapter=self.adapter,
             event_manager=event_manager,
+            max_unacked_sends=max_unacked_sends,
         )
 
     def get_socket(self) -> Socket:
@@ -98,6 +100,10 @@ class SocketManager:
         await self.join_all_clans(clans.clandesc, token)
 
     async def join_all_clans(self, clans: list[ApiClanDesc], token: str) -> None:
+        clan_directory = getattr(self.mezon_client, "clan_directory", None)
+        if clan_directory is not None:
+            clan_directory.add_many(clans)
+
         async with asyncio.TaskGroup() as tg:
             for clan_desc in clans:
                 tg.create_task(self.socket.join_clan_chat(clan_desc.clan_id))
@@ -112,6 +118,11 @@ class SocketManager:
                     session_token=token,
                     message_db=self.message_db,
                 )
+                previous = self.mezon_client.clans.get(clan_desc.clan_id)
+                if previous is not None:
+                    # Keep the member index across reconnects instead of
+                    # dropping a loaded member list.
+                    clan.members = previous.members
                 self.mezon_client.clans.set(clan_desc.clan_id, clan)
 
     async def write_ephemeral_message(
@@ -165,6 +176,7 @@ class SocketManager:
         avatar: Optional[str] = None,
         code: Optional[int] = None,
         topic_id: Optional[int] = None,
+        message_id: Optional[int] = None,
     ) -> ChannelMessageAck:
         return await self.socket.write_chat_message(
             clan_id=clan_id,
@@ -180,6 +192,39 @@ class SocketManager:
             avatar=avatar,
             code=code,
             topic_id=topic_id,
+            message_id=message_id,
+        )
+
+    async def write_chat_message_nowait(
+        self,
+        clan_id: int,
+        channel_id: int,
+        mode: int,
+        is_public: bool,
+        content: Any,
+        mentions: Optional[list[ApiMessageMention]] = None,
+        attachments: Optional[list[ApiMessageAttachment]] = None,
+        references: Optional[list[ApiMessageRef]] = None,
+        anonymous_message: Optional[bool] = None,
+        mention_everyone: Optional[bool] = None,
+        avatar: Optional[str] = None,
+        code: Optional[int] = None,
+        topic_id: Optional[int] = None,
+    ) -> SendHandle:
+        return await self.socket.write_chat_message_nowait(
+            clan_id=clan_id,
+            channel_id=channel_id,
+            mode=mode,
+            is_public=is_public,
+            content=content,
+            mentions=mentions,
+            attachments=attachments,
+            references=references,
+            anonymous_message=anonymous_message,
+            mention_everyone=mention_everyone,
+            avatar=avatar,
+            code=code,
+            topic_id=topic_id,
         )
 
     async def update_chat_message(
@@ -0,0 +1,135 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Callable, Optional
+
+from mezon.constants import StreamOverflow
+
+
+class EventStream:
+    """
+    Bounded async iterator over the payloads of one event.
+
+    Payloads are buffered per subscriber, so a consumer pulls at its own pace
+    instead of a task being spawned per event. When the buffer is full the
+    oldest payload is dropped and counted in ``dropped``. Delivery never waits
+    for a consumer: the socket reads events and heartbeat acks on the same
+    connection, so a slow consumer must not hold it up.
+
+    Example:
+        async with client.stream(Events.CHANNEL_MESSAGE, channel_id=1) as messages:
+            async for message in messages:
+                ...
+    """
+
+    def __init__(
+        self,
+        event: str,
+        clan_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        buffer: int = 1000,
+        overflow: StreamOverflow | str = StreamOverflow.DROP_OLDEST,
+        on_close: Optional[Callable[["EventStream"], None]] = None,
+    ):
+        """
+        Initialize the stream.
+
+        Args:
+            event: Event name to subscribe to
+            clan_id: Only deliver payloads from this clan
+            channel_id: Only deliver payloads from this channel
+            buffer: Maximum number of buffered payloads
+            overflow: Policy when the buffer is full
+            on_close: Called once when the stream is closed
+
+        Raises:
+            ValueError: If ``buffer`` is not positive
+        """
+        if buffer < 1:
+            raise ValueError("buffer must be at least 1")
+
+        self.event = str(getattr(event, "value", event))
+        self.clan_id = int(clan_id) if clan_id is not None else None
+        self.channel_id = int(channel_id) if channel_id is not None else None
+        self.buffer = buffer
+        self.overflow = StreamOverflow(overflow)
+        self.dropped = 0
+        self.delivered = 0
+        self.closed = False
+        self._items: deque[Any] = deque()
+        self._readable = asyncio.Event()
+        self._on_close = on_close
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def matches(self, payload: Any) -> bool:
+        """Whether a payload passes the clan/channel filters."""
+        if (
+            self.clan_id is not None
+            and getattr(payload, "clan_id", None) != self.clan_id
+        ):
+            return False
+        if (
+            self.channel_id is not None
+            and getattr(payload, "channel_id", None) != self.channel_id
+        ):
+            return False
+        return True
+
+    async def put(self, payload: Any) -> None:
+        """
+        Buffer a payload according to the overflow policy.
+
+        Args:
+            payload: The event payload
+        """
+        if self.closed:
+            return
+        if len(self._items) >= self.buffer:
+            self._items.popleft()
+            self.dropped += 1
+        self._items.append(payload)
+        self.delivered += 1
+        self._readable.set()
+
+    def close(self) -> None:
+        """Stop receiving events; buffered payloads can still be consumed."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._on_close:
+            self._on_close(self)
+        self._readable.set()
+
+    def __aiter__(self) -> "EventStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        while not self._items:
+            if self.closed:
+                raise StopAsyncIteration
+            self._readable.clear()
+            await self._readable.wait()
+        return self._items.popleft()
+
+    async def __aenter__(self) -> "EventStream":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,406 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+from mezon.models import ApiVoiceChannelUser
+from mezon.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_VOICE_RECONCILE_INTERVAL_S = 300.0
+DEFAULT_VOICE_SEED_RETRY_S = 300.0
+
+_EMPTY: frozenset[int] = frozenset()
+
+
+class VoicePresenceTracker:
+    """
+    Who is in which voice channel, kept in memory from voice events.
+
+    A clan is seeded once from the paginated voice user list, then kept
+    current by ``voice_joined_event``, ``voice_leaved_event``,
+    ``voice_started_event`` and ``voice_ended_event``. Seeded clans are
+    fetched again every ``reconcile_interval`` seconds to correct any event
+    that was missed, for example while the socket was reconnecting.
+
+    Events that arrive while a clan is being fetched are applied right away
+    and again on top of the fetched list, so a fetch never undoes them.
+    """
+
+    def __init__(
+        self,
+        fetch_voice_users: Callable[[int], AsyncIterator[ApiVoiceChannelUser]],
+        reconcile_interval: Optional[float] = DEFAULT_VOICE_RECONCILE_INTERVAL_S,
+        seed_retry_delay: float = DEFAULT_VOICE_SEED_RETRY_S,
+    ):
+        """
+        Initialize the tracker.
+
+        Args:
+            fetch_voice_users: Iterates every voice user of a clan
+            reconcile_interval: Seconds between reconciliations of the seeded
+                clans (``None`` disables them)
+            seed_retry_delay: Seconds before a clan whose seed failed is
+                fetched again
+        """
+        self.fetch_voice_users = fetch_voice_users
+        self.reconcile_interval = reconcile_interval
+        self.seed_retry_delay = seed_retry_delay
+        self.corrections = 0
+        self._channel_users: dict[int, frozenset[int]] = {}
+        self._user_channels: dict[int, frozenset[int]] = {}
+        self._clan_channels: dict[int, frozenset[int]] = {}
+        self._channel_clan: dict[int, int] = {}
+        self._sessions: dict[str, tuple[int, int]] = {}
+        self._channel_sessions: dict[int, set[str]] = {}
+        self._seeded: set[int] = set()
+        self._seeding: dict[int, asyncio.Task] = {}
+        self._seed_failed_at: dict[int, float] = {}
+        self._journals: dict[int, list[tuple[str, tuple]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def seeded_clans(self) -> frozenset[int]:
+        """IDs of the clans whose voice users were fetched."""
+        return frozenset(self._seeded)
+
+    def users_in(self, channel_id: int) -> frozenset[int]:
+        """
+        Get the users in a voice channel.
+
+        Args:
+            channel_id: Voice channel ID
+
+        Returns:
+            The user IDs at the time of the call
+        """
+        return self._channel_users.get(channel_id, _EMPTY)
+
+    def channels_of(self, user_id: int) -> frozenset[int]:
+        """
+        Get the voice channels a user is in.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            The channel IDs at the time of the call
+        """
+        return self._user_channels.get(user_id, _EMPTY)
+
+    def active_channels(self, clan_id: int) -> frozenset[int]:
+        """
+        Get the voice channels of a clan with a started call.
+
+        Args:
+            clan_id: Clan ID
+
+        Returns:
+            The channel IDs at the time of the call
+        """
+        return self._clan_channels.get(clan_id, _EMPTY)
+
+    def join(
+        self,
+        clan_id: int,
+        channel_id: int,
+        user_id: int,
+        session_id: Optional[Any] = None,
+    ) -> None:
+        """
+        Record a user joining a voice channel.
+
+        Args:
+            clan_id: Clan ID
+            channel_id: Voice channel ID
+            user_id: User ID
+            session_id: ID of the voice participation, used to match the leave
+        """
+        self._record(clan_id, "_join", clan_id, channel_id, user_id, session_id)
+        self._join(clan_id, channel_id, user_id, session_id)
+
+    def leave(
+        self,
+        clan_id: int,
+        channel_id: int,
+        user_id: int,
+        session_id: Optional[Any] = None,
+    ) -> None:
+        """
+        Record a user leaving a voice channel.
+
+        Args:
+            clan_id: Clan ID
+            channel_id: Voice channel ID
+            user_id: User ID
+            session_id: ID of the voice participation, used when the user ID
+                does not match a recorded join
+        """
+        self._record(clan_id, "_leave", channel_id, user_id, session_id)
+        self._leave(channel_id, user_id, session_id)
+
+    def start_channel(self, clan_id: int, channel_id: int) -> None:
+        """
+        Record a call starting in a voice channel.
+
+        Args:
+            clan_id: Clan ID
+            channel_id: Voice channel ID
+        """
+        self._record(clan_id, "_start_channel", clan_id, channel_id)
+        self._start_channel(clan_id, channel_id)
+
+    def end_channel(self, clan_id: int, channel_id: int) -> None:
+        """
+        Record a call ending: every user leaves the channel.
+
+        Args:
+            clan_id: Clan ID
+            channel_id: Voice channel ID
+        """
+        self._record(clan_id, "_end_channel", channel_id)
+        self._end_channel(channel_id)
+
+    def _record(self, clan_id: int, method: str, *args: Any) -> None:
+        journal = self._journals.get(clan_id)
+        if journal is not None:
+            journal.append((method, args))
+
+    def _join(
+        self, clan_id: int, channel_id: int, user_id: int, session_id: Any
+    ) -> None:
+        self._start_channel(clan_id, channel_id)
+        self._channel_users[channel_id] |= {user_id}
+        self._user_channels[user_id] = self.channels_of(user_id) | {channel_id}
+        if session_id:
+            self._sessions[str(session_id)] = (channel_id, user_id)
+            self._channel_sessions.setdefault(channel_id, set()).add(str(session_id))
+
+    def _leave(self, channel_id: int, user_id: int, session_id: Any) -> None:
+        if session_id and user_id not in self.users_in(channel_id):
+            channel_id, user_id = self._sessions.get(
+                str(session_id), (channel_id, user_id)
+            )
+        if session_id:
+            entry = self._sessions.pop(str(session_id), None)
+            if entry is not None:
+                sessions = self._channel_sessions.get(entry[0])
+                if sessions is not None:
+                    sessions.discard(str(session_id))
+        if channel_id in self._channel_users:
+            self._channel_users[channel_id] -= {user_id}
+        self._discard(self._user_channels, user_id, channel_id)
+
+    def _start_channel(self, clan_id: int, channel_id: int) -> None:
+        self._channel_users.setdefault(channel_id, _EMPTY)
+        if channel_id not in self.active_channels(clan_id):
+            self._clan_channels[clan_id] = self.active_channels(clan_id) | {channel_id}
+        self._channel_clan[channel_id] = clan_id
+
+    def _end_channel(self, channel_id: int) -> None:
+        for user_id in self._channel_users.pop(channel_id, _EMPTY):
+            self._discard(self._user_channels, user_id, channel_id)
+        clan_id = self._channel_clan.pop(channel_id, None)
+        if clan_id is not None:
+            self._discard(self._clan_channels, clan_id, channel_id)
+        for session_id in self._channel_sessions.pop(channel_id, ()):
+            if self._sessions.get(session_id, (None,))[0] == channel_id:
+                del self._sessions[session_id]
+
+    @staticmethod
+    def _discard(index: dict[int, frozenset[int]], key: int, value: int) -> None:
+        values = index.get(key)
+        if values is not None and value in values:
+            values = values - {value}
+            if values:
+                index[key] = values
+            else:
+                del index[key]
+
+    def _clan_entries(self, clan_id: int) -> set[tuple[int, int]]:
+        return {
+            (channel_id, user_id)
+            for channel_id in self.active_channels(clan_id)
+            for user_id in self.users_in(channel_id)
+        }
+
+    def replace_clan(
+        self,
+        clan_id: int,
+        voice_users: Iterable[ApiVoiceChannelUser],
+        journal: Iterable[tuple[str, tuple]] = (),
+    ) -> int:
+        """
+        Replace the voice state of a clan with a fetched voice user list.
+
+        Args:
+            clan_id: Clan ID
+            voice_users: Every voice user of the clan
+            journal: Updates recorded while the list was fetched, applied
+                again on top of it
+
+        Returns:
+            Number of (channel, user) entries that differed from the tracked state
+        """
+        before = self._clan_entries(clan_id)
+        for channel_id in self.active_channels(clan_id):
+            self._end_channel(channel_id)
+        for voice_user in voice_users:
+            if voice_user.channel_id and voice_user.user_id:
+                self._join(
+                    clan_id, voice_user.channel_id, voice_user.user_id, voice_user.id
+                )
+        for method, args in journal:
+            getattr(self, method)(*args)
+        self._seeded.add(clan_id)
+        return len(before ^ self._clan_entries(clan_id))
+
+    async def _fetch(self, clan_id: int) -> int:
+        """Fetch a clan and replace its state, keeping events seen meanwhile."""
+        journal = self._journals.setdefault(clan_id, [])
+        try:
+            voice_users = [user async for user in self.fetch_voice_users(clan_id)]
+        finally:
+            self._journals.pop(clan_id, None)
+        return self.replace_clan(clan_id, voice_users, journal)
+
+    async def seed(self, clan_id: int) -> None:
+        """
+        Fetch the voice users of a clan and track the clan from now on.
+
+        A failure is remembered, and ``request_seed`` waits
+        ``seed_retry_delay`` seconds before trying the clan again.
+
+        Args:
+            clan_id: Clan ID
+        """
+        try:
+            await self._fetch(clan_id)
+        except Exception:
+            self._seed_failed_at[clan_id] = time.monotonic()
+            raise
+        self._seed_failed_at.pop(clan_id, None)
+
+    def _start_seed(self, clan_id: int) -> asyncio.Task:
+        task = self._seeding.get(clan_id)
+        if task is None:
+            # Journal from the request on: events handled before the task
+            # first runs are replayed too.
+            self._journals.setdefault(clan_id, [])
+            task = asyncio.create_task(self.seed(clan_id))
+            self._seeding[clan_id] = task
+            task.add_done_callback(lambda _: self._end_seed(clan_id))
+        return task
+
+    def _end_seed(self, clan_id: int) -> None:
+        self._seeding.pop(clan_id, None)
+        self._journals.pop(clan_id, None)
+
+    def request_seed(self, clan_id: int) -> None:
+        """
+        Seed a clan in the background unless it is seeded or being seeded.
+
+        Does nothing within ``seed_retry_delay`` seconds of a failed seed.
+
+        Args:
+            clan_id: Clan ID
+        """
+        if not clan_id or clan_id in self._seeded or clan_id in self._seeding:
+            return
+        failed_at = self._seed_failed_at.get(clan_id)
+        if failed_at is not None and (
+            time.monotonic() - failed_at < self.seed_retry_delay
+        ):
+            return
+        self._start_seed(clan_id).add_done_callback(self._log_seed_failure)
+
+    @staticmethod
+    def _log_seed_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Voice presence seed failed: {task.exception()}")
+
+    async def ensure_seeded(self, clan_id: int) -> None:
+        """
+        Seed a clan unless it was seeded already.
+
+        Concurrent calls for the same clan share one fetch.
+
+        Args:
+            clan_id: Clan ID
+
+        Raises:
+            Exception: The error of the fetch if it failed
+        """
+        if clan_id not in self._seeded:
+            await asyncio.shield(self._start_seed(clan_id))
+
+    async def reconcile(self) -> int:
+        """
+        Fetch the voice users of every seeded clan again.
+
+        Returns:
+            Number of entries corrected
+        """
+        corrected = 0
+        for clan_id in list(self._seeded):
+            if clan_id in self._journals:
+                continue
+            try:
+                corrected += await self._fetch(clan_id)
+            except Exception as e:
+                logger.warning(
+                    f"Voice presence reconcile of clan {clan_id} failed: {e}"
+                )
+        if corrected:
+            logger.info(f"Voice presence reconcile corrected {corrected} entries")
+        self.corrections += corrected
+        return corrected
+
+    def forget_clan(self, clan_id: int) -> None:
+        """
+        Stop tracking a clan.
+
+        Args:
+            clan_id: Clan ID
+        """
+        for channel_id in self.active_channels(clan_id):
+            self._end_channel(channel_id)
+        self._seeded.discard(clan_id)
+        self._seed_failed_at.pop(clan_id, None)
+
+    def start(self) -> None:
+        """(Re)start the reconcile loop; seeded clans are reconciled right away."""
+        if self.reconcile_interval is None:
+            return
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the reconcile loop and any seed in flight."""
+        tasks = [task for task in (self._task, *self._seeding.values()) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.reconcile()
+            await asyncio.sleep(self.reconcile_interval)
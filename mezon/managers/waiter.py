@@ -0,0 +1,220 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import heapq
+import itertools
+from typing import Any, Callable, Optional
+
+from mezon.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+WaiterKey = tuple[str, Optional[int], Optional[int]]
+
+
+class _Waiter:
+    __slots__ = ("key", "predicate", "future", "deadline")
+
+    def __init__(
+        self,
+        key: WaiterKey,
+        predicate: Optional[Callable[[Any], bool]],
+        future: asyncio.Future,
+        deadline: Optional[float],
+    ):
+        self.key = key
+        self.predicate = predicate
+        self.future = future
+        self.deadline = deadline
+
+
+class WaiterManager:
+    """
+    Pending ``wait_for`` calls indexed by (event, channel_id, user_id).
+
+    A payload is checked against at most four buckets (exact, channel only,
+    user only, event only), so dispatch cost does not depend on how many
+    waiters are pending elsewhere. Timeouts share one heap and one loop timer
+    armed for the earliest deadline.
+    """
+
+    def __init__(self):
+        """Initialize the waiter manager."""
+        self._index: dict[WaiterKey, list[_Waiter]] = {}
+        self._deadlines: list[tuple[float, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_deadline: Optional[float] = None
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._index.values())
+
+    @staticmethod
+    def _event_key(event: Any) -> str:
+        return str(getattr(event, "value", event))
+
+    async def wait_for(
+        self,
+        event: Any,
+        predicate: Optional[Callable[[Any], bool]] = None,
+        *,
+        channel_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Wait for the next payload of an event that matches the filters.
+
+        Args:
+            event: Event name to wait for
+            predicate: Extra check on the payload
+            channel_id: Only match payloads from this channel
+            user_id: Only match payloads from this sender/user
+            timeout: Seconds to wait before raising ``asyncio.TimeoutError``
+
+        Returns:
+            The matching payload
+
+        Raises:
+            asyncio.TimeoutError: If no payload matched in time
+        """
+        loop = asyncio.get_running_loop()
+        key = (
+            self._event_key(event),
+            int(channel_id) if channel_id is not None else None,
+            int(user_id) if user_id is not None else None,
+        )
+        deadline = loop.time() + timeout if timeout is not None else None
+        waiter = _Waiter(key, predicate, loop.create_future(), deadline)
+        self._index.setdefault(key, []).append(waiter)
+
+        if deadline is not None:
+            heapq.heappush(self._deadlines, (deadline, next(self._sequence), waiter))
+            self._arm_timer(loop)
+
+        try:
+            return await waiter.future
+        finally:
+            self._remove(waiter)
+            if deadline is not None:
+                self._arm_timer(loop)
+
+    def dispatch(self, event: Any, payload: Any) -> int:
+        """
+        Resolve the waiters matching a payload.
+
+        Args:
+            event: Event name of the payload
+            payload: The event payload
+
+        Returns:
+            Number of waiters resolved
+        """
+        if not self._index:
+            return 0
+
+        event_key = self._event_key(event)
+        channel_id = getattr(payload, "channel_id", None)
+        user_id = getattr(payload, "sender_id", None) or getattr(
+            payload, "user_id", None
+        )
+        keys = {(event_key, None, None)}
+        if channel_id:
+            keys.add((event_key, channel_id, None))
+        if user_id:
+            keys.add((event_key, None, user_id))
+        if channel_id and user_id:
+            keys.add((event_key, channel_id, user_id))
+
+        resolved = 0
+        for key in keys:
+            bucket = self._index.get(key)
+            if not bucket:
+                continue
+            for waiter in list(bucket):
+                if waiter.future.done() or not self._matches(waiter, payload):
+                    continue
+                waiter.future.set_result(payload)
+                self._remove(waiter)
+                resolved += 1
+        return resolved
+
+    @staticmethod
+    def _matches(waiter: _Waiter, payload: Any) -> bool:
+        if waiter.predicate is None:
+            return True
+        try:
+            return bool(waiter.predicate(payload))
+        except Exception as e:
+            logger.error(f"Error in wait_for predicate for '{waiter.key[0]}': {e}")
+            return False
+
+    def _remove(self, waiter: _Waiter) -> None:
+        bucket = self._index.get(waiter.key)
+        if bucket is None:
+            return
+        try:
+            bucket.remove(waiter)
+        except ValueError:
+            return
+        if not bucket:
+            del self._index[waiter.key]
+
+    def _arm_timer(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Point the shared timer at the earliest pending deadline."""
+        while self._deadlines and self._deadlines[0][2].future.done():
+            heapq.heappop(self._deadlines)
+
+        if not self._deadlines:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = None
+            self._timer_deadline = None
+            return
+
+        earliest = self._deadlines[0][0]
+        if self._timer is not None and self._timer_deadline == earliest:
+            return
+        if self._timer:
+            self._timer.cancel()
+        self._timer_deadline = earliest
+        self._timer = loop.call_at(earliest, self._expire, loop)
+
+    def _expire(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Fail every waiter whose deadline has passed and re-arm the timer."""
+        self._timer = None
+        self._timer_deadline = None
+        now = loop.time()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, waiter = heapq.heappop(self._deadlines)
+            if not waiter.future.done():
+                waiter.future.set_exception(asyncio.TimeoutError())
+                self._remove(waiter)
+        self._arm_timer(loop)
+
+    def cancel_all(self) -> None:
+        """Cancel every pending waiter."""
+        for bucket in list(self._index.values()):
+            for waiter in bucket:
+                if not waiter.future.done():
+                    waiter.future.cancel()
+        self._index.clear()
+        self._deadlines.clear()
+        if self._timer:
+            self._timer.cancel()
+        self._timer = None
+        self._timer_deadline = None
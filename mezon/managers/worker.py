@@ -0,0 +1,390 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import inspect
+import itertools
+import multiprocessing
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from mezon.models import convert_envelope_to_pydantic
+from mezon.protobuf.utils import parse_protobuf
+from mezon.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from mezon.managers.socket import SocketManager
+
+logger = get_logger(__name__)
+
+# SocketManager methods a worker is allowed to call through the IPC channel
+WORKER_ACTIONS = frozenset(
+    {
+        "write_chat_message",
+        "write_ephemeral_message",
+        "update_chat_message",
+        "write_message_reaction",
+        "remove_chat_message",
+    }
+)
+
+WorkerHandler = Callable[..., Any]
+
+DEFAULT_WORKER_CALL_TIMEOUT_S = 30.0
+
+
+class WorkerContext:
+    """
+    Handle given to worker-side handlers for sending actions back to the
+    process that owns the websocket.
+
+    Every call is serialized onto the outbound queue and executed by the
+    socket owner, so rate limits and the socket stay centralized.
+    """
+
+    def __init__(self, worker_id: int, outbound: Any, results: Any):
+        """
+        Initialize the worker context.
+
+        Args:
+            worker_id: Index of the worker process
+            outbound: Queue carrying action requests to the socket owner
+            results: Queue carrying action results back to this worker
+        """
+        self.worker_id = worker_id
+        self._outbound = outbound
+        self._results = results
+        self._request_ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[threading.Thread] = None
+        self._closed = False
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the thread that resolves pending calls from the results queue."""
+        self._loop = loop
+        self._reader = threading.Thread(
+            target=self._read_results, name="mezon-worker-results", daemon=True
+        )
+        self._reader.start()
+
+    def stop(self) -> None:
+        """Stop the results reader thread."""
+        self._results.put(None)
+
+    def _read_results(self) -> None:
+        try:
+            while True:
+                item = self._results.get()
+                if item is None:
+                    return
+                self._loop.call_soon_threadsafe(self._resolve, *item)
+        except Exception as e:
+            logger.error(f"Worker {self.worker_id} results reader failed: {e}")
+        finally:
+            try:
+                self._loop.call_soon_threadsafe(self._fail_pending)
+            except RuntimeError:
+                pass
+
+    def _fail_pending(self) -> None:
+        """Fail every call still waiting once no result can arrive anymore."""
+        self._closed = True
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Worker results reader stopped"))
+
+    def _resolve(self, request_id: int, ok: bool, value: Any) -> None:
+        future = self._pending.pop(request_id, None)
+        if future is None or future.done():
+            return
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(Exception(value))
+
+    async def call(
+        self,
+        action: str,
+        timeout: Optional[float] = DEFAULT_WORKER_CALL_TIMEOUT_S,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Execute a socket action in the socket owner process.
+
+        Args:
+            action: Name of a ``SocketManager`` method in ``WORKER_ACTIONS``
+            timeout: Seconds to wait for the result (``None`` waits forever)
+            **kwargs: Keyword arguments for that method
+
+        Returns:
+            The value returned by the socket owner
+
+        Raises:
+            ValueError: If the action is not allowed
+            TimeoutError: If no result arrived within ``timeout``
+            ConnectionError: If the results reader stopped
+            Exception: If the action failed in the socket owner
+        """
+        if action not in WORKER_ACTIONS:
+            raise ValueError(f"Action {action} is not available to workers")
+        if self._closed:
+            raise ConnectionError("Worker results reader stopped")
+
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._outbound.put((self.worker_id, request_id, action, kwargs))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def write_chat_message(self, **kwargs: Any) -> Any:
+        return await self.call("write_chat_message", **kwargs)
+
+    async def write_ephemeral_message(self, **kwargs: Any) -> Any:
+        return await self.call("write_ephemeral_message", **kwargs)
+
+    async def update_chat_message(self, **kwargs: Any) -> Any:
+        return await self.call("update_chat_message", **kwargs)
+
+    async def write_message_reaction(self, **kwargs: Any) -> Any:
+        return await self.call("write_message_reaction", **kwargs)
+
+    async def remove_chat_message(self, **kwargs: Any) -> Any:
+        return await self.call("remove_chat_message", **kwargs)
+
+
+async def _run_worker(
+    worker_id: int,
+    handlers: dict[str, list[WorkerHandler]],
+    inbound: Any,
+    outbound: Any,
+    results: Any,
+) -> None:
+    """
+    Worker event loop: decode forwarded envelopes and run the handlers.
+
+    Args:
+        worker_id: Index of the worker process
+        handlers: Mapping of event name to handlers ``(payload, ctx)``
+        inbound: Queue of raw envelope bytes (``None`` stops the worker)
+        outbound: Queue for action requests to the socket owner
+        results: Queue of action results for this worker
+    """
+    loop = asyncio.get_running_loop()
+    context = WorkerContext(worker_id, outbound, results)
+    context.start(loop)
+    tasks: set[asyncio.Task] = set()
+
+    async def dispatch(raw: bytes) -> None:
+        envelope = parse_protobuf(raw)
+        field_name = envelope.WhichOneof("message")
+        if not field_name or field_name not in handlers:
+            return
+
+        payload = convert_envelope_to_pydantic(
+            field_name, getattr(envelope, field_name)
+        )
+        for handler in handlers[field_name]:
+            try:
+                if inspect.iscoroutinefunction(handler):
+                    await handler(payload, context)
+                else:
+                    handler(payload, context)
+            except Exception as e:
+                logger.error(
+                    f"Error in worker {worker_id} handler for '{field_name}': {e}",
+                    exc_info=True,
+                )
+
+    try:
+        while True:
+            raw = await asyncio.to_thread(inbound.get)
+            if raw is None:
+                break
+            task = asyncio.create_task(dispatch(raw))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        context.stop()
+
+
+def _worker_main(
+    worker_id: int,
+    handlers: dict[str, list[WorkerHandler]],
+    inbound: Any,
+    outbound: Any,
+    results: Any,
+) -> None:
+    """Process entry point for a worker."""
+    asyncio.run(_run_worker(worker_id, handlers, inbound, outbound, results))
+
+
+class WorkerPool:
+    """
+    Pool of worker processes that handle forwarded realtime events.
+
+    The process that owns the websocket forwards the raw envelope bytes of
+    selected events to the pool. Workers decode the envelopes and run the
+    registered handlers, and outbound actions come back over an IPC queue
+    to be sent through the owner's ``SocketManager``.
+
+    Handlers receive ``(payload, ctx)`` where ``ctx`` is a ``WorkerContext``.
+    They must be importable module-level functions so they can be pickled
+    into the worker processes.
+    """
+
+    def __init__(
+        self,
+        socket_manager: "SocketManager",
+        handlers: dict[str, list[WorkerHandler] | WorkerHandler],
+        processes: Optional[int] = None,
+        start_method: str = "spawn",
+    ):
+        """
+        Initialize the worker pool.
+
+        Args:
+            socket_manager: Socket manager that executes outbound actions
+            handlers: Mapping of event name to one handler or a list of handlers
+            processes: Number of worker processes (default: ``os.cpu_count()``)
+            start_method: Multiprocessing start method
+        """
+        self.socket_manager = socket_manager
+        self.handlers: dict[str, list[WorkerHandler]] = {
+            str(getattr(event, "value", event)): (
+                list(handler) if isinstance(handler, (list, tuple)) else [handler]
+            )
+            for event, handler in handlers.items()
+        }
+        self.processes = processes or os.cpu_count() or 1
+        self._mp = multiprocessing.get_context(start_method)
+        self._inbound: Any = None
+        self._outbound: Any = None
+        self._results: list[Any] = []
+        self._workers: list[Any] = []
+        self._server: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.forwarded_count = 0
+
+    @property
+    def events(self) -> frozenset[str]:
+        """Names of the events forwarded to the pool."""
+        return frozenset(self.handlers)
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the worker processes have been started."""
+        return bool(self._workers)
+
+    def start(self) -> None:
+        """Start the worker processes and the action server thread."""
+        if self.is_running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._inbound = self._mp.Queue()
+        self._outbound = self._mp.Queue()
+        self._results = [self._mp.Queue() for _ in range(self.processes)]
+
+        for worker_id in range(self.processes):
+            process = self._mp.Process(
+                target=_worker_main,
+                args=(
+                    worker_id,
+                    self.handlers,
+                    self._inbound,
+                    self._outbound,
+                    self._results[worker_id],
+                ),
+                name=f"mezon-worker-{worker_id}",
+                daemon=True,
+            )
+            process.start()
+            self._workers.append(process)
+
+        self._server = threading.Thread(
+            target=self._serve_actions, name="mezon-worker-actions", daemon=True
+        )
+        self._server.start()
+        logger.info(f"Started {self.processes} worker processes")
+
+    def forward(self, field_name: str, raw: bytes) -> None:
+        """
+        Forward a raw envelope to the pool.
+
+        Args:
+            field_name: Envelope field name of the event
+            raw: Serialized envelope bytes as received from the websocket
+        """
+        if not self.is_running or field_name not in self.handlers:
+            return
+        self._inbound.put(raw)
+        self.forwarded_count += 1
+
+    def _serve_actions(self) -> None:
+        """Read worker action requests and run them on the owner's event loop."""
+        while True:
+            request = self._outbound.get()
+            if request is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._execute(*request), self._loop)
+
+    async def _execute(
+        self, worker_id: int, request_id: int, action: str, kwargs: dict[str, Any]
+    ) -> None:
+        try:
+            if action not in WORKER_ACTIONS:
+                raise ValueError(f"Action {action} is not available to workers")
+            value = await getattr(self.socket_manager, action)(**kwargs)
+            self._results[worker_id].put((request_id, True, value))
+        except Exception as e:
+            logger.warning(f"Worker {worker_id} action {action} failed: {e}")
+            self._results[worker_id].put((request_id, False, str(e)))
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the worker processes after they drain the forwarded events.
+
+        Args:
+            timeout: Seconds to wait for each worker before terminating it
+        """
+        if not self.is_running:
+            return
+
+        for _ in self._workers:
+            self._inbound.put(None)
+
+        for process in self._workers:
+            await asyncio.to_thread(process.join, timeout)
+            if process.is_alive():
+                logger.warning(f"Terminating unresponsive worker {process.name}")
+                process.terminate()
+
+        self._outbound.put(None)
+        if self._server:
+            await asyncio.to_thread(self._server.join, timeout)
+
+        self._workers = []
+        self._server = None
+        logger.info("Worker processes stopped")
@@ -1 +1,2 @@
 from .db import MessageDB
+from .outbox import Outbox
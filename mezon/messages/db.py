@@ -14,34 +14,70 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import asyncio
 import json
 import os
-from typing import Any, Optional
-
-import aiosqlite
+from typing import TYPE_CHECKING, Any, Optional
 
 from mezon.models import ChannelMessage
 from mezon.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    import aiosqlite
+
 logger = get_logger(__name__)
 
 
 class MessageDB:
     """
     Async SQLite-based message database for caching Mezon messages.
+
+    A single database can hold the messages of several bots: ``for_tenant``
+    returns a view that stores one bot's messages in its own table while
+    sharing this instance's connection.
     """
 
-    def __init__(self, db_path: str = "./mezon-cache/mezon-messages-cache.db"):
+    def __init__(
+        self,
+        db_path: str = "./mezon-cache/mezon-messages-cache.db",
+        table_name: str = "messages",
+    ):
         """
         Initialize the message database.
 
         Args:
             db_path: Path to the SQLite database file (default: ./mezon-cache/mezon-messages-cache.db)
+            table_name: Name of the messages table (default: messages)
         """
         self.db_path = db_path
+        self.table_name = table_name
         self._ensure_directory()
-        self.db: Optional[aiosqlite.Connection] = None
+        self.db: Optional["aiosqlite.Connection"] = None
         self._initialized = False
+        self._owner: Optional["MessageDB"] = None
+        self._tenants: dict[int, "MessageDB"] = {}
+        self._connect_lock = asyncio.Lock()
+
+    def for_tenant(self, tenant_id: int | str) -> "MessageDB":
+        """
+        Get the message store of one bot in a shared database.
+
+        The returned view uses the ``messages_<tenant_id>`` table and this
+        instance's connection. Closing the view leaves the connection open.
+
+        Args:
+            tenant_id: Bot ID owning the messages
+
+        Returns:
+            MessageDB view scoped to the bot
+        """
+        tenant_id = int(tenant_id)
+        tenant = self._tenants.get(tenant_id)
+        if tenant is None:
+            tenant = MessageDB(self.db_path, table_name=f"messages_{tenant_id}")
+            tenant._owner = self
+            self._tenants[tenant_id] = tenant
+        return tenant
 
     def _ensure_directory(self) -> None:
         """Create the database directory if it doesn't exist."""
@@ -52,17 +88,28 @@ class MessageDB:
 
     async def _ensure_connection(self) -> None:
         """Ensure database connection is established and initialized."""
-        if self.db is None or not self._initialized:
-            self.db = await aiosqlite.connect(self.db_path)
-            self.db.row_factory = aiosqlite.Row
+        if self.db is not None and self._initialized:
+            return
+
+        async with self._connect_lock:
+            if self.db is not None and self._initialized:
+                return
+            if self._owner is not None:
+                await self._owner._ensure_connection()
+                self.db = self._owner.db
+            else:
+                import aiosqlite
+
+                self.db = await aiosqlite.connect(self.db_path)
+                self.db.row_factory = aiosqlite.Row
             await self._init_tables()
             self._initialized = True
 
     async def _init_tables(self) -> None:
         """Initialize database tables and indexes."""
         await self.db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS messages (
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.table_name} (
                 id TEXT NOT NULL,
                 channel_id TEXT NOT NULL,
                 clan_id TEXT,
@@ -79,10 +126,43 @@ class MessageDB:
         """
         )
 
+        await self.db.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS idx_{self.table_name}_channel_id
+            ON {self.table_name}(channel_id)
+        """
+        )
+
         await self.db.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_messages_channel_id
-            ON messages(channel_id)
+            CREATE TABLE IF NOT EXISTS dm_channels (
+                owner_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                channel_id TEXT NOT NULL,
+                PRIMARY KEY (owner_id, user_id)
+            )
+        """
+        )
+
+        await self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id TEXT PRIMARY KEY,
+                owner_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT
+            )
+        """
+        )
+
+        await self.db.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_outbox_due
+            ON outbox(owner_id, status, next_attempt_at)
         """
         )
 
@@ -110,8 +190,8 @@ class MessageDB:
         await self._ensure_connection()
 
         await self.db.execute(
-            """
-            INSERT OR REPLACE INTO messages (
+            f"""
+            INSERT OR REPLACE INTO {self.table_name} (
                 id, clan_id, channel_id, sender_id,
                 content, mentions, attachments, reactions,
                 msg_references, topic_id, create_time_seconds
@@ -153,8 +233,8 @@ class MessageDB:
         await self._ensure_connection()
 
         async with self.db.execute(
-            """
-            SELECT * FROM messages
+            f"""
+            SELECT * FROM {self.table_name}
             WHERE channel_id = ? AND id = ?
             LIMIT 1
         """,
@@ -184,8 +264,8 @@ class MessageDB:
         await self._ensure_connection()
 
         async with self.db.execute(
-            """
-            SELECT * FROM messages
+            f"""
+            SELECT * FROM {self.table_name}
             WHERE channel_id = ?
             ORDER BY create_time_seconds DESC
             LIMIT ? OFFSET ?
@@ -221,8 +301,8 @@ class MessageDB:
         await self._ensure_connection()
 
         cursor = await self.db.execute(
-            """
-            DELETE FROM messages
+            f"""
+            DELETE FROM {self.table_name}
             WHERE id = ? AND channel_id = ?
         """,
             (message_id, channel_id),
@@ -249,8 +329,8 @@ class MessageDB:
         await self._ensure_connection()
 
         cursor = await self.db.execute(
-            """
-            DELETE FROM messages
+            f"""
+            DELETE FROM {self.table_name}
             WHERE channel_id = ?
         """,
             (channel_id,),
@@ -276,21 +356,266 @@ class MessageDB:
 
         if channel_id:
             async with self.db.execute(
-                """
-                SELECT COUNT(*) FROM messages
+                f"""
+                SELECT COUNT(*) FROM {self.table_name}
                 WHERE channel_id = ?
             """,
                 (channel_id,),
             ) as cursor:
                 row = await cursor.fetchone()
         else:
-            async with self.db.execute("SELECT COUNT(*) FROM messages") as cursor:
+            async with self.db.execute(
+                f"SELECT COUNT(*) FROM {self.table_name}"
+            ) as cursor:
                 row = await cursor.fetchone()
 
         return row[0]
 
+    async def save_dm_channels(self, owner_id: int, channels: dict[int, int]) -> None:
+        """
+        Save or update DM channel mappings of a bot.
+
+        Args:
+            owner_id: Bot ID owning the DM channels
+            channels: Mapping of user ID to DM channel ID
+        """
+        if not channels:
+            return
+        await self._ensure_connection()
+
+        await self.db.executemany(
+            """
+            INSERT OR REPLACE INTO dm_channels (owner_id, user_id, channel_id)
+            VALUES (?, ?, ?)
+        """,
+            [
+                (str(owner_id), str(user_id), str(channel_id))
+                for user_id, channel_id in channels.items()
+            ],
+        )
+
+        await self.db.commit()
+        logger.debug(f"Saved {len(channels)} DM channels of {owner_id}")
+
+    async def get_dm_channels(self, owner_id: int) -> dict[int, int]:
+        """
+        Retrieve the DM channel mappings of a bot.
+
+        Args:
+            owner_id: Bot ID owning the DM channels
+
+        Returns:
+            Mapping of user ID to DM channel ID
+        """
+        await self._ensure_connection()
+
+        async with self.db.execute(
+            "SELECT user_id, channel_id FROM dm_channels WHERE owner_id = ?",
+            (str(owner_id),),
+        ) as cursor:
+            rows = await cursor.fetchall()
+
+        return {int(row[0]): int(row[1]) for row in rows}
+
+    async def add_outbox_message(
+        self,
+        owner_id: int,
+        message_id: int,
+        payload: dict[str, Any],
+        status: str,
+        created_at: float,
+    ) -> None:
+        """
+        Store an outgoing message in the outbox.
+
+        Args:
+            owner_id: Bot ID owning the message
+            message_id: Idempotency ID of the message
+            payload: Keyword arguments of the send (will be JSON serialized)
+            status: Initial status of the message
+            created_at: Enqueue timestamp, also the first attempt time
+        """
+        await self._ensure_connection()
+
+        await self.db.execute(
+            """
+            INSERT INTO outbox (
+                id, owner_id, payload, status, attempts, created_at, next_attempt_at
+            ) VALUES (?, ?, ?, ?, 0, ?, ?)
+        """,
+            (
+                str(message_id),
+                str(owner_id),
+                json.dumps(payload),
+                status,
+                created_at,
+                created_at,
+            ),
+        )
+
+        await self.db.commit()
+
+    async def get_outbox_messages(
+        self,
+        owner_id: int,
+        status: str,
+        due_before: Optional[float] = None,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """
+        Retrieve outbox messages of a bot, oldest first.
+
+        Args:
+            owner_id: Bot ID owning the messages
+            status: Status of the messages
+            due_before: Only return messages whose next attempt is due by then
+            limit: Maximum number of messages to retrieve (default: 100)
+
+        Returns:
+            Dicts with ``id``, ``payload``, ``attempts``, ``created_at`` and ``last_error``
+        """
+        await self._ensure_connection()
+
+        async with self.db.execute(
+            """
+            SELECT id, payload, attempts, created_at, last_error FROM outbox
+            WHERE owner_id = ? AND status = ? AND next_attempt_at <= ?
+            ORDER BY created_at, id
+            LIMIT ?
+        """,
+            (
+                str(owner_id),
+                status,
+                float("inf") if due_before is None else due_before,
+                limit,
+            ),
+        ) as cursor:
+            rows = await cursor.fetchall()
+
+        return [
+            {
+                "id": int(row[0]),
+                "payload": json.loads(row[1]),
+                "attempts": row[2],
+                "created_at": row[3],
+                "last_error": row[4],
+            }
+            for row in rows
+        ]
+
+    async def update_outbox_message(
+        self,
+        message_id: int,
+        status: str,
+        attempts: int,
+        next_attempt_at: float,
+        last_error: Optional[str] = None,
+    ) -> None:
+        """
+        Record the outcome of a failed send of an outbox message.
+
+        Args:
+            message_id: Idempotency ID of the message
+            status: New status of the message
+            attempts: Number of failed attempts so far
+            next_attempt_at: Timestamp of the next attempt
+            last_error: Error of the last attempt
+        """
+        await self._ensure_connection()
+
+        await self.db.execute(
+            """
+            UPDATE outbox
+            SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?
+            WHERE id = ?
+        """,
+            (status, attempts, next_attempt_at, last_error, str(message_id)),
+        )
+
+        await self.db.commit()
+
+    async def delete_outbox_message(self, message_id: int) -> bool:
+        """
+        Delete a message from the outbox.
+
+        Args:
+            message_id: Idempotency ID of the message
+
+        Returns:
+            True if the message was deleted, False otherwise
+        """
+        await self._ensure_connection()
+
+        cursor = await self.db.execute(
+            "DELETE FROM outbox WHERE id = ?", (str(message_id),)
+        )
+
+        await self.db.commit()
+        return cursor.rowcount > 0
+
+    async def requeue_outbox_messages(
+        self, owner_id: int, status: str, new_status: str, next_attempt_at: float
+    ) -> int:
+        """
+        Move every outbox message of a bot in one status to another, resetting attempts.
+
+        Args:
+            owner_id: Bot ID owning the messages
+            status: Current status of the messages
+            new_status: Status to move them to
+            next_attempt_at: Timestamp of their next attempt
+
+        Returns:
+            Number of messages moved
+        """
+        await self._ensure_connection()
+
+        cursor = await self.db.execute(
+            """
+            UPDATE outbox SET status = ?, attempts = 0, next_attempt_at = ?
+            WHERE owner_id = ? AND status = ?
+        """,
+            (new_status, next_attempt_at, str(owner_id), status),
+        )
+
+        await self.db.commit()
+        return cursor.rowcount
+
+    async def get_outbox_stats(self, owner_id: int) -> dict[str, tuple[int, float]]:
+        """
+        Count the outbox messages of a bot per status.
+
+        Args:
+            owner_id: Bot ID owning the messages
+
+        Returns:
+            Mapping of status to the message count and the oldest ``created_at``
+        """
+        await self._ensure_connection()
+
+        async with self.db.execute(
+            """
+            SELECT status, COUNT(*), MIN(created_at) FROM outbox
+            WHERE owner_id = ?
+            GROUP BY status
+        """,
+            (str(owner_id),),
+        ) as cursor:
+            rows = await cursor.fetchall()
+
+        return {row[0]: (row[1], row[2]) for row in rows}
+
     async def close(self) -> None:
         """Close the database connection."""
+        if self._owner is not None:
+            self.db = None
+            self._initialized = False
+            return
+
+        for tenant in self._tenants.values():
+            tenant.db = None
+            tenant._initialized = False
+
         if self.db:
             await self.db.close()
             self.db = None
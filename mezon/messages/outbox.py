@@ -0,0 +1,247 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from aiolimiter import AsyncLimiter
+
+from mezon.utils.helper import generate_snowflake_id
+from mezon.utils.logger import get_logger
+
+from .db import MessageDB
+
+logger = get_logger(__name__)
+
+DEFAULT_OUTBOX_RATE = 10
+DEFAULT_OUTBOX_MAX_ATTEMPTS = 5
+DEFAULT_OUTBOX_RETRY_DELAY_S = 1.0
+DEFAULT_OUTBOX_MAX_RETRY_DELAY_S = 60.0
+DEFAULT_OUTBOX_POLL_INTERVAL_S = 1.0
+
+STATUS_PENDING = "pending"
+STATUS_DEAD = "dead"
+
+
+class Outbox:
+    """
+    Durable queue of outgoing channel messages stored in the message database.
+
+    Messages are written to the ``outbox`` table first and sent by a
+    background drainer while the socket is open, at most ``rate`` per second.
+    Each message keeps the idempotency ID it was enqueued with across
+    retries. A failed send is retried with exponential backoff; after
+    ``max_attempts`` failures the message is dead-lettered and kept for
+    inspection. Messages survive disconnects and restarts.
+    """
+
+    def __init__(
+        self,
+        message_db: MessageDB,
+        owner_id: int,
+        send: Callable[[dict[str, Any], int], Awaitable[Any]],
+        is_ready: Callable[[], bool],
+        rate: float = DEFAULT_OUTBOX_RATE,
+        max_attempts: int = DEFAULT_OUTBOX_MAX_ATTEMPTS,
+        retry_delay: float = DEFAULT_OUTBOX_RETRY_DELAY_S,
+        max_retry_delay: float = DEFAULT_OUTBOX_MAX_RETRY_DELAY_S,
+        poll_interval: float = DEFAULT_OUTBOX_POLL_INTERVAL_S,
+    ):
+        """
+        Initialize the outbox.
+
+        Args:
+            message_db: Database holding the outbox table
+            owner_id: Bot ID owning the queued messages
+            send: Sends a queued message as ``send(payload, message_id)``
+            is_ready: Whether the socket is open for sending
+            rate: Maximum messages sent per second
+            max_attempts: Failed attempts before a message is dead-lettered
+            retry_delay: Delay before the first retry in seconds
+            max_retry_delay: Upper bound of the retry delay in seconds
+            poll_interval: Seconds between checks for due messages
+        """
+        self.message_db = message_db
+        self.owner_id = owner_id
+        self.send = send
+        self.is_ready = is_ready
+        self.limiter = AsyncLimiter(max_rate=rate, time_period=1)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.poll_interval = poll_interval
+        self.sent = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def enqueue(self, payload: dict[str, Any]) -> int:
+        """
+        Store a message for sending.
+
+        Args:
+            payload: JSON-serializable keyword arguments of the send
+
+        Returns:
+            The idempotency ID of the message
+        """
+        message_id = generate_snowflake_id()
+        await self.message_db.add_outbox_message(
+            self.owner_id, message_id, payload, STATUS_PENDING, time.time()
+        )
+        self._wake.set()
+        return message_id
+
+    async def drain_once(self, limit: int = 100) -> int:
+        """
+        Send the messages that are due, oldest first.
+
+        Stops early when the socket closes; a send that fails because the
+        socket closed is not counted as an attempt.
+
+        Args:
+            limit: Maximum number of messages to process
+
+        Returns:
+            Number of messages sent
+        """
+        rows = await self.message_db.get_outbox_messages(
+            self.owner_id, STATUS_PENDING, due_before=time.time(), limit=limit
+        )
+
+        sent = 0
+        for row in rows:
+            if not self.is_ready():
+                break
+            message_id = row["id"]
+            await self.limiter.acquire()
+            try:
+                await self.send(row["payload"], message_id)
+            except Exception as e:
+                if not self.is_ready():
+                    break
+                await self._record_failure(message_id, row["attempts"] + 1, e)
+                continue
+
+            await self.message_db.delete_outbox_message(message_id)
+            self.sent += 1
+            sent += 1
+        return sent
+
+    async def _record_failure(
+        self, message_id: int, attempts: int, error: Exception
+    ) -> None:
+        if attempts >= self.max_attempts:
+            status, next_attempt_at = STATUS_DEAD, time.time()
+            self.dead_lettered += 1
+            logger.warning(
+                f"Outbox message {message_id} dead-lettered after "
+                f"{attempts} attempts: {error}"
+            )
+        else:
+            delay = min(self.max_retry_delay, self.retry_delay * 2 ** (attempts - 1))
+            status = STATUS_PENDING
+            next_attempt_at = time.time() + delay * (0.5 + random.random() / 2)
+            self.retried += 1
+
+        await self.message_db.update_outbox_message(
+            message_id, status, attempts, next_attempt_at, str(error)
+        )
+
+    def start(self) -> None:
+        """Start the background drainer if it is not running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background drainer; queued messages stay in the database."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def notify(self) -> None:
+        """Wake the drainer, e.g. after the socket reconnected."""
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                if self.is_ready():
+                    await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox drain failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def dead_letters(self, limit: int = 100) -> list[dict[str, Any]]:
+        """
+        List dead-lettered messages.
+
+        Args:
+            limit: Maximum number of messages to return
+
+        Returns:
+            Dicts with ``id``, ``payload``, ``attempts``, ``created_at`` and ``last_error``
+        """
+        return await self.message_db.get_outbox_messages(
+            self.owner_id, STATUS_DEAD, limit=limit
+        )
+
+    async def retry_dead_letters(self) -> int:
+        """
+        Queue every dead-lettered message again with a fresh attempt budget.
+
+        Returns:
+            Number of messages queued again
+        """
+        requeued = await self.message_db.requeue_outbox_messages(
+            self.owner_id, STATUS_DEAD, STATUS_PENDING, time.time()
+        )
+        self._wake.set()
+        return requeued
+
+    async def get_metrics(self) -> dict[str, float]:
+        """
+        Get the outbox depth, age and counters.
+
+        Returns:
+            Dict with ``depth`` (pending messages), ``dead``, ``oldest_age_s``
+            of the oldest pending message, and the ``sent``, ``retried`` and
+            ``dead_lettered`` counters of this process
+        """
+        rows = await self.message_db.get_outbox_stats(self.owner_id)
+
+        depth, oldest = rows.get(STATUS_PENDING, (0, None))
+        return {
+            "depth": depth,
+            "dead": rows.get(STATUS_DEAD, (0, None))[0],
+            "oldest_age_s": time.time() - oldest if oldest else 0.0,
+            "sent": self.sent,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+        }
@@ -0,0 +1,166 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Iterable, Optional
+
+from mezon.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_MAX_AGE_S = 24 * 60 * 60
+
+CLAN_FIELDS = ("clan_id", "clan_name", "welcome_channel_id")
+CHANNEL_FIELDS = (
+    "channel_id",
+    "clan_id",
+    "channel_label",
+    "type",
+    "channel_private",
+    "category_id",
+    "category_name",
+    "parent_id",
+    "meeting_code",
+)
+
+
+def snapshot_path_for(db_path: str, client_id: int | str) -> str:
+    """
+    Default snapshot location: next to the message database file.
+
+    Args:
+        db_path: Path of the message database
+        client_id: Bot ID owning the snapshot
+
+    Returns:
+        Path of the snapshot file
+    """
+    return os.path.join(
+        os.path.dirname(db_path) or ".", f"mezon-state-{client_id}.json"
+    )
+
+
+def _compact(item: Any, fields: tuple[str, ...]) -> dict[str, Any]:
+    return {
+        field: value
+        for field in fields
+        if (value := getattr(item, field, None)) is not None
+    }
+
+
+class StateSnapshot:
+    """
+    On-disk snapshot of a bot's clans, channel descriptions and DM map.
+
+    Only the fields needed to rebuild ``Clan`` and ``TextChannel`` objects are
+    kept. A snapshot is ignored when its format version differs, it belongs to
+    another bot or it is older than ``max_age_s``.
+    """
+
+    def __init__(self, path: str, max_age_s: float = DEFAULT_SNAPSHOT_MAX_AGE_S):
+        """
+        Initialize the snapshot store.
+
+        Args:
+            path: Path of the JSON snapshot file
+            max_age_s: Snapshots older than this many seconds are discarded
+        """
+        self.path = path
+        self.max_age_s = max_age_s
+
+    def load(self, client_id: int) -> Optional[dict[str, Any]]:
+        """
+        Read the snapshot if it is usable.
+
+        Args:
+            client_id: Bot ID the snapshot must belong to
+
+        Returns:
+            Dict with ``clans``, ``channels`` and ``dm_channels``, or None
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable state snapshot {self.path}: {e}")
+            return None
+
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return None
+        if data.get("client_id") != int(client_id):
+            return None
+        if time.time() - data.get("saved_at", 0) > self.max_age_s:
+            logger.info(f"Discarding stale state snapshot {self.path}")
+            return None
+
+        return {
+            "clans": data.get("clans", []),
+            "channels": data.get("channels", []),
+            "dm_channels": {
+                int(user_id): channel_id
+                for user_id, channel_id in data.get("dm_channels", {}).items()
+            },
+        }
+
+    def save(
+        self,
+        client_id: int,
+        clans: Iterable[Any],
+        channels: Iterable[Any],
+        dm_channels: Optional[dict[int, int]],
+    ) -> None:
+        """
+        Write the snapshot atomically.
+
+        Args:
+            client_id: Bot ID owning the snapshot
+            clans: Objects with ``clan_id``/``clan_name``/``welcome_channel_id``
+            channels: Channel descriptions
+            dm_channels: Mapping of user ID to DM channel ID
+        """
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "client_id": int(client_id),
+            "clans": [_compact(clan, CLAN_FIELDS) for clan in clans],
+            "channels": [_compact(channel, CHANNEL_FIELDS) for channel in channels],
+            "dm_channels": {
+                str(user_id): channel_id
+                for user_id, channel_id in (dm_channels or {}).items()
+            },
+        }
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    async def load_async(self, client_id: int) -> Optional[dict[str, Any]]:
+        """Run ``load`` in a worker thread."""
+        return await asyncio.to_thread(self.load, client_id)
+
+    async def save_async(self, *args: Any) -> None:
+        """Run ``save`` in a worker thread."""
+        await asyncio.to_thread(self.save, *args)
@@ -1,4 +1,5 @@
 from .default_socket import Socket
+from .send_handle import SendHandle
 from .websocket_adapter import (
     WebSocketAdapter,
     WebSocketAdapterPb,
@@ -15,7 +15,7 @@ limitations under the License.
 """
 
 import asyncio
-from typing import Any, Optional, TypeVar
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
 
 import google.protobuf.message
 from google.protobuf import json_format
@@ -43,8 +43,13 @@ from .message_builder import (
     MessageReactionBuilder,
 )
 from .promise_executor import PromiseExecutor
+from .send_handle import SendHandle
 from .websocket_adapter import WebSocketAdapterPb
 
+if TYPE_CHECKING:
+    from mezon.managers.command import CommandRouter
+    from mezon.managers.dedup import DuplicateFilter
+
 logger = get_logger(__name__)
 
 T = TypeVar("T", bound=BaseModel)
@@ -58,6 +63,7 @@ class Socket:
     DEFAULT_HEARTBEAT_TIMEOUT_MS = 10000
     DEFAULT_SEND_TIMEOUT_MS = 10000
     DEFAULT_CONNECT_TIMEOUT_MS = 30000
+    DEFAULT_MAX_UNACKED_SENDS = 256
 
     def __init__(
         self,
@@ -66,6 +72,7 @@ class Socket:
         adapter: Optional[WebSocketAdapterPb] = None,
         send_timeout_ms: int = DEFAULT_SEND_TIMEOUT_MS,
         event_manager: Optional[EventManager] = None,
+        max_unacked_sends: int = DEFAULT_MAX_UNACKED_SENDS,
     ):
         """
         Initialize Socket.
@@ -76,6 +83,8 @@ class Socket:
             adapter: WebSocket adapter instance
             send_timeout_ms: Timeout for send operations
             event_manager: EventManager instance for handling events
+            max_unacked_sends: Maximum number of ``write_chat_message_nowait``
+                sends awaiting their ack
         """
         self.ws_url = ws_url
         self.use_ssl = use_ssl
@@ -85,6 +94,9 @@ class Socket:
 
         self.cids: dict[int, PromiseExecutor] = {}
         self.next_cid = 1
+        self.max_unacked_sends = max_unacked_sends
+        self._unacked_slots: Optional[asyncio.Semaphore] = None
+        self._unacked_count = 0
 
         self.adapter = adapter or WebSocketAdapterPb()
 
@@ -98,6 +110,10 @@ class Socket:
         self.onerror: Optional[callable] = None
         self.onheartbeattimeout: Optional[callable] = None
         self.onconnect: Optional[callable] = None
+        # Called with (field_name, raw_bytes) for every non-RPC envelope
+        self.envelope_forwarder: Optional[callable] = None
+        self.command_router: Optional["CommandRouter"] = None
+        self.duplicate_filter: Optional["DuplicateFilter"] = None
 
         self._intentional_close = False
 
@@ -213,6 +229,10 @@ class Socket:
                         else:
                             logger.debug(f"No executor found for cid: {envelope.cid}")
                     else:
+                        if self.duplicate_filter and self._is_duplicate(envelope):
+                            continue
+                        if self.envelope_forwarder:
+                            self._forward_envelope(envelope, message)
                         if self.event_manager:
                             asyncio.create_task(
                                 self._emit_event_from_envelope(envelope)
@@ -229,6 +249,22 @@ class Socket:
                 except Exception as callback_error:
                     logger.error(f"Error in disconnect callback: {callback_error}")
 
+    def _forward_envelope(self, envelope: realtime_pb2.Envelope, raw: bytes) -> None:
+        """
+        Hand the raw bytes of an event envelope to the forwarder.
+
+        Args:
+            envelope: The parsed envelope
+            raw: The envelope bytes as received from the websocket
+        """
+        field_name = envelope.WhichOneof("message")
+        if not field_name:
+            return
+        try:
+            self.envelope_forwarder(field_name, raw)
+        except Exception as e:
+            logger.error(f"Error forwarding envelope '{field_name}': {e}")
+
     async def _start_listen(self) -> None:
         """Start the heartbeat ping-pong and listen tasks."""
         if self._heartbeat_task is None or self._heartbeat_task.done():
@@ -286,26 +322,19 @@ class Socket:
 
                 return
 
-    async def _send_with_cid(
-        self, message: realtime_pb2.Envelope, timeout_ms: int = None
-    ) -> Optional[realtime_pb2.Envelope]:
+    def _register_cid(
+        self, message: realtime_pb2.Envelope, timeout_ms: int
+    ) -> tuple[int, PromiseExecutor]:
         """
-        Send message with command ID and wait for response.
-        Matches TypeScript implementation pattern.
+        Assign a command ID to the message and track its pending response.
 
         Args:
             message: Message to send (will have cid added)
-            timeout_ms: Timeout in milliseconds (defaults to self.send_timeout_ms)
+            timeout_ms: Timeout in milliseconds
 
         Returns:
-            Response from server (or None on timeout)
-
-        Raises:
-            Exception: If server returns error or socket is not connected
+            The command ID and the executor resolved by the response
         """
-        if not self.adapter.is_open():
-            raise Exception("Socket connection has not been established yet.")
-
         loop = asyncio.get_event_loop()
         cid = self.generate_cid()
         message.cid = cid
@@ -313,8 +342,6 @@ class Socket:
         executor = PromiseExecutor(loop)
         self.cids[cid] = executor
 
-        timeout_ms = timeout_ms or self.send_timeout_ms
-
         def on_timeout():
             """Called when timeout occurs"""
             logger.warning(
@@ -323,6 +350,30 @@ class Socket:
             self._cleanup_cid(cid, executor)
 
         executor.set_timeout(timeout_ms / 1000, on_timeout)
+        return cid, executor
+
+    async def _send_with_cid(
+        self, message: realtime_pb2.Envelope, timeout_ms: int = None
+    ) -> Optional[realtime_pb2.Envelope]:
+        """
+        Send message with command ID and wait for response.
+        Matches TypeScript implementation pattern.
+
+        Args:
+            message: Message to send (will have cid added)
+            timeout_ms: Timeout in milliseconds (defaults to self.send_timeout_ms)
+
+        Returns:
+            Response from server (or None on timeout)
+
+        Raises:
+            Exception: If server returns error or socket is not connected
+        """
+        if not self.adapter.is_open():
+            raise Exception("Socket connection has not been established yet.")
+
+        timeout_ms = timeout_ms or self.send_timeout_ms
+        cid, executor = self._register_cid(message, timeout_ms)
 
         try:
             await self.adapter.send(message)
@@ -341,6 +392,18 @@ class Socket:
         finally:
             self._cleanup_cid(cid, executor)
 
+    def _is_duplicate(self, envelope: realtime_pb2.Envelope) -> bool:
+        field_name = envelope.WhichOneof("message")
+        if not field_name:
+            return False
+        try:
+            return self.duplicate_filter.is_duplicate(
+                field_name, getattr(envelope, field_name)
+            )
+        except Exception as e:
+            logger.error(f"Error checking envelope '{field_name}' for duplicates: {e}")
+            return False
+
     async def _emit_event_from_envelope(self, envelope: realtime_pb2.Envelope) -> None:
         """
         Parse the envelope and emit the appropriate event.
@@ -353,6 +416,10 @@ class Socket:
         if field_name:
             protobuf_payload = envelope.__getattribute__(field_name)
 
+            command_match = None
+            if self.command_router and field_name == "channel_message":
+                command_match = self.command_router.match(protobuf_payload)
+
             pydantic_payload = convert_envelope_to_pydantic(
                 field_name, protobuf_payload
             )
@@ -363,6 +430,11 @@ class Socket:
 
             await self.event_manager.emit(field_name, pydantic_payload)
 
+            if command_match:
+                asyncio.create_task(
+                    self.command_router.dispatch(command_match, pydantic_payload)
+                )
+
     async def _send_envelope_with_field(
         self,
         field_name: str,
@@ -384,6 +456,26 @@ class Socket:
         getattr(envelope, field_name).CopyFrom(message)
         return await self._send_with_cid(envelope, timeout_ms)
 
+    async def send_without_ack(
+        self, field_name: str, message: google.protobuf.message.Message
+    ) -> None:
+        """
+        Send an envelope without a command ID, so no acknowledgement is awaited.
+
+        Args:
+            field_name: Name of the field to set in the envelope
+            message: Protobuf message to attach to the envelope
+
+        Raises:
+            Exception: If socket is not connected
+        """
+        if not self.adapter.is_open():
+            raise Exception("Socket connection has not been established yet.")
+
+        envelope = realtime_pb2.Envelope()
+        getattr(envelope, field_name).CopyFrom(message)
+        await self.adapter.send(envelope)
+
     def _handle_response(
         self,
         response: Optional[realtime_pb2.Envelope],
@@ -477,6 +569,7 @@ class Socket:
         avatar: Optional[str] = None,
         code: Optional[int] = None,
         topic_id: Optional[int] = None,
+        message_id: Optional[int] = None,
     ) -> ChannelMessageAck:
         """
         Write a message to a channel.
@@ -495,6 +588,7 @@ class Socket:
             avatar: Avatar URL for the message
             code: Message code
             topic_id: Topic ID for threaded messages
+            message_id: Client-chosen message ID, used to deduplicate retries
 
         Returns:
             ChannelMessageAck: Acknowledgement of the sent message
@@ -502,7 +596,8 @@ class Socket:
         Raises:
             Exception: If sending fails
         """
-        channel_message_send = ChannelMessageBuilder.build(
+        envelope = realtime_pb2.Envelope()
+        ChannelMessageBuilder.build(
             clan_id=clan_id,
             channel_id=channel_id,
             mode=mode,
@@ -516,11 +611,11 @@ class Socket:
             avatar=avatar,
             code=code,
             topic_id=topic_id,
+            message_id=message_id,
+            message=envelope.channel_message_send,
         )
 
-        response = await self._send_envelope_with_field(
-            "channel_message_send", channel_message_send
-        )
+        response = await self._send_with_cid(envelope)
         return self._handle_response(
             response,
             "channel_message_ack",
@@ -528,6 +623,116 @@ class Socket:
             "Server did not return a channel_message_send acknowledgement.",
         )
 
+    async def write_chat_message_nowait(
+        self,
+        clan_id: int,
+        channel_id: int,
+        mode: int,
+        is_public: bool,
+        content: Any,
+        mentions: Optional[list[ApiMessageMention]] = None,
+        attachments: Optional[list[ApiMessageAttachment]] = None,
+        references: Optional[list[ApiMessageRef]] = None,
+        anonymous_message: Optional[bool] = None,
+        mention_everyone: Optional[bool] = None,
+        avatar: Optional[str] = None,
+        code: Optional[int] = None,
+        topic_id: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+    ) -> SendHandle:
+        """
+        Write a message to a channel without waiting for its acknowledgement.
+
+        Returns as soon as the frame is sent. Once ``max_unacked_sends``
+        messages are awaiting their ack, further calls wait for a slot.
+        Arguments are the same as ``write_chat_message``.
+
+        Args:
+            clan_id: Clan ID
+            channel_id: Channel ID to send message to
+            mode: Channel mode
+            is_public: Whether the channel is public
+            content: Message content (can be string or dict)
+            mentions: Optional list of message mentions
+            attachments: Optional list of message attachments
+            references: Optional list of message references
+            anonymous_message: Whether to send as anonymous
+            mention_everyone: Whether to mention everyone
+            avatar: Avatar URL for the message
+            code: Message code
+            topic_id: Topic ID for threaded messages
+            timeout_ms: Ack timeout in milliseconds (defaults to send_timeout_ms)
+
+        Returns:
+            SendHandle resolving to the ``ChannelMessageAck``
+
+        Raises:
+            Exception: If the socket is not connected or the frame cannot be sent
+        """
+        envelope = realtime_pb2.Envelope()
+        ChannelMessageBuilder.build(
+            clan_id=clan_id,
+            channel_id=channel_id,
+            mode=mode,
+            is_public=is_public,
+            content=content,
+            mentions=mentions,
+            attachments=attachments,
+            references=references,
+            anonymous_message=anonymous_message,
+            mention_everyone=mention_everyone,
+            avatar=avatar,
+            code=code,
+            topic_id=topic_id,
+            message=envelope.channel_message_send,
+        )
+
+        if self._unacked_slots is None:
+            self._unacked_slots = asyncio.Semaphore(self.max_unacked_sends)
+        slots = self._unacked_slots
+        await slots.acquire()
+        try:
+            if not self.adapter.is_open():
+                raise Exception("Socket connection has not been established yet.")
+            timeout_ms = timeout_ms or self.send_timeout_ms
+            cid, executor = self._register_cid(envelope, timeout_ms)
+            try:
+                await self.adapter.send(envelope)
+            except BaseException:
+                self._cleanup_cid(cid, executor)
+                raise
+        except BaseException:
+            slots.release()
+            raise
+        self._unacked_count += 1
+
+        async def collect_ack() -> ChannelMessageAck:
+            try:
+                response = await executor.future
+            except asyncio.CancelledError:
+                if executor.future.cancelled():
+                    raise TimeoutError(
+                        f"Request with cid {cid} timed out after {timeout_ms}ms"
+                    )
+                raise
+            finally:
+                self._cleanup_cid(cid, executor)
+                self._unacked_count -= 1
+                slots.release()
+            return self._handle_response(
+                response,
+                "channel_message_ack",
+                ChannelMessageAck,
+                "Server did not return a channel_message_send acknowledgement.",
+            )
+
+        return SendHandle(cid, asyncio.create_task(collect_ack()))
+
+    @property
+    def unacked_sends(self) -> int:
+        """Number of messages sent with ``write_chat_message_nowait`` awaiting their ack."""
+        return self._unacked_count
+
     async def update_chat_message(
         self,
         clan_id: int,
@@ -770,6 +975,9 @@ class Socket:
         """
         Send typing indicator to a channel.
 
+        Waits for the acknowledgement and bypasses ``client.signals``; use
+        ``TextChannel.typing()`` for coalesced, unacknowledged signals.
+
         Args:
             clan_id: Clan ID
             channel_id: Channel ID where user is typing
@@ -804,6 +1012,9 @@ class Socket:
         """
         Mark a message as last seen/read.
 
+        Waits for the acknowledgement and bypasses ``client.signals``; use
+        ``TextChannel.mark_seen()`` for coalesced, unacknowledged signals.
+
         Args:
             clan_id: Clan ID
             channel_id: Channel ID where the message exists
@@ -34,16 +34,19 @@ class ChannelMessageBuilder:
     """
 
     @staticmethod
-    def _prepare_content(content: ChannelMessageContent | dict) -> str:
+    def _prepare_content(content: ChannelMessageContent | dict | str) -> str:
         """
         Prepare message content for sending.
 
         Args:
-            content: Message content (can be string or dict)
+            content: Message content (a dict, a model, or an already
+                serialized string which is passed through unchanged)
 
         Returns:
             Serialized content string
         """
+        if isinstance(content, str):
+            return content
         if isinstance(content, dict):
             return json.dumps(content)
         return json.dumps(content.model_dump(by_alias=True))
@@ -170,6 +173,8 @@ class ChannelMessageBuilder:
         avatar: Optional[str] = None,
         code: Optional[int] = None,
         topic_id: Optional[int] = None,
+        message_id: Optional[int] = None,
+        message: Optional[realtime_pb2.ChannelMessageSend] = None,
     ) -> realtime_pb2.ChannelMessageSend:
         """
         Build a complete ChannelMessageSend protobuf message.
@@ -188,18 +193,24 @@ class ChannelMessageBuilder:
             avatar: Avatar URL for the message
             code: Message code
             topic_id: Topic ID for threaded messages
+            message_id: Client-chosen message ID, used to deduplicate retries
+            message: Empty message to fill in place, such as the
+                ``channel_message_send`` field of an envelope, which avoids
+                copying the built message into it (default: a new message)
 
         Returns:
             Configured ChannelMessageSend protobuf message
         """
         content_str = cls._prepare_content(content)
-        message = realtime_pb2.ChannelMessageSend(
-            clan_id=clan_id,
-            channel_id=channel_id,
-            mode=mode,
-            is_public=is_public,
-            content=content_str,
-        )
+        if message is None:
+            message = realtime_pb2.ChannelMessageSend()
+        message.clan_id = clan_id
+        message.channel_id = channel_id
+        message.mode = mode
+        message.is_public = is_public
+        message.content = content_str
+        if message_id:
+            message.id = message_id
         if mentions:
             cls._add_mentions(message, mentions)
         if attachments:
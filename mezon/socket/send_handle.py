@@ -0,0 +1,91 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+from typing import Any, Callable, Generator, Optional
+
+from mezon.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SendHandle:
+    """
+    Pending acknowledgement of a message whose frame has already been sent.
+
+    Await the handle to get the acknowledgement (or the send error or
+    ``TimeoutError``), or register a callback with ``add_done_callback``.
+    Failures nobody awaits are logged instead of being silently dropped.
+    """
+
+    def __init__(self, cid: int, task: asyncio.Task):
+        """
+        Initialize the handle.
+
+        Args:
+            cid: Command ID of the sent envelope
+            task: Task resolving to the acknowledgement
+        """
+        self.cid = cid
+        self._task = task
+        self._observed = False
+        task.add_done_callback(self._log_unobserved_failure)
+
+    def __await__(self) -> Generator[Any, None, Any]:
+        self._observed = True
+        return self._task.__await__()
+
+    def done(self) -> bool:
+        """Whether the acknowledgement arrived or the send failed."""
+        return self._task.done()
+
+    def result(self) -> Any:
+        """
+        Get the acknowledgement of a completed send.
+
+        Raises:
+            asyncio.InvalidStateError: If the send is still pending
+            Exception: The error of a failed send
+        """
+        self._observed = True
+        return self._task.result()
+
+    def exception(self) -> Optional[BaseException]:
+        """
+        Get the error of a completed send.
+
+        Returns:
+            The error, or None if the send was acknowledged
+        """
+        self._observed = True
+        return self._task.exception()
+
+    def add_done_callback(self, callback: Callable[["SendHandle"], Any]) -> None:
+        """
+        Call ``callback(handle)`` once the send completes.
+
+        Args:
+            callback: Receives this handle; may inspect ``exception()``/``result()``
+        """
+        self._observed = True
+        self._task.add_done_callback(lambda _: callback(self))
+
+    def _log_unobserved_failure(self, task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None and not self._observed:
+            logger.warning(f"Unacknowledged send with cid {self.cid} failed: {error}")
@@ -18,5 +18,6 @@ from .button_builder import ButtonBuilder
 from .clan import Clan
 from .interactive_message import InteractiveBuilder
 from .message import Message
+from .message_template import MessageTemplate
 from .text_channel import TextChannel
 from .user import User
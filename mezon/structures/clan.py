@@ -14,13 +14,20 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from typing import TYPE_CHECKING, Any, Optional
+import asyncio
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
 
 from mezon.api import MezonApi
 from mezon.constants.enum import ChannelType
 from mezon.managers.cache import CacheManager
+from mezon.managers.members import ClanMember, ClanMemberIndex
 from mezon.messages.db import MessageDB
-from mezon.models import ApiRoleListEventResponse, ApiVoiceChannelUserList
+from mezon.models import (
+    ApiRole,
+    ApiRoleListEventResponse,
+    ApiVoiceChannelUser,
+    ApiVoiceChannelUserList,
+)
 from mezon.utils.logger import get_logger
 
 from .text_channel import TextChannel
@@ -85,6 +92,8 @@ class Clan:
         self.channels: CacheManager[int, TextChannel] = CacheManager(
             fetcher=channel_fetcher
         )
+        self.members = ClanMemberIndex()
+        self._members_loading: Optional[asyncio.Task] = None
 
     def __repr__(self) -> str:
         """String representation of the clan."""
@@ -94,19 +103,15 @@ class Clan:
         if self._channels_loaded:
             return
 
-        channels = await self.api_client.list_channel_descs(
+        channels = self.api_client.iter_channel_descs(
             token=self.session_token,
             channel_type=ChannelType.CHANNEL_TYPE_CHANNEL,
             clan_id=self.id,
         )
 
-        valid_channels = [
-            c
-            for c in (channels.channeldesc if channels and channels.channeldesc else [])
-            if c.channel_id
-        ]
-
-        for channel in valid_channels:
+        async for channel in channels:
+            if not channel.channel_id:
+                continue
             channel_obj = TextChannel(
                 init_channel_data=channel,
                 clan=self,
@@ -118,6 +123,67 @@ class Clan:
 
         self._channels_loaded = True
 
+    async def load_members(self, force: bool = False) -> ClanMemberIndex:
+        """
+        Fill the member index with the full member list of the clan.
+
+        Concurrent calls share one request. Once loaded, the index is kept
+        current from realtime events and is not fetched again unless
+        ``force`` is set.
+
+        Args:
+            force: Fetch the member list even if it was already loaded
+
+        Returns:
+            The member index
+        """
+        if self.members.loaded and not force:
+            return self.members
+        if self._members_loading is None or self._members_loading.done():
+            self._members_loading = asyncio.create_task(self._fetch_members())
+        await asyncio.shield(self._members_loading)
+        return self.members
+
+    async def _fetch_members(self) -> None:
+        self.members.begin_load()
+        try:
+            response = await self.api_client.list_clan_users(
+                token=self.session_token, clan_id=self.id
+            )
+        except BaseException:
+            self.members.cancel_load()
+            raise
+        self.members.replace(
+            ClanMember(
+                clan_user.user.id,
+                username=clan_user.user.username,
+                display_name=clan_user.user.display_name,
+                avatar=clan_user.user.avatar_url,
+                clan_nick=clan_user.clan_nick,
+                clan_avatar=clan_user.clan_avatar,
+                role_ids=tuple(clan_user.role_id),
+            )
+            for clan_user in response.clan_users
+            if clan_user.user.id
+        )
+        logger.debug(f"Loaded {len(self.members)} members of clan {self.id}")
+
+    async def get_member(self, user_id: int) -> Optional[ClanMember]:
+        """
+        Look up a member, loading the member list if the user is not indexed yet.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            The member, or None if the user is not a member of the clan
+        """
+        member = self.members.get(user_id)
+        if member is None and not self.members.loaded:
+            await self.load_members()
+            member = self.members.get(user_id)
+        return member
+
     async def list_channel_voice_users(
         self,
         channel_id: int = 0,
@@ -143,6 +209,26 @@ class Clan:
             cursor=cursor,
         )
 
+    def iter_channel_voice_users(
+        self,
+        channel_id: int = 0,
+        channel_type: int = None,
+        state: int = 0,
+        page_size: int = 0,
+    ) -> AsyncIterator[ApiVoiceChannelUser]:
+        """Iterate the voice users of the clan across all pages."""
+        if channel_type is None:
+            channel_type = ChannelType.CHANNEL_TYPE_GMEET_VOICE
+
+        return self.api_client.iter_channel_voice_users(
+            token=self.session_token,
+            clan_id=self.id,
+            channel_id=channel_id,
+            channel_type=channel_type,
+            state=state,
+            page_size=page_size,
+        )
+
     async def update_role(self, role_id: int, request: dict) -> bool:
         return await self.api_client.update_role(
             token=self.session_token,
@@ -163,3 +249,12 @@ class Clan:
             state=state,
             cursor=cursor,
         )
+
+    def iter_roles(self, state: int = 0, page_size: int = 0) -> AsyncIterator[ApiRole]:
+        """Iterate the roles of the clan across all pages."""
+        return self.api_client.iter_roles(
+            token=self.session_token,
+            clan_id=self.id,
+            state=state,
+            page_size=page_size,
+        )
@@ -0,0 +1,87 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import re
+from typing import Any
+
+from mezon.models import ChannelMessageContent
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+
+class MessageTemplate:
+    """
+    Message content serialized once and rendered with placeholder values.
+
+    String values in the content may contain ``{{name}}`` placeholders. The
+    content is encoded to JSON when the template is created; ``render`` only
+    escapes the placeholder values and joins them with the cached JSON
+    fragments. The rendered string can be passed as ``content`` to any send
+    method and is sent without being serialized again.
+
+    Example:
+        >>> template = MessageTemplate(
+        ...     ChannelMessageContent(t="Hello {{name}}!", components=buttons)
+        ... )
+        >>> await channel.send(template.render(name=user.display_name))
+    """
+
+    def __init__(self, content: ChannelMessageContent | dict[str, Any]):
+        """
+        Serialize the content of the template.
+
+        Args:
+            content: Message content, possibly with ``{{name}}`` placeholders
+                in its string values
+        """
+        if isinstance(content, ChannelMessageContent):
+            content = content.model_dump(by_alias=True)
+        self.content = json.dumps(content)
+
+        parts = PLACEHOLDER_PATTERN.split(self.content)
+        self._literals: list[str] = parts[0::2]
+        self._names: list[str] = parts[1::2]
+
+    @property
+    def placeholders(self) -> set[str]:
+        """Names of the placeholders in the template."""
+        return set(self._names)
+
+    def render(self, **values: Any) -> str:
+        """
+        Substitute the placeholders and return the serialized content.
+
+        Args:
+            **values: Value of each placeholder, converted with ``str``
+
+        Returns:
+            Serialized message content
+
+        Raises:
+            KeyError: If a placeholder has no value
+        """
+        if not self._names:
+            return self.content
+
+        escaped = {
+            name: json.dumps(str(values[name]))[1:-1] for name in self.placeholders
+        }
+        parts = [self._literals[0]]
+        for name, literal in zip(self._names, self._literals[1:]):
+            parts.append(escaped[name])
+            parts.append(literal)
+        return "".join(parts)
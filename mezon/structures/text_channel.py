@@ -36,6 +36,7 @@ from .message import Message
 
 if TYPE_CHECKING:
     from mezon.managers.socket import SocketManager
+    from mezon.socket import SendHandle
 
     from .clan import Clan
 
@@ -98,6 +99,7 @@ class TextChannel:
         anonymous_message: Optional[bool] = None,
         topic_id: Optional[int] = None,
         code: Optional[int] = None,
+        message_id: Optional[int] = None,
     ) -> ChannelMessageAck:
         """
         Send a message to this channel.
@@ -110,6 +112,8 @@ class TextChannel:
             anonymous_message: Whether the message is anonymous
             topic_id: Topic ID for threaded messages
             code: Message type code
+            message_id: Idempotency ID; resending with the same ID lets the
+                server recognize the retry
 
         Returns:
             The message acknowledgement
@@ -126,9 +130,141 @@ class TextChannel:
             "mention_everyone": mention_everyone,
             "code": code,
             "topic_id": topic_id,
+            "message_id": message_id,
         }
         return await self.socket_manager.write_chat_message(**data_send)
 
+    async def send_nowait(
+        self,
+        content: ChannelMessageContent,
+        mentions: Optional[list[ApiMessageMention]] = None,
+        attachments: Optional[list[ApiMessageAttachment]] = None,
+        mention_everyone: Optional[bool] = None,
+        anonymous_message: Optional[bool] = None,
+        topic_id: Optional[int] = None,
+        code: Optional[int] = None,
+    ) -> "SendHandle":
+        """
+        Send a message to this channel without waiting for its acknowledgement.
+
+        Example:
+            handles = [await channel.send_nowait(content) for content in contents]
+            acks = await asyncio.gather(*handles, return_exceptions=True)
+
+        Args:
+            content: Message content
+            mentions: List of user mentions
+            attachments: List of attachments
+            mention_everyone: Whether to mention everyone
+            anonymous_message: Whether the message is anonymous
+            topic_id: Topic ID for threaded messages
+            code: Message type code
+
+        Returns:
+            Handle resolving to the message acknowledgement
+        """
+        return await self.socket_manager.write_chat_message_nowait(
+            clan_id=self.clan.id,
+            channel_id=self.id,
+            mode=convert_channeltype_to_channel_mode(self.channel_type),
+            is_public=not self.is_private,
+            content=content,
+            mentions=mentions,
+            attachments=attachments,
+            anonymous_message=anonymous_message,
+            mention_everyone=mention_everyone,
+            code=code,
+            topic_id=topic_id,
+        )
+
+    async def send_queued(
+        self,
+        content: ChannelMessageContent,
+        mentions: Optional[list[ApiMessageMention]] = None,
+        attachments: Optional[list[ApiMessageAttachment]] = None,
+        mention_everyone: Optional[bool] = None,
+        anonymous_message: Optional[bool] = None,
+        topic_id: Optional[int] = None,
+        code: Optional[int] = None,
+    ) -> int:
+        """
+        Queue a message in the client's outbox for durable delivery.
+
+        The message is stored before this returns and sent in the background
+        once the socket is open, surviving disconnects and restarts.
+
+        Args:
+            content: Message content
+            mentions: List of user mentions
+            attachments: List of attachments
+            mention_everyone: Whether to mention everyone
+            anonymous_message: Whether the message is anonymous
+            topic_id: Topic ID for threaded messages
+            code: Message type code
+
+        Returns:
+            Idempotency ID the message is sent with
+
+        Raises:
+            RuntimeError: If the client was created without an outbox
+        """
+        outbox = self.clan.client.outbox
+        if outbox is None:
+            raise RuntimeError("Outbox is disabled; create the client with outbox=True")
+
+        if not isinstance(content, (dict, str)):
+            content = content.model_dump(by_alias=True)
+        return await outbox.enqueue(
+            {
+                "clan_id": self.clan.id,
+                "channel_id": self.id,
+                "mode": convert_channeltype_to_channel_mode(self.channel_type),
+                "is_public": not self.is_private,
+                "content": content,
+                "mentions": [m.model_dump() for m in mentions or []],
+                "attachments": [a.model_dump() for a in attachments or []],
+                "mention_everyone": mention_everyone,
+                "anonymous_message": anonymous_message,
+                "topic_id": topic_id,
+                "code": code,
+            }
+        )
+
+    def mark_seen(
+        self, message_id: int, timestamp_seconds: Optional[int] = None
+    ) -> None:
+        """
+        Mark a message as the last one seen in this channel.
+
+        The signal is coalesced with later calls for the channel and sent in
+        the background without waiting for an acknowledgement.
+
+        Args:
+            message_id: ID of the last seen message
+            timestamp_seconds: When the message was seen (default: now)
+        """
+        self.clan.client.signals.mark_seen(
+            clan_id=self.clan.id,
+            channel_id=self.id,
+            mode=convert_channeltype_to_channel_mode(self.channel_type),
+            message_id=message_id,
+            timestamp_seconds=timestamp_seconds,
+        )
+
+    def typing(self) -> None:
+        """
+        Show the typing indicator in this channel.
+
+        Repeated calls within the client's typing interval send one signal,
+        without waiting for an acknowledgement.
+        """
+        self.clan.client.signals.typing(
+            clan_id=self.clan.id,
+            channel_id=self.id,
+            mode=convert_channeltype_to_channel_mode(self.channel_type),
+            is_public=not self.is_private,
+        )
+
     async def send_ephemeral(
         self,
         receiver_ids: list[int],
@@ -162,16 +298,15 @@ class TextChannel:
 
         if reference_message_id:
             message_ref = await self.messages.fetch(reference_message_id)
-            user = await self.clan.users.fetch(message_ref.sender_id)
+            # Only consult the index: a miss must not download the member list.
+            member = self.clan.members.get(message_ref.sender_id)
 
             references = [
                 ApiMessageRef(
                     message_ref_id=message_ref.id,
                     message_sender_id=message_ref.sender_id,
-                    message_sender_username=user.clan_nick
-                    or user.display_name
-                    or user.username,
-                    message_sender_avatar=user.clan_avatar or user.avatar,
+                    message_sender_username=member.name if member else None,
+                    message_sender_avatar=member.shown_avatar if member else None,
                     content=str(message_ref.content),
                 )
             ]
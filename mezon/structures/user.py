@@ -84,8 +84,7 @@ class User:
         attachments: Optional[list[ApiMessageAttachment]] = None,
     ) -> ChannelMessageAck:
         if not self.dm_channel_id:
-            dm_channel = await self.create_dm_channel()
-            self.dm_channel_id = dm_channel.channel_id
+            self.dm_channel_id = await self.channel_manager.ensure_dm_channel(self.id)
 
         logger.debug(
             f"Sending DM message to user {self.id} with channel {self.dm_channel_id}"
@@ -15,3 +15,4 @@ from .logger import (
     get_logger,
     setup_logger,
 )
+from .metrics import Histogram, PhaseTimer, TimingStats
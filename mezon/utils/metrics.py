@@ -0,0 +1,221 @@
+"""
+Copyright 2020 The Mezon Authors
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import bisect
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence
+
+
+class TimingStats:
+    """
+    Running timing statistics for a single operation.
+
+    Keeps exact count, total, max and error figures, plus a bounded window of
+    the most recent samples for percentile estimates.
+    """
+
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "_samples")
+
+    def __init__(self, window: int = 1024):
+        """
+        Initialize the statistics.
+
+        Args:
+            window: Number of recent samples kept for percentiles
+        """
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, duration_ms: float, error: bool = False) -> None:
+        """
+        Record one sample.
+
+        Args:
+            duration_ms: Duration of the operation in milliseconds
+            error: Whether the operation failed
+        """
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+        if error:
+            self.errors += 1
+        self._samples.append(duration_ms)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Record the duration of the wrapped block, counting exceptions as errors."""
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record((time.perf_counter() - start) * 1000, error=error)
+
+    @property
+    def avg_ms(self) -> float:
+        """Mean duration in milliseconds."""
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """
+        Get a percentile over the recent samples.
+
+        Args:
+            pct: Percentile between 0 and 100
+
+        Returns:
+            Duration in milliseconds (0.0 when there are no samples)
+        """
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> dict[str, float]:
+        """
+        Get the statistics as a plain dict.
+
+        Returns:
+            Dict with count, errors, avg/max and p50/p95/p99 in milliseconds
+        """
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": self.avg_ms,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+        }
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+
+    A value lands in the first bucket whose upper bound is greater than or
+    equal to it; values above the last bound are counted in ``+Inf``.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float]):
+        """
+        Initialize the histogram.
+
+        Args:
+            bounds: Increasing bucket upper bounds
+        """
+        self.bounds = tuple(sorted(bounds))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record one value.
+
+        Args:
+            value: The observed value
+        """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self) -> float:
+        """Mean of the observed values."""
+        return self.sum / self.count if self.count else 0.0
+
+    def snapshot(self) -> dict[str, object]:
+        """
+        Get the histogram as a plain dict.
+
+        Returns:
+            Dict with count, sum, mean and per-bucket counts keyed by ``<=bound``
+        """
+        buckets = {f"<={bound:g}": n for bound, n in zip(self.bounds, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.mean,
+            "buckets": buckets,
+        }
+
+
+class PhaseTimer:
+    """
+    Wall-clock timeline of named phases that may overlap.
+
+    Each phase records its start and end relative to the timer's creation, so
+    concurrent phases can be compared to find the critical path.
+    """
+
+    __slots__ = ("_origin", "_phases")
+
+    def __init__(self):
+        """Initialize the timer; offsets are measured from now."""
+        self._origin = time.perf_counter()
+        self._phases: dict[str, tuple[float, Optional[float]]] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Record the start and end of the wrapped block as phase ``name``.
+
+        Args:
+            name: Phase name
+        """
+        start = (time.perf_counter() - self._origin) * 1000
+        self._phases[name] = (start, None)
+        try:
+            yield
+        finally:
+            self._phases[name] = (start, (time.perf_counter() - self._origin) * 1000)
+
+    @property
+    def elapsed_ms(self) -> float:
+        """Milliseconds until the last finished phase ended."""
+        ends = [end for _, end in self._phases.values() if end is not None]
+        return max(ends, default=0.0)
+
+    def snapshot(self) -> dict[str, dict[str, Optional[float]]]:
+        """
+        Get the phases as a plain dict.
+
+        Returns:
+            Dict keyed by phase name with ``start_ms``, ``end_ms`` and
+            ``duration_ms`` (``None`` while the phase is still running)
+        """
+        return {
+            name: {
+                "start_ms": start,
+                "end_ms": end,
+                "duration_ms": end - start if end is not None else None,
+            }
+            for name, (start, end) in self._phases.items()
+        }
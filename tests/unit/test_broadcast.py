@@ -0,0 +1,205 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mezon.client import MezonClient
+from mezon.managers.broadcast import fan_out
+from mezon.managers.channel import ChannelManager
+from mezon.models import ApiChannelDescription, ChannelMessageContent
+from mezon.socket.message_builder import ChannelMessageBuilder
+
+
+class TestFanOut:
+    @pytest.mark.asyncio
+    async def test_bounds_in_flight_sends(self):
+        in_flight = 0
+        peak = 0
+
+        async def send(channel_id, message_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return f"ack-{channel_id}"
+
+        report = await fan_out(send, range(10), concurrency=3)
+
+        assert peak == 3
+        assert [result.ack for result in report.results] == [
+            f"ack-{i}" for i in range(10)
+        ]
+        assert report.stats()["sent"] == 10
+        assert report.throughput > 0
+
+    @pytest.mark.asyncio
+    async def test_retries_failures_and_reports_the_rest(self):
+        calls = {}
+        message_ids = {}
+
+        async def send(channel_id, message_id):
+            message_ids.setdefault(channel_id, set()).add(message_id)
+            calls[channel_id] = calls.get(channel_id, 0) + 1
+            if channel_id == 1 and calls[1] == 1:
+                raise ConnectionError("flaky")
+            if channel_id == 2:
+                raise ConnectionError("down")
+            return "ack"
+
+        report = await fan_out(send, [1, 2, 3, 1], retries=2, retry_delay=0)
+
+        assert [result.channel_id for result in report.results] == [1, 2, 3]
+        assert report.results[0].ok and report.results[0].attempts == 2
+        assert [result.channel_id for result in report.failed] == [2]
+        assert report.failed[0].attempts == 3
+        stats = report.stats()
+        assert stats["sent"] == 2 and stats["failed"] == 1
+        assert report.timing.errors == 1
+        assert all(len(ids) == 1 for ids in message_ids.values())
+        assert message_ids[1] == {report.results[0].message_id}
+        assert len({result.message_id for result in report.results}) == 3
+
+    @pytest.mark.asyncio
+    async def test_progress_callback_and_rate_limiter(self):
+        progress = []
+        limiter = SimpleNamespace(acquire=AsyncMock())
+
+        async def on_progress(done, total, result):
+            progress.append((done, total, result.channel_id))
+
+        def broken_progress(done, total, result):
+            raise RuntimeError("boom")
+
+        report = await fan_out(
+            AsyncMock(return_value="ack"),
+            [5, 6],
+            rate_limiter=limiter,
+            on_progress=on_progress,
+        )
+        await fan_out(AsyncMock(), [7], on_progress=broken_progress)
+
+        assert len(report.succeeded) == 2
+        assert [entry[:2] for entry in progress] == [(1, 2), (2, 2)]
+        assert {entry[2] for entry in progress} == {5, 6}
+        assert limiter.acquire.await_count == 2
+
+
+class TestClientBroadcast:
+    def test_prepare_content_passes_serialized_strings_through(self):
+        assert ChannelMessageBuilder._prepare_content('{"t":"hi"}') == '{"t":"hi"}'
+
+    @pytest.mark.asyncio
+    async def test_serializes_content_once(self):
+        client = MezonClient(client_id="1", api_key="key")
+        channel = SimpleNamespace(send=AsyncMock(return_value="ack"))
+        client.get_channel_from_id = AsyncMock(return_value=channel)
+
+        with patch.object(
+            ChannelMessageBuilder,
+            "_prepare_content",
+            wraps=ChannelMessageBuilder._prepare_content,
+        ) as prepare:
+            report = await client.broadcast(
+                ChannelMessageContent(t="hello"), [1, 2, 3], mention_everyone=True
+            )
+
+        prepare.assert_called_once()
+        assert len(report.succeeded) == 3
+        sent = channel.send.await_args
+        assert json.loads(sent.args[0])["t"] == "hello"
+        assert sent.kwargs == {
+            "mention_everyone": True,
+            "message_id": report.results[2].message_id,
+        }
+
+    @pytest.mark.asyncio
+    async def test_resolves_channels_before_sending(self):
+        client = MezonClient(client_id="1", api_key="key")
+        events = []
+        channel = SimpleNamespace(
+            send=AsyncMock(side_effect=lambda *a, **k: events.append("send"))
+        )
+
+        async def get_channel(channel_id):
+            events.append(f"lookup {channel_id}")
+            if channel_id == 2:
+                raise ValueError("Clan 9 not found")
+            return channel
+
+        client.get_channel_from_id = get_channel
+
+        report = await client.broadcast({"t": "hi"}, [1, 2, 3], retries=0)
+
+        assert events == ["lookup 1", "lookup 2", "lookup 3", "send", "send"]
+        assert [result.channel_id for result in report.results] == [1, 2, 3]
+        assert [result.channel_id for result in report.failed] == [2]
+        assert report.failed[0].message_id is None
+
+
+def _channel_manager(known=None, fail_for=()):
+    socket = SimpleNamespace(join_chat=AsyncMock())
+    created = []
+
+    async def create_channel_desc(token, request):
+        user_id = request.user_ids[0]
+        created.append(user_id)
+        await asyncio.sleep(0)
+        if user_id in fail_for:
+            raise ConnectionError("rate limited")
+        return ApiChannelDescription(channel_id=user_id * 10, clan_id=0, type=3)
+
+    manager = ChannelManager(
+        SimpleNamespace(create_channel_desc=create_channel_desc),
+        SimpleNamespace(get_socket=lambda: socket),
+        SimpleNamespace(get_session=lambda: SimpleNamespace(token="token")),
+    )
+    manager.all_dm_channels = dict(known or {})
+    return manager, created
+
+
+class TestDmChannels:
+    @pytest.mark.asyncio
+    async def test_ensure_dm_channel_reuses_map_and_coalesces_creation(self):
+        manager, created = _channel_manager(known={1: 100})
+
+        assert await manager.ensure_dm_channel(1) == 100
+        results = await asyncio.gather(
+            manager.ensure_dm_channel(2), manager.ensure_dm_channel(2)
+        )
+
+        assert results == [20, 20]
+        assert created == [2]
+        assert manager.get_dm_channel_id(2) == 20
+
+    @pytest.mark.asyncio
+    async def test_ensure_dm_channels_creates_only_missing(self):
+        manager, created = _channel_manager(known={1: 100}, fail_for={3})
+
+        channels, errors = await manager.ensure_dm_channels([1, 2, 3, 2])
+
+        assert channels == {1: 100, 2: 20}
+        assert list(errors) == [3]
+        assert sorted(created) == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_send_dm_bulk_reports_per_user(self):
+        client = MezonClient(client_id="1", api_key="key")
+        client.channel_manager, created = _channel_manager(known={1: 100}, fail_for={3})
+        client.socket_manager = SimpleNamespace(
+            write_chat_message=AsyncMock(return_value="ack")
+        )
+        client.save_snapshot = AsyncMock()
+
+        report = await client.send_dm_bulk([1, 2, 3], {"t": "hi"})
+
+        assert created == [2, 3]
+        assert {r.user_id: r.channel_id for r in report.succeeded} == {1: 100, 2: 20}
+        assert [(r.user_id, r.channel_id) for r in report.failed] == [(3, 0)]
+        sent = client.socket_manager.write_chat_message.await_args.kwargs
+        assert sent["content"] == '{"t": "hi"}'
+        assert sent["is_public"] is False
+        assert sent["message_id"] in {r.message_id for r in report.succeeded}
+        client.save_snapshot.assert_awaited_once()
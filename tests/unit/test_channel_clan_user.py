@@ -1,8 +1,10 @@
+from functools import partial
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
 import pytest
 
+from mezon.api.mezon_api import MezonApi
 from mezon.constants import ChannelType, TypeMessage
 from mezon.managers.channel import ChannelManager
 from mezon.models import ApiChannelDescList, ApiChannelDescription, UserInitData
@@ -10,10 +12,17 @@ from mezon.structures.clan import Clan
 from mezon.structures.user import User
 
 
+def _api_client(**methods):
+    """Fake API client whose channel iterator pages over ``list_channel_descs``."""
+    api_client = SimpleNamespace(**methods)
+    api_client.iter_channel_descs = partial(MezonApi.iter_channel_descs, api_client)
+    return api_client
+
+
 class TestChannelManagerClanAndUser:
     @pytest.mark.asyncio
     async def test_channel_manager_init_all_dm_channels_builds_mapping(self):
-        api_client = SimpleNamespace(
+        api_client = _api_client(
             list_channel_descs=AsyncMock(
                 return_value=ApiChannelDescList(
                     channeldesc=[
@@ -71,7 +80,7 @@ class TestChannelManagerClanAndUser:
                 set=lambda key, value: client_channel_cache.setdefault(key, value)
             ),
         )
-        api_client = SimpleNamespace(
+        api_client = _api_client(
             list_channel_descs=AsyncMock(
                 return_value=ApiChannelDescList(
                     channeldesc=[
@@ -132,11 +141,7 @@ class TestChannelManagerClanAndUser:
         socket_manager = SimpleNamespace(
             write_chat_message=AsyncMock(return_value="ack")
         )
-        channel_manager = SimpleNamespace(
-            create_dm_channel=AsyncMock(
-                return_value=ApiChannelDescription(channel_id=77)
-            )
-        )
+        channel_manager = SimpleNamespace(ensure_dm_channel=AsyncMock(return_value=77))
         user = User(
             UserInitData(id=123, username="alice", dm_channel_id=0),
             socket_manager,
@@ -148,7 +153,7 @@ class TestChannelManagerClanAndUser:
         )
 
         assert result == "ack"
-        channel_manager.create_dm_channel.assert_awaited_once_with(123)
+        channel_manager.ensure_dm_channel.assert_awaited_once_with(123)
         assert user.dm_channel_id == 77
 
     def test_user_repr_includes_identity_fields(self):
@@ -160,3 +165,71 @@ class TestChannelManagerClanAndUser:
 
         assert "alice" in repr(user)
         assert "Alice" in repr(user)
+
+
+class TestPersistedDmChannels:
+    def _manager(self, persisted=None):
+        store = SimpleNamespace(
+            get_dm_channels=AsyncMock(return_value=persisted or {}),
+            save_dm_channels=AsyncMock(),
+        )
+        api_client = _api_client(
+            list_channel_descs=AsyncMock(
+                return_value=ApiChannelDescList(
+                    channeldesc=[
+                        ApiChannelDescription(
+                            channel_id=10,
+                            type=ChannelType.CHANNEL_TYPE_DM,
+                            user_ids=[100],
+                        ),
+                        ApiChannelDescription(
+                            channel_id=30,
+                            type=ChannelType.CHANNEL_TYPE_DM,
+                            user_ids=[300],
+                        ),
+                    ]
+                )
+            )
+        )
+        manager = ChannelManager(
+            api_client,
+            SimpleNamespace(),
+            SimpleNamespace(),
+            dm_store=store,
+            owner_id=1,
+        )
+        return manager, store
+
+    @pytest.mark.asyncio
+    async def test_persisted_map_is_used_and_reconciled_in_background(self):
+        manager, store = self._manager(persisted={100: 10, 200: 20})
+
+        await manager.load_dm_channels("token")
+
+        assert manager.get_dm_channel_id(200) == 20
+        await manager._dm_reconcile_task
+        assert manager.get_all_dm_channels() == {100: 10, 200: 20, 300: 30}
+        store.save_dm_channels.assert_awaited_once_with(1, {300: 30})
+
+    @pytest.mark.asyncio
+    async def test_empty_store_downloads_and_persists(self):
+        manager, store = self._manager()
+
+        await manager.load_dm_channels("token")
+
+        assert manager.get_all_dm_channels() == {100: 10, 300: 30}
+        store.save_dm_channels.assert_awaited_once_with(1, {100: 10, 300: 30})
+
+    @pytest.mark.asyncio
+    async def test_map_in_memory_is_kept_and_failures_are_logged(self):
+        manager, store = self._manager()
+        manager.all_dm_channels = {5: 50}
+
+        await manager.load_dm_channels("token")
+        store.save_dm_channels.side_effect = RuntimeError("disk full")
+        await manager.record_dm_channels({6: 60, 0: 1})
+
+        store.get_dm_channels.assert_not_awaited()
+        manager.api_client.list_channel_descs.assert_not_awaited()
+        assert manager.get_all_dm_channels() == {5: 50, 6: 60}
+        manager.stop()
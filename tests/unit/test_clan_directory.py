@@ -0,0 +1,185 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from mezon.client import MezonClient
+from mezon.constants import Events
+from mezon.managers.clan_directory import ClanDirectory
+from mezon.models import (
+    ApiChannelDescription,
+    ApiClanDesc,
+    ApiClanDescList,
+    ClanUpdatedEvent,
+)
+from mezon.structures.clan import Clan
+
+
+def _client():
+    client = MezonClient(client_id="1", api_key="key")
+    client.session_manager = SimpleNamespace(
+        get_session=lambda: SimpleNamespace(token="token")
+    )
+    client.api_client = SimpleNamespace(
+        get_channel_detail=AsyncMock(),
+        list_clans_descs=AsyncMock(),
+        invalidate_cache=Mock(),
+    )
+    client.socket_manager = Mock()
+    return client
+
+
+def _detail(channel_id=100, clan_id=10, clan_name=None):
+    return ApiChannelDescription(
+        channel_id=channel_id,
+        clan_id=clan_id,
+        clan_name=clan_name,
+        channel_label="general",
+        type=1,
+        last_sent_message=None,
+    )
+
+
+class TestClanDirectory:
+    def test_add_get_and_remove(self):
+        directory = ClanDirectory()
+        directory.add_many(
+            [ApiClanDesc(clan_id=1, clan_name="a"), ApiClanDesc(clan_name="no id")]
+        )
+
+        assert len(directory) == 1
+        assert 1 in directory
+        assert directory.get(1).clan_name == "a"
+        assert directory.remove(1).clan_name == "a"
+        assert directory.get(1) is None
+        assert directory.remove(1) is None
+
+    def test_replace_drops_clans_that_are_gone(self):
+        directory = ClanDirectory()
+        directory.add_many([ApiClanDesc(clan_id=1), ApiClanDesc(clan_id=2)])
+
+        directory.replace([ApiClanDesc(clan_id=2, clan_name="b")])
+
+        assert [desc.clan_id for desc in directory] == [2]
+
+    def test_apply_update_only_touches_known_clans(self):
+        directory = ClanDirectory()
+        directory.add(ApiClanDesc(clan_id=1, clan_name="old", welcome_channel_id=5))
+
+        updated = directory.apply_update(
+            ClanUpdatedEvent(clan_id=1, clan_name="new", clan_logo="logo.png")
+        )
+
+        assert updated.clan_name == "new"
+        assert updated.logo == "logo.png"
+        assert updated.welcome_channel_id == 5
+        assert directory.apply_update(SimpleNamespace(clan_id=2)) is None
+
+
+class TestClientClanLookup:
+    @pytest.mark.asyncio
+    async def test_known_clan_is_resolved_without_listing_clans(self):
+        client = _client()
+        client.clan_directory.add(
+            ApiClanDesc(clan_id=10, clan_name="clan", welcome_channel_id=100)
+        )
+        client.api_client.get_channel_detail.return_value = _detail()
+
+        channel = await client.get_channel_from_id(100)
+
+        assert channel.clan.name == "clan"
+        assert client.clans.get(10) is channel.clan
+        client.api_client.list_clans_descs.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_channel_detail_does_not_make_the_bot_a_member(self):
+        client = _client()
+        client.api_client.get_channel_detail.return_value = _detail(
+            clan_name="not joined"
+        )
+        client.api_client.list_clans_descs.return_value = ApiClanDescList()
+
+        with pytest.raises(ValueError, match="Clan 10 not found"):
+            await client.get_channel_from_id(100)
+
+        assert 10 not in client.clan_directory
+        assert client.clans.get(10) is None
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_one_clan_list_refresh(self):
+        client = _client()
+        client.api_client.get_channel_detail.return_value = _detail()
+        client.api_client.list_clans_descs.return_value = ApiClanDescList(
+            clandesc=[
+                ApiClanDesc(clan_id=10, clan_name="clan"),
+                ApiClanDesc(clan_id=11, clan_name="other"),
+            ]
+        )
+
+        channel = await client.get_channel_from_id(100)
+
+        assert channel.clan.name == "clan"
+        assert 11 in client.clan_directory
+        client.api_client.list_clans_descs.assert_awaited_once_with(token="token")
+
+    @pytest.mark.asyncio
+    async def test_unknown_clan_raises(self):
+        client = _client()
+        client.api_client.get_channel_detail.return_value = _detail()
+        client.api_client.list_clans_descs.return_value = ApiClanDescList()
+
+        with pytest.raises(ValueError, match="Clan 10 not found"):
+            await client.get_channel_from_id(100)
+
+
+class TestClientClanEvents:
+    def _with_clan(self):
+        client = _client()
+        client.clan_directory.add(ApiClanDesc(clan_id=10, clan_name="clan"))
+        clan = Clan(
+            clan_id=10,
+            clan_name="clan",
+            welcome_channel_id=100,
+            client=client,
+            api_client=client.api_client,
+            socket_manager=client.socket_manager,
+            session_token="token",
+            message_db=Mock(),
+        )
+        client.clans.set(10, clan)
+        return client, clan
+
+    @pytest.mark.asyncio
+    async def test_clan_updated_event_renames_cached_clan(self):
+        client, clan = self._with_clan()
+
+        await client.event_manager.emit(
+            Events.CLAN_UPDATED,
+            ClanUpdatedEvent(clan_id=10, clan_name="renamed", clan_logo=""),
+        )
+
+        assert client.clan_directory.get(10).clan_name == "renamed"
+        assert clan.name == "renamed"
+        client.api_client.invalidate_cache.assert_called_with("list_clans_descs")
+
+    @pytest.mark.asyncio
+    async def test_clan_deleted_event_forgets_clan(self):
+        client, _ = self._with_clan()
+
+        await client.event_manager.emit(
+            Events.CLAN_DELETED, SimpleNamespace(clan_id=10, deletor=2)
+        )
+
+        assert 10 not in client.clan_directory
+        assert client.clans.get(10) is None
+
+    @pytest.mark.asyncio
+    async def test_bot_removed_from_clan_forgets_clan(self):
+        client, _ = self._with_clan()
+
+        await client.event_manager.emit(
+            Events.USER_CLAN_REMOVED, SimpleNamespace(clan_id=10, user_ids=[1, 2])
+        )
+
+        assert 10 not in client.clan_directory
+        assert client.clans.get(10) is None
@@ -0,0 +1,227 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from mezon.client import MezonClient
+from mezon.managers.members import ClanMember, ClanMemberIndex
+from mezon.models import (
+    ApiChannelDescription,
+    ChannelMessage,
+    UserClanRemovedEvent,
+    UserProfileUpdatedEvent,
+)
+from mezon.protobuf.api import api_pb2
+from mezon.protobuf.rtapi import realtime_pb2
+from mezon.structures.clan import Clan
+from mezon.structures.text_channel import TextChannel
+
+
+def _clan(api_client=None, client=None):
+    return Clan(
+        1,
+        "Test Clan",
+        9,
+        client or SimpleNamespace(client_id=100),
+        api_client or SimpleNamespace(),
+        SimpleNamespace(),
+        "token",
+        SimpleNamespace(),
+    )
+
+
+def _clan_users(*users):
+    response = api_pb2.ClanUserList(clan_id=1)
+    for user_id, username, role_ids in users:
+        clan_user = response.clan_users.add(role_id=role_ids, clan_nick="")
+        clan_user.user.id = user_id
+        clan_user.user.username = username
+    return response
+
+
+class TestClanMemberIndex:
+    def test_lookup_by_id_and_role(self):
+        members = ClanMemberIndex()
+        members.upsert(1, username="ann", role_ids=[10])
+        members.upsert(2, username="bob", clan_nick="Bobby")
+        members.add_role(10, [2, 3])
+        members.remove_role(10, [1])
+
+        assert members.get(2).name == "Bobby"
+        assert members.get(1).shown_avatar is None
+        assert set(members.with_role(10)) == {2, 3}
+        assert members.has_role(3, 10)
+        assert not members.has_role(1, 10)
+        assert members.get(1).role_ids == ()
+
+        members.remove(2)
+        members.remove(3)
+        assert members.with_role(10) == frozenset()
+        assert len(members) == 1
+        assert [member.user_id for member in members] == [1]
+
+    def test_with_role_returns_a_snapshot(self):
+        members = ClanMemberIndex()
+        members.add_role(10, [1])
+        holders = members.with_role(10)
+
+        members.add_role(10, [2])
+        members.remove_role(10, [1, 2])
+
+        assert holders == frozenset({1})
+        assert members.with_role(10) == frozenset()
+        with pytest.raises(AttributeError):
+            holders.add(3)
+
+    def test_upsert_keeps_known_fields(self):
+        members = ClanMemberIndex()
+        members.upsert(1, username="ann", avatar="a.png")
+        members.upsert(1, display_name="Ann", avatar="")
+
+        member = members.get(1)
+        assert (member.username, member.display_name, member.avatar) == (
+            "ann",
+            "Ann",
+            "a.png",
+        )
+
+    def test_members_are_compact(self):
+        member = ClanMember(1, username="ann", clan_nick="")
+
+        assert not hasattr(member, "__dict__")
+        assert member.clan_nick is None
+
+    @pytest.mark.asyncio
+    async def test_clan_loads_members_once(self):
+        api_client = SimpleNamespace(
+            list_clan_users=AsyncMock(
+                return_value=_clan_users((1, "ann", [10]), (2, "bob", []), (0, "", []))
+            )
+        )
+        clan = _clan(api_client)
+
+        await asyncio.gather(clan.load_members(), clan.load_members())
+        assert await clan.get_member(5) is None
+
+        api_client.list_clan_users.assert_awaited_once_with(token="token", clan_id=1)
+        assert clan.members.loaded
+        assert len(clan.members) == 2
+        assert clan.members.with_role(10) == {1}
+        assert (await clan.get_member(2)).username == "bob"
+
+        await clan.load_members(force=True)
+        assert api_client.list_clan_users.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_events_during_load_survive_the_replace(self):
+        release = asyncio.Event()
+
+        async def list_clan_users(**kwargs):
+            await release.wait()
+            return _clan_users((1, "ann", [10]), (2, "bob", [10]))
+
+        clan = _clan(SimpleNamespace(list_clan_users=list_clan_users))
+        loading = asyncio.create_task(clan.load_members())
+        while clan.members._journal is None:
+            await asyncio.sleep(0)
+
+        clan.members.upsert(3, username="cat")
+        clan.members.remove(2)
+        clan.members.add_role(20, [1])
+        clan.members.upsert(1, display_name="Ann")
+        release.set()
+        await loading
+
+        assert {member.user_id for member in clan.members} == {1, 3}
+        assert clan.members.get(1).display_name == "Ann"
+        assert clan.members.with_role(10) == {1}
+        assert clan.members.with_role(20) == {1}
+
+        clan.api_client = SimpleNamespace(
+            list_clan_users=AsyncMock(side_effect=RuntimeError("down"))
+        )
+        with pytest.raises(RuntimeError):
+            await clan.load_members(force=True)
+        assert clan.members._journal is None
+
+
+class TestClientMemberEvents:
+    def _client(self):
+        client = MezonClient(client_id="100", api_key="key")
+        clan = _clan(client=client)
+        client.clans.set(1, clan)
+        return client, clan
+
+    @pytest.mark.asyncio
+    async def test_events_keep_the_index_current(self):
+        client, clan = self._client()
+        client.socket_manager = Mock()
+        client.channel_manager = SimpleNamespace(get_all_dm_channels=lambda: {})
+
+        added = realtime_pb2.AddClanUserEvent(clan_id=1)
+        added.user.user_id = 2
+        added.user.username = "bob"
+        await client._handle_add_clan_user_default(added)
+
+        client._index_message_sender(
+            ChannelMessage(
+                message_id=1,
+                clan_id=1,
+                channel_id=5,
+                sender_id=3,
+                username="cat",
+                clan_nick="Cat",
+            )
+        )
+
+        await client._handle_role_assign_default(
+            realtime_pb2.RoleAssignedEvent(
+                ClanId="1", role_id=10, user_ids_assigned=[2, 3]
+            )
+        )
+        await client._handle_role_assign_default(
+            realtime_pb2.RoleAssignedEvent(ClanId="1", role_id=10, user_ids_removed=[3])
+        )
+        await client._handle_user_profile_updated_default(
+            UserProfileUpdatedEvent(user_id=2, clan_id=0, display_name="Bob B")
+        )
+        await client._handle_user_clan_removed_default(
+            UserClanRemovedEvent(clan_id=1, user_ids=[3])
+        )
+
+        assert clan.members.get(2).display_name == "Bob B"
+        assert clan.members.with_role(10) == {2}
+        assert 3 not in clan.members
+
+    @pytest.mark.asyncio
+    async def test_ephemeral_reply_uses_member_index(self):
+        client, clan = self._client()
+        clan.members.upsert(2, username="bob", clan_nick="Bobby", avatar="b.png")
+        socket_manager = SimpleNamespace(write_ephemeral_message=AsyncMock())
+        channel = TextChannel(
+            ApiChannelDescription(channel_id=5, type=1, channel_private=0),
+            clan,
+            socket_manager,
+            Mock(),
+        )
+        channel.messages.fetch = AsyncMock(
+            return_value=SimpleNamespace(id=7, sender_id=2, content={"t": "hi"})
+        )
+
+        await channel.send_ephemeral([3], {"t": "only you"}, reference_message_id=7)
+
+        reference = socket_manager.write_ephemeral_message.await_args.kwargs[
+            "references"
+        ][0]
+        assert reference.message_sender_username == "Bobby"
+        assert reference.message_sender_avatar == "b.png"
+
+        clan.members.clear()
+        clan.api_client = SimpleNamespace(list_clan_users=AsyncMock())
+        await channel.send_ephemeral([3], {"t": "only you"}, reference_message_id=7)
+        reference = socket_manager.write_ephemeral_message.await_args.kwargs[
+            "references"
+        ][0]
+        assert reference.message_sender_username is None
+        clan.api_client.list_clan_users.assert_not_awaited()
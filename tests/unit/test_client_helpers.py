@@ -1,10 +1,12 @@
+import threading
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 from mezon.client import MezonClient
-from mezon.constants import ChannelType, Events
+from mezon.constants import ChannelType, Events, HandlerExecutor
+from mezon.managers.members import ClanMemberIndex
 from mezon.models import (
     ChannelCreatedEvent,
     ChannelMessage,
@@ -116,9 +118,11 @@ class TestClientHelpers:
                 join_chat=AsyncMock(), join_clan_chat=AsyncMock()
             )
         )
+        members = ClanMemberIndex()
+        members.upsert(2, username="user-2")
         client.clans = SimpleNamespace(
             get=lambda clan_id: SimpleNamespace(
-                channels=SimpleNamespace(delete=Mock())
+                channels=SimpleNamespace(delete=Mock()), members=members
             ),
             set=lambda *args, **kwargs: None,
         )
@@ -147,6 +151,7 @@ class TestClientHelpers:
             realtime_pb2.UserClanRemoved(user_ids=[2])
         )
         assert 2 not in user_cache
+        assert 2 not in members
 
     @pytest.mark.asyncio
     async def test_channel_event_handlers_update_join_and_delete(self):
@@ -230,6 +235,16 @@ class TestClientHelpers:
         await client._handle_user_channel_added_default(added_event)
         join_chat.assert_awaited_once()
 
+        await client._handle_user_channel_added_default(
+            SimpleNamespace(
+                clan_id=1,
+                channel_desc=None,
+                users=[SimpleNamespace(user_id=5)],
+                caller=None,
+            )
+        )
+        join_chat.assert_awaited_once()
+
         with patch("mezon.client.Clan") as clan_cls:
             clan_cls.return_value.load_channels = load_channels
             add_event = realtime_pb2.AddClanUserEvent(clan_id=3)
@@ -256,3 +271,61 @@ class TestClientHelpers:
         assert client.event_manager.has_listeners(
             Events.CHANNEL_MESSAGE
         ) is False or isinstance(client.event_manager, type(client.event_manager))
+
+
+class TestClientHandlerExecutor:
+    @pytest.mark.asyncio
+    async def test_invoke_handler_offloads_sync_handlers(self):
+        client = MezonClient(client_id="1", api_key="key", handler_executor="shared")
+        loop_thread = threading.get_ident()
+        seen = []
+
+        def sync_handler(value):
+            seen.append((value, threading.get_ident()))
+
+        await client._invoke_handler(sync_handler, 1)
+
+        assert seen[0][0] == 1
+        assert seen[0][1] != loop_thread
+        client.event_manager.shutdown(wait=True)
+
+    @pytest.mark.asyncio
+    async def test_close_socket_keeps_executor_policy(self):
+        client = MezonClient(
+            client_id="1",
+            api_key="key",
+            handler_executor=HandlerExecutor.DEDICATED,
+            slow_handler_threshold_ms=None,
+        )
+        client.socket_manager = SimpleNamespace(
+            get_socket=lambda: SimpleNamespace(close=AsyncMock())
+        )
+        old_manager = client.event_manager
+
+        await client.close_socket()
+
+        assert client.event_manager is not old_manager
+        assert client.event_manager.executor_policy == HandlerExecutor.DEDICATED
+        assert client.event_manager.slow_handler_threshold_ms is None
+
+
+class TestClientDmChannelEvents:
+    @pytest.mark.asyncio
+    async def test_user_channel_added_records_dm_peer(self):
+        client = MezonClient(client_id="1", api_key="key")
+        client.channel_manager = SimpleNamespace(record_dm_channels=AsyncMock())
+        socket = SimpleNamespace(join_chat=AsyncMock())
+        client.socket_manager = SimpleNamespace(get_socket=lambda: socket)
+        message = SimpleNamespace(
+            clan_id=0,
+            channel_desc=SimpleNamespace(
+                channel_id=70, type=ChannelType.CHANNEL_TYPE_DM, channel_private=1
+            ),
+            users=[SimpleNamespace(user_id=1)],
+            caller=SimpleNamespace(user_id=9),
+        )
+
+        await client.event_manager.emit(Events.USER_CHANNEL_ADDED, message)
+
+        client.channel_manager.record_dm_channels.assert_awaited_once_with({9: 70})
+        socket.join_chat.assert_awaited_once()
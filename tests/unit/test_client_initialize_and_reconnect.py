@@ -1,9 +1,11 @@
+import asyncio
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 from mezon.client import MezonClient
+from mezon.utils.metrics import PhaseTimer
 
 
 class TestClientInitializeAndReconnect:
@@ -27,14 +29,91 @@ class TestClientInitializeAndReconnect:
             socket_manager.connect = AsyncMock()
             socket_manager.connect_socket = AsyncMock()
             channel_manager = channel_manager_cls.return_value
-            channel_manager.init_all_dm_channels = AsyncMock()
+            channel_manager.load_dm_channels = AsyncMock()
 
             await client.initialize_managers(sock_session)
 
             socket_manager.connect.assert_awaited_once_with(sock_session)
             socket_manager.connect_socket.assert_awaited_once_with("token")
-            channel_manager.init_all_dm_channels.assert_awaited_once_with("token")
+            channel_manager.load_dm_channels.assert_awaited_once_with("token")
             session_manager_cls.assert_called()
+            session_manager_cls.return_value.start_auto_refresh.assert_called_once_with(
+                1, "key"
+            )
+
+    @pytest.mark.asyncio
+    async def test_session_refresh_updates_clans_and_emits_event(self):
+        client = MezonClient(client_id="1", api_key="key")
+        clan = SimpleNamespace(session_token="old")
+        client.clans.set(10, clan)
+        received = []
+        client.on_session_refreshed(received.append)
+        session = SimpleNamespace(token="new")
+
+        await client._on_session_refreshed(session)
+        await asyncio.sleep(0)
+
+        assert clan.session_token == "new"
+        assert received == [session]
+
+    @pytest.mark.asyncio
+    async def test_initialize_managers_runs_dm_lookup_alongside_socket(self):
+        client = MezonClient(
+            client_id="1", api_key="key", mmn_api_url=None, zk_api_url=None
+        )
+        sock_session = SimpleNamespace(
+            api_url="https://api.example.com",
+            ws_url="wss://socket.example.com",
+            token="token",
+        )
+        connected = asyncio.Event()
+        order = []
+
+        async def connect(session):
+            order.append("connect_start")
+            await connected.wait()
+            order.append("connect_end")
+
+        async def init_dm_channels(token):
+            order.append("dm")
+            connected.set()
+
+        with (
+            patch("mezon.client.SocketManager") as socket_manager_cls,
+            patch("mezon.client.ChannelManager") as channel_manager_cls,
+            patch("mezon.client.SessionManager"),
+        ):
+            socket_manager = socket_manager_cls.return_value
+            socket_manager.connect = AsyncMock(side_effect=connect)
+            socket_manager.connect_socket = AsyncMock()
+            channel_manager_cls.return_value.load_dm_channels = AsyncMock(
+                side_effect=init_dm_channels
+            )
+            timer = PhaseTimer()
+
+            await client.initialize_managers(sock_session, timer)
+
+        assert order == ["connect_start", "dm", "connect_end"]
+        assert set(timer.snapshot()) == {"socket_connect", "join_clans", "dm_channels"}
+
+    @pytest.mark.asyncio
+    async def test_ensure_zk_proof_retries_failed_setup(self):
+        client = MezonClient(client_id="1", api_key="key")
+        client.get_ephemeral_key_pair = Mock(
+            return_value=SimpleNamespace(public_key="pub", private_key="priv")
+        )
+        client.get_address_from_user_id = Mock(return_value="addr")
+        client.get_zk_proof = AsyncMock(side_effect=[RuntimeError("down"), "proof"])
+        client.session_manager = SimpleNamespace(
+            get_session=lambda: SimpleNamespace(id_token="jwt")
+        )
+
+        failed = client._start_zk_setup("jwt")
+        with pytest.raises(RuntimeError):
+            await failed
+
+        assert await client.ensure_zk_proof() == "proof"
+        assert client.get_zk_proof.await_count == 2
 
     @pytest.mark.asyncio
     async def test_retry_connection_stops_on_hard_disconnect_and_succeeds(self):
@@ -72,7 +151,8 @@ class TestClientInitializeAndReconnect:
     @pytest.mark.asyncio
     async def test_login_sets_state_and_disconnect_cleans_up(self):
         client = MezonClient(client_id="1", api_key="key")
-        client.get_session = AsyncMock(return_value="session")
+        session = SimpleNamespace(id_token="jwt")
+        client.get_session = AsyncMock(return_value=session)
         client.initialize_managers = AsyncMock()
         client.get_ephemeral_key_pair = Mock(
             return_value=SimpleNamespace(public_key="pub", private_key="priv")
@@ -89,8 +169,41 @@ class TestClientInitializeAndReconnect:
         assert client._enable_auto_reconnect is True
         assert client._is_hard_disconnect is False
         client._setup_reconnect_handlers.assert_called_once()
+        client.initialize_managers.assert_awaited_once_with(
+            session, client.login_timings
+        )
+        assert await client.ensure_zk_proof() == "proof"
+        client.get_zk_proof.assert_awaited_once_with("jwt")
+        assert client.address == "addr"
+        assert set(client.login_timings.snapshot()) == {
+            "authenticate",
+            "initialize_managers",
+            "zk_keys",
+            "zk_proof",
+        }
 
         await client.disconnect()
         client.disconnect_ai_agent_sse.assert_awaited_once()
         client.close_socket.assert_awaited_once()
         client.message_db.close.assert_awaited_once()
+
+
+class TestPhaseTimer:
+    def test_records_overlapping_phases(self):
+        timer = PhaseTimer()
+
+        with timer.phase("outer"):
+            with timer.phase("inner"):
+                pass
+
+        snapshot = timer.snapshot()
+        assert snapshot["outer"]["start_ms"] <= snapshot["inner"]["start_ms"]
+        assert snapshot["inner"]["end_ms"] <= snapshot["outer"]["end_ms"]
+        assert timer.elapsed_ms == snapshot["outer"]["end_ms"]
+
+    def test_running_phase_has_no_duration(self):
+        timer = PhaseTimer()
+
+        with timer.phase("running"):
+            assert timer.snapshot()["running"]["duration_ms"] is None
+            assert timer.elapsed_ms == 0.0
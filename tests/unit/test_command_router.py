@@ -0,0 +1,166 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from mezon.client import MezonClient
+from mezon.managers.command import CommandContext, CommandRouter
+from mezon.protobuf.api import api_pb2
+from mezon.protobuf.rtapi import realtime_pb2
+from mezon.socket.default_socket import Socket
+from mezon.utils.metrics import TimingStats
+
+
+def make_proto_message(text, clan_id=1, channel_id=2, sender_id=3):
+    return api_pb2.ChannelMessage(
+        clan_id=clan_id,
+        channel_id=channel_id,
+        sender_id=sender_id,
+        message_id=4,
+        content=json.dumps({"t": text}),
+    )
+
+
+class TestCommandRouter:
+    def test_matches_prefixes_aliases_and_longest_trigger(self):
+        router = CommandRouter(prefixes=["*", "!"])
+        router.add("role", Mock(), aliases=["r"])
+        router.add("role add", Mock())
+
+        match = router.match_text("  !Role add admin 'lead dev'")
+        assert match.command.name == "role add"
+        assert match.trigger == "!Role add"
+        assert match.raw_args == "admin 'lead dev'"
+
+        assert router.match_text("*r list").command.name == "role"
+        assert router.match_text("*roles") is None
+        assert router.match_text("role") is None
+        assert router.match_text("*") is None
+
+    def test_scoped_commands_prefer_most_specific(self):
+        router = CommandRouter()
+        router.add("help", Mock(name="global"))
+        clan_help = router.add("help", Mock(name="clan"), clan_ids=[10])
+        channel_help = router.add("help", Mock(name="channel"), channel_ids=[20])
+        router.add("admin", Mock(), clan_ids=[10])
+
+        assert router.match_text("*help", 10, 20).command is channel_help
+        assert router.match_text("*help", 10, 21).command is clan_help
+        assert router.match_text("*help", 11, 21).command.clan_ids is None
+        assert router.match_text("*admin", 11, 21) is None
+        assert len(router) == 4
+
+    def test_reregistering_same_scope_replaces_handler(self):
+        router = CommandRouter()
+        router.add("ping", Mock())
+        replacement = router.add("ping", Mock())
+
+        assert router.match_text("*ping").command is replacement
+        assert len(router) == 1
+
+    def test_match_reads_only_content_text(self):
+        router = CommandRouter(ignored_sender_ids=[99])
+        router.add("ping", Mock())
+
+        assert (
+            router.match(make_proto_message("*ping", clan_id=5)).command.name == "ping"
+        )
+        assert router.match(make_proto_message("*ping", sender_id=99)) is None
+        assert router.match(api_pb2.ChannelMessage(content="not json")) is None
+        assert router.match(api_pb2.ChannelMessage(content='{"t": 1}')) is None
+        assert router.match(api_pb2.ChannelMessage()) is None
+
+    def test_context_parses_args_lazily(self):
+        router = CommandRouter()
+        router.add("say", Mock())
+        context = CommandContext(router.match_text('*say "hello world" now'), None)
+
+        assert "args" not in context.__dict__
+        assert context.args == ["hello world", "now"]
+        assert context.name == "say"
+        assert CommandContext(router.match_text('*say "open'), None).args == ['"open']
+
+    @pytest.mark.asyncio
+    async def test_dispatch_records_timing_and_errors(self):
+        router = CommandRouter()
+        seen = []
+
+        @router.command("ok")
+        async def ok(context):
+            seen.append(context.message)
+
+        @router.command("sync")
+        def sync(context):
+            seen.append(context.raw_args)
+
+        @router.command("fail")
+        async def fail(context):
+            raise RuntimeError("boom")
+
+        await router.dispatch(router.match_text("*ok"), "message")
+        await router.dispatch(router.match_text("*sync a b"), "message")
+        await router.dispatch(router.match_text("*fail"), "message")
+
+        assert seen == ["message", "a b"]
+        metrics = router.get_metrics()
+        assert metrics["ok"]["count"] == 1
+        assert metrics["fail"]["errors"] == 1
+
+
+class TestTimingStats:
+    def test_percentiles_and_snapshot(self):
+        stats = TimingStats(window=3)
+        for duration in (5.0, 1.0, 3.0, 2.0):
+            stats.record(duration)
+
+        assert stats.count == 4
+        assert stats.max_ms == 5.0
+        assert stats.avg_ms == pytest.approx(2.75)
+        assert stats.percentile(50) == 2.0
+        assert stats.percentile(100) == 3.0
+        assert TimingStats().snapshot()["p99_ms"] == 0.0
+
+    def test_time_counts_errors(self):
+        stats = TimingStats()
+        with pytest.raises(ValueError):
+            with stats.time():
+                raise ValueError
+
+        assert stats.errors == 1
+
+
+class TestCommandRouting:
+    @pytest.mark.asyncio
+    async def test_socket_dispatches_matched_commands_after_emit(self):
+        socket = Socket("example.com")
+        socket.event_manager = SimpleNamespace(emit=AsyncMock())
+        socket.command_router = CommandRouter()
+        handler = AsyncMock()
+        socket.command_router.add("ping", handler)
+        envelope = realtime_pb2.Envelope()
+        envelope.channel_message.CopyFrom(make_proto_message("*ping x"))
+
+        await socket._emit_event_from_envelope(envelope)
+        await asyncio.sleep(0)
+
+        socket.event_manager.emit.assert_awaited_once()
+        context = handler.await_args.args[0]
+        assert context.raw_args == "x"
+        assert context.message.channel_id == 2
+
+    @pytest.mark.asyncio
+    async def test_client_command_decorator_uses_invoke_handler(self):
+        client = MezonClient(client_id="7", api_key="key", command_prefix="!")
+        seen = []
+
+        @client.command("echo", aliases=["e"])
+        def echo(context):
+            seen.append(context.args)
+
+        assert client.command_router.ignored_sender_ids == {7}
+        match = client.command_router.match_text("!e hi there")
+        await client.command_router.dispatch(match, None)
+
+        assert seen == [["hi", "there"]]
@@ -89,7 +89,6 @@ class TestDefaultSocketExtended:
         socket = Socket(ws_url="socket.example.com", adapter=ClosedAdapter())
         socket._send_envelope_with_field = AsyncMock(
             side_effect=[
-                self.make_ack_envelope(),
                 self.make_ack_envelope(),
                 self.make_channel_message_envelope(),
             ]
@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from mezon.client import MezonClient
+from mezon.managers.dedup import DuplicateFilter
+from mezon.protobuf.rtapi import realtime_pb2
+from mezon.socket.default_socket import Socket
+
+
+def _message(message_id=7, channel_id=1, update_time=0):
+    return SimpleNamespace(
+        channel_id=channel_id,
+        message_id=message_id,
+        code=0,
+        update_time_seconds=update_time,
+    )
+
+
+def _message_bytes(message_id=7, update_time=0):
+    envelope = realtime_pb2.Envelope()
+    envelope.channel_message.channel_id = 1
+    envelope.channel_message.message_id = message_id
+    envelope.channel_message.update_time_seconds = update_time
+    return envelope.SerializeToString()
+
+
+class MessageStream:
+    def __init__(self, messages):
+        self._messages = iter(messages)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._messages)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class TestDuplicateFilter:
+    def test_suppresses_repeats_of_the_same_message(self):
+        dedup = DuplicateFilter()
+
+        assert dedup.is_duplicate("channel_message", _message()) is False
+        assert dedup.is_duplicate("channel_message", _message()) is True
+        assert dedup.is_duplicate("channel_message", _message(channel_id=2)) is False
+        assert dedup.is_duplicate("channel_message", _message(update_time=5)) is False
+        assert dedup.is_duplicate("message_typing_event", _message()) is False
+
+        assert dedup.get_metrics() == {
+            "suppressed": 1,
+            "suppressed_by_event": {"channel_message": 1},
+            "tracked": 3,
+        }
+
+    def test_window_and_size_bound_memory(self):
+        dedup = DuplicateFilter(window=10, max_size=2)
+        with patch("mezon.managers.dedup.time.monotonic", return_value=0):
+            dedup.is_duplicate("channel_message", _message(1))
+            dedup.is_duplicate("channel_message", _message(2))
+            dedup.is_duplicate("channel_message", _message(3))
+            assert dedup.is_duplicate("channel_message", _message(1)) is False
+
+        with patch("mezon.managers.dedup.time.monotonic", return_value=11):
+            assert dedup.is_duplicate("channel_message", _message(3)) is False
+        assert dedup.get_metrics()["tracked"] == 1
+
+    def test_keys_are_configurable_per_event(self):
+        dedup = DuplicateFilter(
+            keys={
+                "channel_message": None,
+                "message_reaction_event": lambda event: event.id,
+            }
+        )
+
+        assert dedup.is_duplicate("channel_message", _message()) is False
+        assert dedup.is_duplicate("channel_message", _message()) is False
+        reaction = SimpleNamespace(id=3)
+        dedup.is_duplicate("message_reaction_event", reaction)
+        assert dedup.is_duplicate("message_reaction_event", reaction) is True
+
+        dedup.clear()
+        assert dedup.is_duplicate("message_reaction_event", reaction) is False
+
+    @pytest.mark.asyncio
+    async def test_socket_drops_duplicates_before_dispatch(self):
+        raw = [_message_bytes(), _message_bytes(), _message_bytes(update_time=9)]
+        socket = Socket(
+            "example.com", adapter=SimpleNamespace(_socket=MessageStream(raw))
+        )
+        socket.event_manager = None
+        socket.duplicate_filter = DuplicateFilter()
+        forwarded = []
+        socket.envelope_forwarder = lambda name, data: forwarded.append(data)
+
+        await socket._listen()
+
+        assert forwarded == [raw[0], raw[2]]
+        assert socket.duplicate_filter.get_metrics()["suppressed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failing_key_function_does_not_drop_the_socket(self):
+        raw = [_message_bytes(), _message_bytes()]
+        socket = Socket(
+            "example.com", adapter=SimpleNamespace(_socket=MessageStream(raw))
+        )
+        socket.event_manager = None
+        socket.duplicate_filter = DuplicateFilter(
+            keys={"channel_message": lambda _: 1 / 0}
+        )
+        forwarded = []
+        socket.envelope_forwarder = lambda name, data: forwarded.append(data)
+
+        await socket._listen()
+
+        assert forwarded == raw
+
+    def test_client_options(self):
+        assert MezonClient("1", "key").duplicate_filter.window == 300
+        assert MezonClient("1", "key", dedup_window=None).duplicate_filter is None
@@ -0,0 +1,106 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mezon.client import MezonClient
+from mezon.constants import Events
+from mezon.managers.batch import EventBatcher
+from mezon.utils.metrics import Histogram
+
+
+def message(index, channel_id=1):
+    return SimpleNamespace(index=index, channel_id=channel_id)
+
+
+class TestEventBatcher:
+    def test_validates_limits(self):
+        with pytest.raises(ValueError):
+            EventBatcher(AsyncMock(), max_items=0)
+        with pytest.raises(ValueError):
+            EventBatcher(AsyncMock(), max_delay_ms=-1)
+
+    @pytest.mark.asyncio
+    async def test_flushes_full_batches_per_key(self):
+        batches = []
+
+        async def handler(items):
+            batches.append([m.index for m in items])
+
+        batcher = EventBatcher(
+            handler, max_items=2, max_delay_ms=10_000, key=lambda m: m.channel_id
+        )
+        for index, channel_id in enumerate([1, 2, 1, 2, 1]):
+            await batcher.add(message(index, channel_id))
+        await asyncio.sleep(0)
+
+        assert sorted(batches) == [[0, 2], [1, 3]]
+        assert batcher.pending == 1
+
+        await batcher.flush()
+        assert batches[-1] == [4]
+        metrics = batcher.get_metrics()
+        assert metrics["batch_size"]["count"] == 3
+        assert metrics["batch_size"]["buckets"]["<=2"] == 2
+        assert metrics["handler"]["count"] == 3
+        assert metrics["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_max_delay_and_logs_errors(self):
+        handler = AsyncMock(side_effect=RuntimeError("boom"))
+        batcher = EventBatcher(handler, max_items=100, max_delay_ms=5)
+
+        await batcher.add(message(0))
+        await batcher.add(message(1))
+        await asyncio.sleep(0.05)
+
+        handler.assert_awaited_once()
+        assert len(handler.await_args.args[0]) == 2
+        assert batcher.handler_timing.errors == 1
+        assert batcher.batch_latency_ms.count == 1
+        assert batcher.batch_latency_ms.mean >= 4
+
+    @pytest.mark.asyncio
+    async def test_key_errors_skip_payload(self):
+        handler = AsyncMock()
+        batcher = EventBatcher(handler, key=lambda m: m.missing)
+
+        await batcher.add(message(0))
+
+        assert batcher.pending == 0
+
+
+class TestHistogram:
+    def test_buckets_are_upper_bounds(self):
+        histogram = Histogram([10, 1, 5])
+        for value in (0.5, 1, 3, 10, 11):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["buckets"] == {"<=1": 2, "<=5": 1, "<=10": 1, "+Inf": 1}
+        assert snapshot["mean"] == pytest.approx(5.1)
+        assert Histogram([1]).mean == 0.0
+
+
+class TestClientBatchHandler:
+    @pytest.mark.asyncio
+    async def test_on_channel_message_batch_and_disconnect_flush(self):
+        client = MezonClient(client_id="1", api_key="key")
+        received = []
+        batcher = client.on_channel_message_batch(
+            lambda items: received.append(len(items)), max_items=10, max_delay_ms=10_000
+        )
+
+        await batcher.add(message(0))
+        await batcher.add(message(1))
+        assert client.event_manager.has_listeners(Events.CHANNEL_MESSAGE)
+
+        with (
+            patch.object(client, "disconnect_ai_agent_sse", AsyncMock()),
+            patch.object(client, "close_socket", AsyncMock()),
+            patch.object(client.message_db, "close", AsyncMock()),
+        ):
+            await client.disconnect()
+
+        assert received == [2]
@@ -1,8 +1,11 @@
 import asyncio
+import logging
+import threading
+import time
 
 import pytest
 
-from mezon.constants import Events
+from mezon.constants import Events, HandlerExecutor
 from mezon.managers.event import EventManager
 
 
@@ -92,3 +95,102 @@ class TestEventManager:
             manager._handle_task_exception(task, Events.CHANNEL_MESSAGE)
 
         asyncio.run(run())
+
+    @pytest.mark.asyncio
+    async def test_shared_executor_runs_sync_handlers_off_loop(self):
+        manager = EventManager(executor_policy=HandlerExecutor.SHARED)
+        loop_thread = threading.get_ident()
+        threads = []
+        done = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def default_sync(message):
+            threads.append(("default", threading.get_ident()))
+
+        def user_sync(message):
+            threads.append(("user", threading.get_ident()))
+            loop.call_soon_threadsafe(done.set)
+
+        default_sync._is_default_handler = True
+        manager.on(Events.CHANNEL_MESSAGE, default_sync)
+        manager.on(Events.CHANNEL_MESSAGE, user_sync)
+
+        await manager.emit(Events.CHANNEL_MESSAGE, "payload")
+        await asyncio.wait_for(done.wait(), timeout=1)
+
+        assert {name for name, _ in threads} == {"default", "user"}
+        assert all(ident != loop_thread for _, ident in threads)
+        manager.shutdown(wait=True)
+
+    @pytest.mark.asyncio
+    async def test_dedicated_executor_uses_one_pool_per_handler(self):
+        manager = EventManager(executor_policy="dedicated")
+
+        def first(message):
+            return threading.current_thread().name
+
+        def second(message):
+            return threading.current_thread().name
+
+        first_thread = await manager.run_sync_handler(first, 1)
+        again = await manager.run_sync_handler(first, 2)
+        second_thread = await manager.run_sync_handler(second, 3)
+
+        assert first_thread == again
+        assert first_thread != second_thread
+        assert len(manager._dedicated_executors) == 2
+
+        manager.shutdown(wait=True)
+        assert manager._dedicated_executors == {}
+
+    @pytest.mark.asyncio
+    async def test_offloaded_sync_handler_errors_are_logged(self, caplog):
+        manager = EventManager(executor_policy=HandlerExecutor.SHARED)
+        failed = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def explode(message):
+            loop.call_soon_threadsafe(failed.set)
+            raise RuntimeError("boom")
+
+        manager.on(Events.CHANNEL_MESSAGE, explode)
+
+        with caplog.at_level(logging.ERROR, logger="mezon.managers.event"):
+            await manager.emit(Events.CHANNEL_MESSAGE, "payload")
+            await asyncio.wait_for(failed.wait(), timeout=1)
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                if "boom" in caplog.text:
+                    break
+
+        assert "boom" in caplog.text
+        manager.shutdown(wait=True)
+
+    @pytest.mark.asyncio
+    async def test_inline_watchdog_warns_on_slow_handler(self, caplog):
+        manager = EventManager(slow_handler_threshold_ms=1)
+
+        def slow(message):
+            time.sleep(0.01)
+
+        def fast(message):
+            return message
+
+        with caplog.at_level(logging.WARNING, logger="mezon.managers.event"):
+            await manager.run_sync_handler(fast, 1)
+            assert "blocked the event loop" not in caplog.text
+            await manager.run_sync_handler(slow, 1)
+
+        assert "blocked the event loop" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_inline_watchdog_can_be_disabled(self, caplog):
+        manager = EventManager(slow_handler_threshold_ms=None)
+
+        def slow(message):
+            time.sleep(0.005)
+
+        with caplog.at_level(logging.WARNING, logger="mezon.managers.event"):
+            await manager.run_sync_handler(slow, 1)
+
+        assert "blocked the event loop" not in caplog.text
@@ -0,0 +1,90 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from mezon.client import MezonClient
+from mezon.constants import Events
+from mezon.managers.event import EventManager
+from mezon.managers.stream import EventStream
+
+
+def message(index, clan_id=1, channel_id=2):
+    return SimpleNamespace(index=index, clan_id=clan_id, channel_id=channel_id)
+
+
+class TestEventStream:
+    def test_rejects_empty_buffer(self):
+        with pytest.raises(ValueError):
+            EventStream("channel_message", buffer=0)
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_counts_dropped_payloads(self):
+        stream = EventStream(Events.CHANNEL_MESSAGE, buffer=2)
+        for index in range(5):
+            await stream.put(message(index))
+        stream.close()
+
+        received = [payload.index async for payload in stream]
+
+        assert received == [3, 4]
+        assert stream.dropped == 3
+        assert stream.delivered == 5
+        await stream.put(message(6))
+        assert len(stream) == 0
+
+    def test_backpressure_is_not_a_policy(self):
+        with pytest.raises(ValueError):
+            EventStream("x", overflow="backpressure")
+
+    @pytest.mark.asyncio
+    async def test_close_releases_consumer(self):
+        stream = EventStream("x", buffer=1)
+        await stream.put(message(0))
+        stream.close()
+        assert [payload.index async for payload in stream] == [0]
+
+        idle = EventStream("x")
+        consumer = asyncio.create_task(anext(idle, None))
+        await asyncio.sleep(0)
+        idle.close()
+        assert await asyncio.wait_for(consumer, timeout=1) is None
+
+
+class TestEventManagerStreams:
+    @pytest.mark.asyncio
+    async def test_subscribe_filters_and_unsubscribes_on_close(self):
+        manager = EventManager()
+        async with manager.subscribe(
+            Events.CHANNEL_MESSAGE, clan_id=1, channel_id=2
+        ) as stream:
+            await manager.emit("channel_message", message(0))
+            await manager.emit("channel_message", message(1, channel_id=3))
+            await manager.emit("channel_message", message(2, clan_id=9))
+            assert (await anext(stream)).index == 0
+            assert len(stream) == 0
+
+        assert manager.streams == {}
+
+    @pytest.mark.asyncio
+    async def test_closing_a_stream_during_delivery(self):
+        manager = EventManager()
+        first = manager.subscribe(Events.CHANNEL_MESSAGE)
+        second = manager.subscribe(Events.CHANNEL_MESSAGE)
+        first.matches = lambda payload: first.close() or True
+
+        await manager.emit("channel_message", message(0))
+
+        assert (await anext(second)).index == 0
+        assert manager.streams["channel_message"] == [second]
+
+    @pytest.mark.asyncio
+    async def test_shutdown_closes_streams(self):
+        client = MezonClient(client_id="1", api_key="key")
+        stream = client.stream(Events.CHANNEL_MESSAGE, buffer=10)
+
+        await client.event_manager.emit(Events.CHANNEL_MESSAGE, message(0))
+        client.event_manager.shutdown()
+
+        assert stream.closed
+        assert [payload.index async for payload in stream] == [0]
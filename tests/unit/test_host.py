@@ -0,0 +1,57 @@
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mezon.client import MezonClient
+from mezon.host import MezonHost
+
+
+class TestMezonHost:
+    def test_add_bot_shares_store_and_clients_with_own_limiter(self, tmp_path: Path):
+        host = MezonHost(message_db_path=str(tmp_path / "host.db"))
+
+        first = host.add_bot("1", "key-1")
+        second = host.add_bot(2, "key-2", handler_executor="shared")
+
+        assert host.get_bot("1") is first
+        assert first.message_db is host.message_db.for_tenant(1)
+        assert second.message_db.table_name == "messages_2"
+        assert first.mmn_client is second.mmn_client is host.mmn_client
+        assert first.zk_client is second.zk_client is host.zk_client
+        assert first.api_rate_limiter is not second.api_rate_limiter
+        assert second._event_manager_options["executor_policy"] == "shared"
+        with pytest.raises(ValueError):
+            host.add_bot(1, "again")
+
+    @pytest.mark.asyncio
+    async def test_start_logs_in_bots_over_shared_session(self, tmp_path: Path):
+        host = MezonHost(message_db_path=str(tmp_path / "host.db"))
+        ok = host.add_bot(1, "key-1")
+        broken = host.add_bot(2, "key-2")
+        error = RuntimeError("bad key")
+
+        with (
+            patch.object(ok, "login", AsyncMock()) as ok_login,
+            patch.object(broken, "login", AsyncMock(side_effect=error)),
+        ):
+            results = await host.start(enable_auto_reconnect=False)
+
+        assert results == {1: None, 2: error}
+        ok_login.assert_awaited_once_with(enable_auto_reconnect=False)
+        assert ok.http_session is broken.http_session is host.http_session
+        assert ok._create_api_client("https://api").session is host.http_session
+
+        with patch.object(MezonClient, "disconnect", AsyncMock()) as disconnect:
+            await host.stop()
+
+        assert disconnect.await_count == 2
+        assert host.http_session is None
+
+    @pytest.mark.asyncio
+    async def test_context_manager_closes_shared_session(self, tmp_path: Path):
+        async with MezonHost(message_db_path=str(tmp_path / "host.db")) as host:
+            session = host.http_session
+            assert not session.closed
+
+        assert session.closed
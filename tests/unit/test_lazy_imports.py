@@ -0,0 +1,106 @@
+import subprocess
+import sys
+
+import pytest
+
+import mezon
+
+HEAVY_MODULES = (
+    "mezon.client",
+    "mezon.models",
+    "mezon.protobuf.api.api_pb2",
+    "mezon.protobuf.rtapi.realtime_pb2",
+    "aiohttp",
+    "aiosqlite",
+    "jwt",
+    "mmn",
+    "websockets",
+)
+
+# ``import mezon`` must cost less than this fraction of ``import mezon.client``,
+# both measured in the same run so slow runners scale both sides. It is about
+# 5% today; the test only fails if eager imports creep back in.
+IMPORT_BUDGET_RATIO = 0.25
+
+SUBPACKAGES = (
+    "mezon.managers",
+    "mezon.socket",
+    "mezon.socket.message_builder",
+    "mezon.structures",
+)
+
+
+def _run(code: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+def _loaded_after(statement: str, modules: tuple[str, ...]) -> set[str]:
+    output = _run(
+        f"import sys\n{statement}\n"
+        f"print(','.join(m for m in {modules!r} if m in sys.modules))"
+    )
+    return set(filter(None, output.split(",")))
+
+
+class TestLazyImports:
+    def test_import_mezon_loads_no_heavy_modules(self):
+        assert _loaded_after("import mezon", HEAVY_MODULES) == set()
+
+    def test_constants_do_not_load_client(self):
+        loaded = _loaded_after("from mezon import Events", HEAVY_MODULES)
+
+        assert "mezon.client" not in loaded
+        assert "aiohttp" not in loaded
+
+    def test_client_defers_wallet_and_sqlite_dependencies(self):
+        loaded = _loaded_after(
+            "from mezon import MezonClient\n"
+            "MezonClient(client_id='1', api_key='key', mmn_api_url=None, zk_api_url=None)",
+            ("mezon.client", "mmn", "aiosqlite"),
+        )
+
+        assert loaded == {"mezon.client"}
+
+    @pytest.mark.parametrize("name", sorted(mezon.__all__))
+    def test_public_names_resolve(self, name):
+        assert getattr(mezon, name) is not None
+        assert name in dir(mezon)
+
+    @pytest.mark.parametrize("source", sorted(set(mezon._LAZY_IMPORTS.values())))
+    def test_public_names_import_first(self, source):
+        # A fresh interpreter per source module, so no earlier import (such
+        # as ``mezon.client`` here) hides an import cycle.
+        names = sorted(n for n, s in mezon._LAZY_IMPORTS.items() if s == source)
+        _run(f"from mezon import {', '.join(names)}")
+
+    @pytest.mark.parametrize("module", SUBPACKAGES)
+    def test_subpackages_import_first(self, module):
+        _run(f"import {module}")
+
+    def test_unknown_attribute_raises(self):
+        with pytest.raises(AttributeError):
+            mezon.DoesNotExist
+
+    def test_import_time_benchmark(self):
+        def import_ms(statement):
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", statement],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self_us = [
+                int(line.split("|")[0].removeprefix("import time:"))
+                for line in result.stderr.splitlines()
+                if line.startswith("import time:") and "self [us]" not in line
+            ]
+            return sum(self_us) / 1000
+
+        startup = import_ms("pass")
+        package = import_ms("import mezon") - startup
+        client = import_ms("import mezon.client") - startup
+
+        assert package < client * IMPORT_BUDGET_RATIO
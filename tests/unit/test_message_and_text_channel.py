@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock
 import pytest
 
 from mezon.constants import ChannelType
+from mezon.managers.members import ClanMemberIndex
 from mezon.models import ApiChannelDescription, ChannelMessage, ChannelMessageContent
 from mezon.structures.message import Message
 from mezon.structures.text_channel import TextChannel
@@ -20,6 +21,7 @@ class TestMessageAndTextChannel:
         )
         clan = SimpleNamespace(
             id=99,
+            members=ClanMemberIndex(),
             client=SimpleNamespace(
                 users=SimpleNamespace(
                     fetch=AsyncMock(
@@ -100,6 +102,7 @@ class TestMessageAndTextChannel:
         ]
         assert references[0].message_ref_id == 123
         assert references[0].message_sender_id == 321
+        assert references[0].message_sender_username is None
 
     @pytest.mark.asyncio
     async def test_message_reply_uses_original_message_as_reference(self):
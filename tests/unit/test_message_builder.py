@@ -8,6 +8,7 @@ from mezon.models import (
     ApiMessageRef,
     ChannelMessageContent,
 )
+from mezon.protobuf.rtapi import realtime_pb2
 from mezon.socket.message_builder import (
     ChannelMessageBuilder,
     ChannelMessageUpdateBuilder,
@@ -149,6 +150,22 @@ class TestChannelMessageBuilder:
         assert message.code == 42
         assert message.topic_id == 999
 
+    def test_build_in_place_inside_envelope(self):
+        """Test filling the envelope's payload field without a copy."""
+        envelope = realtime_pb2.Envelope()
+        message = ChannelMessageBuilder.build(
+            clan_id=1,
+            channel_id=2,
+            mode=2,
+            is_public=True,
+            content="{}",
+            message=envelope.channel_message_send,
+        )
+
+        assert message is envelope.channel_message_send
+        assert envelope.WhichOneof("message") == "channel_message_send"
+        assert envelope.channel_message_send.channel_id == 2
+
 
 class TestEphemeralMessageBuilder:
     """Test EphemeralMessageBuilder class."""
@@ -104,3 +104,62 @@ class TestMessageDB:
 
         assert db.db is None
         assert db._initialized is False
+
+    @pytest.mark.asyncio
+    async def test_tenants_share_connection_but_not_messages(self, tmp_path: Path):
+        store = MessageDB(str(tmp_path / "shared.db"))
+        first = store.for_tenant(1)
+        second = store.for_tenant("2")
+
+        await first.save_message({"message_id": 10, "channel_id": 5})
+        await second.save_message({"message_id": 11, "channel_id": 5})
+        await second.save_message({"message_id": 12, "channel_id": 5})
+
+        assert store.for_tenant(1) is first
+        assert first.db is second.db is store.db
+        assert await first.get_message_count("5") == 1
+        assert await second.get_message_count("5") == 2
+        assert await first.get_message_by_id(11, 5) is None
+
+        await first.close()
+        assert store.db is not None
+        assert await second.get_message_count() == 2
+
+        await store.close()
+        assert second.db is None
+        assert second._initialized is False
+
+    @pytest.mark.asyncio
+    async def test_dm_channels_are_kept_per_bot(self, tmp_path: Path):
+        async with MessageDB(str(tmp_path / "messages.db")) as db:
+            await db.save_dm_channels(1, {10: 100, 11: 110})
+            await db.save_dm_channels(1, {10: 101})
+            await db.save_dm_channels(2, {10: 200})
+            await db.save_dm_channels(2, {})
+
+            assert await db.get_dm_channels(1) == {10: 101, 11: 110}
+            assert await db.get_dm_channels(2) == {10: 200}
+            assert await db.get_dm_channels(3) == {}
+
+    @pytest.mark.asyncio
+    async def test_outbox_messages_are_kept_per_bot(self, tmp_path: Path):
+        async with MessageDB(str(tmp_path / "messages.db")) as db:
+            await db.add_outbox_message(1, 7, {"t": "a"}, "pending", 10.0)
+            await db.add_outbox_message(1, 8, {"t": "b"}, "pending", 20.0)
+            await db.add_outbox_message(2, 9, {"t": "c"}, "pending", 10.0)
+
+            due = await db.get_outbox_messages(1, "pending", due_before=15.0)
+            assert [(m["id"], m["payload"]) for m in due] == [(7, {"t": "a"})]
+
+            await db.update_outbox_message(7, "dead", 5, 30.0, "boom")
+            dead = await db.get_outbox_messages(1, "dead")
+            assert (dead[0]["attempts"], dead[0]["last_error"]) == (5, "boom")
+            assert await db.get_outbox_stats(1) == {
+                "dead": (1, 10.0),
+                "pending": (1, 20.0),
+            }
+
+            assert await db.requeue_outbox_messages(1, "dead", "pending", 0.0) == 1
+            assert await db.delete_outbox_message(8) is True
+            assert await db.delete_outbox_message(8) is False
+            assert [m["id"] for m in await db.get_outbox_messages(1, "pending")] == [7]
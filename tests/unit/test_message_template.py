@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from mezon.models import ButtonMessageStyle, ChannelMessageContent
+from mezon.socket.message_builder import ChannelMessageBuilder
+from mezon.structures import ButtonBuilder, MessageTemplate
+
+
+class TestMessageTemplate:
+    def test_renders_placeholders_into_cached_json(self):
+        buttons = ButtonBuilder().add_button(
+            "join_{{room}}", "Join", ButtonMessageStyle.PRIMARY
+        )
+        template = MessageTemplate(
+            ChannelMessageContent(
+                t="Hi {{name}}, welcome to {{room}}!",
+                components=[{"components": buttons.build()}],
+            )
+        )
+
+        assert template.placeholders == {"name", "room"}
+        rendered = json.loads(template.render(name='Ann "A"\n', room=7))
+        assert rendered["t"] == 'Hi Ann "A"\n, welcome to 7!'
+        assert rendered["components"][0]["components"][0]["id"] == "join_7"
+
+    def test_static_template_returns_the_same_string(self):
+        template = MessageTemplate({"t": "Help: *ping, *stats"})
+
+        assert template.render() is template.content
+        assert template.render(unused=1) == '{"t": "Help: *ping, *stats"}'
+
+    def test_missing_value_raises(self):
+        template = MessageTemplate({"t": "{{score}}"})
+
+        with pytest.raises(KeyError):
+            template.render()
+
+    def test_rendered_content_is_sent_unchanged(self):
+        rendered = MessageTemplate({"t": "Top: {{user}}"}).render(user="bob")
+
+        message = ChannelMessageBuilder.build(
+            clan_id=1, channel_id=2, mode=2, is_public=True, content=rendered
+        )
+
+        assert message.content == rendered
+        assert json.loads(message.content) == {"t": "Top: bob"}
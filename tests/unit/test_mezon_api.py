@@ -19,6 +19,38 @@ class TestMezonApi:
         assert api.client_id == 123
         assert api.client_timeout.total == 5
 
+    @pytest.mark.asyncio
+    async def test_call_api_uses_shared_session_and_own_limiter(self):
+        response = AsyncMock()
+        response.raise_for_status = Mock()
+        request_context = AsyncMock()
+        request_context.__aenter__.return_value = response
+        session = Mock(closed=False)
+        session.request = Mock(return_value=request_context)
+        limiter = AsyncMock()
+        api = MezonApi(
+            client_id="123",
+            api_key="key",
+            base_url="https://api.example.com",
+            timeout_ms=5000,
+            session=session,
+            rate_limiter=limiter,
+        )
+
+        with patch(
+            "mezon.api.mezon_api.parse_response", AsyncMock(return_value="parsed")
+        ):
+            result = await api.call_api("POST", "/path", body=b"data")
+
+        assert result == "parsed"
+        assert session.request.call_args.args == (
+            "POST",
+            "https://api.example.com/path",
+        )
+        assert session.request.call_args.kwargs["timeout"] is api.client_timeout
+        limiter.__aenter__.assert_awaited_once()
+        assert MezonApi._rate_limiter is not limiter
+
     @pytest.mark.asyncio
     async def test_mezon_authenticate_builds_binary_request(self):
         api = MezonApi(
@@ -0,0 +1,176 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from mezon.client import MezonClient
+from mezon.messages.db import MessageDB
+from mezon.messages.outbox import Outbox
+from mezon.models import ApiChannelDescription, ApiMessageMention
+from mezon.protobuf.rtapi import realtime_pb2
+from mezon.socket.message_builder import ChannelMessageBuilder
+from mezon.structures.text_channel import TextChannel
+
+
+def _outbox(tmp_path, send=None, ready=True, **kwargs):
+    db = MessageDB(str(tmp_path / "messages.db"))
+    state = SimpleNamespace(ready=ready)
+    outbox = Outbox(
+        db,
+        1,
+        send=send or AsyncMock(),
+        is_ready=lambda: state.ready,
+        rate=1000,
+        **kwargs,
+    )
+    return outbox, state
+
+
+class TestOutbox:
+    @pytest.mark.asyncio
+    async def test_drains_in_order_with_stable_ids(self, tmp_path):
+        outbox, _ = _outbox(tmp_path)
+        first = await outbox.enqueue({"channel_id": 10, "content": {"t": "a"}})
+        second = await outbox.enqueue({"channel_id": 10, "content": {"t": "b"}})
+
+        metrics = await outbox.get_metrics()
+        assert metrics["depth"] == 2
+        assert metrics["oldest_age_s"] >= 0
+
+        assert await outbox.drain_once() == 2
+        calls = outbox.send.await_args_list
+        assert [call.args[1] for call in calls] == [first, second]
+        assert calls[0].args[0]["content"] == {"t": "a"}
+        assert (await outbox.get_metrics())["depth"] == 0
+        assert outbox.sent == 2
+        await outbox.message_db.close()
+
+    @pytest.mark.asyncio
+    async def test_survives_restart_until_socket_is_open(self, tmp_path):
+        outbox, state = _outbox(tmp_path, ready=False)
+        message_id = await outbox.enqueue({"channel_id": 10})
+        assert await outbox.drain_once() == 0
+        await outbox.message_db.close()
+
+        restarted, _ = _outbox(tmp_path)
+        assert await restarted.drain_once() == 1
+        restarted.send.assert_awaited_once_with({"channel_id": 10}, message_id)
+        await restarted.message_db.close()
+
+    @pytest.mark.asyncio
+    async def test_failures_back_off_then_dead_letter(self, tmp_path):
+        send = AsyncMock(side_effect=RuntimeError("rejected"))
+        outbox, _ = _outbox(tmp_path, send=send, max_attempts=2, retry_delay=60)
+        message_id = await outbox.enqueue({"channel_id": 10})
+
+        await outbox.drain_once()
+        assert outbox.retried == 1
+        await outbox.drain_once()
+        assert send.await_count == 1
+
+        await outbox.message_db.db.execute("UPDATE outbox SET next_attempt_at = 0")
+        await outbox.drain_once()
+
+        metrics = await outbox.get_metrics()
+        assert (metrics["depth"], metrics["dead"], metrics["dead_lettered"]) == (
+            0,
+            1,
+            1,
+        )
+        dead = await outbox.dead_letters()
+        assert dead[0]["id"] == message_id
+        assert dead[0]["attempts"] == 2
+        assert dead[0]["last_error"] == "rejected"
+
+        send.side_effect = None
+        assert await outbox.retry_dead_letters() == 1
+        assert await outbox.drain_once() == 1
+        assert (await outbox.get_metrics())["dead"] == 0
+        await outbox.message_db.close()
+
+    @pytest.mark.asyncio
+    async def test_disconnect_during_send_is_not_an_attempt(self, tmp_path):
+        outbox, state = _outbox(tmp_path)
+
+        async def drop(payload, message_id):
+            state.ready = False
+            raise ConnectionError("closed")
+
+        outbox.send = drop
+        await outbox.enqueue({"channel_id": 10})
+        await outbox.drain_once()
+
+        state.ready = True
+        outbox.send = AsyncMock()
+        assert await outbox.drain_once() == 1
+        assert outbox.retried == 0
+        await outbox.message_db.close()
+
+    @pytest.mark.asyncio
+    async def test_background_drainer(self, tmp_path):
+        outbox, _ = _outbox(tmp_path, poll_interval=60)
+        outbox.start()
+        await outbox.enqueue({"channel_id": 10})
+        for _ in range(50):
+            if outbox.sent:
+                break
+            await asyncio.sleep(0.01)
+        await outbox.stop()
+
+        assert outbox.sent == 1
+        await outbox.message_db.close()
+
+
+class TestOutboxIntegration:
+    def test_builder_sets_idempotency_id(self):
+        message = ChannelMessageBuilder.build(
+            clan_id=1, channel_id=10, mode=2, is_public=True, content="{}", message_id=7
+        )
+        assert isinstance(message, realtime_pb2.ChannelMessageSend)
+        assert message.id == 7
+
+    @pytest.mark.asyncio
+    async def test_send_queued_round_trips_through_client(self, tmp_path):
+        client = MezonClient(
+            "1",
+            "key",
+            message_db=MessageDB(str(tmp_path / "messages.db")),
+            outbox=True,
+        )
+        client.socket_manager = SimpleNamespace(
+            write_chat_message=AsyncMock(),
+            get_socket=lambda: SimpleNamespace(is_open=lambda: True),
+        )
+        clan = SimpleNamespace(id=1, client=client)
+        channel = TextChannel(
+            ApiChannelDescription(channel_id=10, type=1, channel_private=0),
+            clan,
+            client.socket_manager,
+            Mock(),
+        )
+
+        message_id = await channel.send_queued(
+            {"t": "hi"}, mentions=[ApiMessageMention(user_id=5, s=0, e=3)]
+        )
+        await client.outbox.drain_once()
+
+        kwargs = client.socket_manager.write_chat_message.await_args.kwargs
+        assert kwargs["message_id"] == message_id
+        assert kwargs["content"] == {"t": "hi"}
+        assert kwargs["mentions"][0].user_id == 5
+        assert kwargs["is_public"] is True
+        await client.message_db.close()
+
+    @pytest.mark.asyncio
+    async def test_send_queued_requires_outbox(self):
+        clan = SimpleNamespace(id=1, client=SimpleNamespace(outbox=None))
+        channel = TextChannel(
+            ApiChannelDescription(channel_id=10, type=1, channel_private=0),
+            clan,
+            Mock(),
+            Mock(),
+        )
+
+        with pytest.raises(RuntimeError, match="outbox"):
+            await channel.send_queued({"t": "hi"})
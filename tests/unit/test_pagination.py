@@ -0,0 +1,195 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from mezon.api.mezon_api import MezonApi
+from mezon.api.pagination import paginate
+from mezon.managers.channel import ChannelManager
+from mezon.models import (
+    ApiChannelDescList,
+    ApiChannelDescription,
+    ApiRole,
+    ApiRoleList,
+    ApiRoleListEventResponse,
+    ApiVoiceChannelUser,
+    ApiVoiceChannelUserList,
+)
+
+
+def _pages(*pages):
+    """Fake fetch over ``pages``: each is (items, next_cursor) keyed by cursor."""
+    by_cursor = {}
+    cursor = ""
+    for items, next_cursor in pages:
+        by_cursor[cursor] = SimpleNamespace(items=items, cursor=next_cursor)
+        cursor = next_cursor
+    calls = []
+
+    async def fetch(cursor):
+        calls.append(cursor)
+        return by_cursor[cursor]
+
+    return fetch, calls
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+def _paginate(fetch, **kwargs):
+    return paginate(
+        fetch,
+        items=lambda page: page.items,
+        next_cursor=lambda page: page.cursor,
+        **kwargs,
+    )
+
+
+def _api():
+    return MezonApi(
+        client_id="1",
+        api_key="key",
+        base_url="https://api.example.com",
+        timeout_ms=5000,
+    )
+
+
+class TestPaginate:
+    @pytest.mark.asyncio
+    async def test_follows_cursors_until_last_page(self):
+        fetch, calls = _pages(([1, 2], "a"), ([3, 4], "b"), ([5], None))
+
+        assert await _collect(_paginate(fetch)) == [1, 2, 3, 4, 5]
+        assert calls == ["", "a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_stops_on_short_page_empty_page_and_repeated_cursor(self):
+        fetch, calls = _pages(([1, 2], "a"), ([3], "b"), ([4], None))
+        assert await _collect(_paginate(fetch, page_size=2)) == [1, 2, 3]
+        assert calls == ["", "a"]
+
+        fetch, calls = _pages(([], "a"), ([1], None))
+        assert await _collect(_paginate(fetch)) == []
+
+        async def echo(cursor):
+            return SimpleNamespace(items=[cursor or "first"], cursor="same")
+
+        assert await _collect(_paginate(echo)) == ["first", "same"]
+
+    @pytest.mark.asyncio
+    async def test_prefetches_next_page_while_consuming(self):
+        fetch, calls = _pages(([1, 2], "a"), ([3], None))
+        iterator = _paginate(fetch)
+
+        assert await anext(iterator) == 1
+        await asyncio.sleep(0)
+        assert calls == ["", "a"]
+        assert await _collect(iterator) == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_without_prefetch_fetches_on_demand(self):
+        fetch, calls = _pages(([1, 2], "a"), ([3], None))
+        iterator = _paginate(fetch, prefetch=False)
+
+        assert await anext(iterator) == 1
+        await asyncio.sleep(0)
+        assert calls == [""]
+        assert await _collect(iterator) == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_closing_early_cancels_prefetch(self):
+        started = asyncio.Event()
+
+        async def fetch(cursor):
+            if cursor:
+                started.set()
+                await asyncio.sleep(10)
+            return SimpleNamespace(items=[1, 2], cursor="next")
+
+        iterator = _paginate(fetch)
+        assert await anext(iterator) == 1
+        await started.wait()
+        await iterator.aclose()
+
+    @pytest.mark.asyncio
+    async def test_warns_on_full_page_without_cursor(self, caplog):
+        fetch, _ = _pages(([1, 2], None))
+
+        with caplog.at_level("WARNING"):
+            assert await _collect(_paginate(fetch, page_size=2)) == [1, 2]
+
+        assert "may be truncated" in caplog.text
+
+
+class TestMezonApiIterators:
+    @pytest.mark.asyncio
+    async def test_iter_roles_follows_next_cursor(self):
+        api = _api()
+        api.list_roles = AsyncMock(
+            side_effect=[
+                ApiRoleListEventResponse(
+                    roles=ApiRoleList(roles=[ApiRole(id=1)], next_cursor="c1")
+                ),
+                ApiRoleListEventResponse(roles=ApiRoleList(roles=[ApiRole(id=2)])),
+            ]
+        )
+
+        roles = await _collect(api.iter_roles("token", clan_id=5, page_size=1))
+
+        assert [role.id for role in roles] == [1, 2]
+        assert api.list_roles.await_args_list[1].kwargs == {
+            "clan_id": 5,
+            "limit": 1,
+            "state": 0,
+            "cursor": "c1",
+        }
+
+    @pytest.mark.asyncio
+    async def test_iter_channel_descs_and_voice_users(self):
+        api = _api()
+        api.list_channel_descs = AsyncMock(
+            side_effect=[
+                ApiChannelDescList(
+                    channeldesc=[ApiChannelDescription(channel_id=1)], cursor="c1"
+                ),
+                ApiChannelDescList(channeldesc=[ApiChannelDescription(channel_id=2)]),
+            ]
+        )
+        api.list_channel_voice_users = AsyncMock(
+            return_value=ApiVoiceChannelUserList(
+                voice_channel_users=[ApiVoiceChannelUser(id=7)]
+            )
+        )
+
+        channels = await _collect(api.iter_channel_descs("token", clan_id=5))
+        users = await _collect(api.iter_channel_voice_users("token", clan_id=5))
+
+        assert [channel.channel_id for channel in channels] == [1, 2]
+        assert api.list_channel_descs.await_args.kwargs["cursor"] == "c1"
+        assert [user.id for user in users] == [7]
+
+    @pytest.mark.asyncio
+    async def test_dm_channel_init_reads_every_page(self):
+        api_client = _api()
+        api_client.list_channel_descs = AsyncMock(
+            side_effect=[
+                ApiChannelDescList(
+                    channeldesc=[
+                        ApiChannelDescription(channel_id=10, type=3, user_ids=[1])
+                    ],
+                    cursor="c1",
+                ),
+                ApiChannelDescList(
+                    channeldesc=[
+                        ApiChannelDescription(channel_id=20, type=3, user_ids=[2])
+                    ]
+                ),
+            ]
+        )
+        manager = ChannelManager(api_client, SimpleNamespace(), SimpleNamespace())
+
+        await manager.init_all_dm_channels("token")
+
+        assert manager.get_all_dm_channels() == {1: 10, 2: 20}
@@ -0,0 +1,216 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from mezon.api.cache import ResponseCache
+from mezon.api.mezon_api import MezonApi
+from mezon.client import MezonClient
+from mezon.constants import Events
+from mezon.protobuf.api import api_pb2
+
+
+def _api(**kwargs):
+    return MezonApi(
+        client_id="1",
+        api_key="key",
+        base_url="https://api.example.com",
+        timeout_ms=5000,
+        **kwargs,
+    )
+
+
+class TestResponseCache:
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_fetch(self):
+        cache = ResponseCache()
+        release = asyncio.Event()
+        fetches = []
+
+        async def fetch():
+            fetches.append(1)
+            await release.wait()
+            return "value"
+
+        calls = [
+            asyncio.create_task(cache.get_or_fetch(("a", 1), 5, fetch))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*calls)
+
+        assert results == ["value", "value", "value"]
+        assert len(fetches) == 1
+        assert cache.stats() == {"hits": 0, "misses": 1, "coalesced": 2, "entries": 1}
+
+    @pytest.mark.asyncio
+    async def test_ttl_hit_expiry_and_zero_ttl(self):
+        cache = ResponseCache()
+        fetch = AsyncMock(side_effect=["first", "second", "third"])
+
+        with patch("mezon.api.cache.time.monotonic", return_value=100.0):
+            assert await cache.get_or_fetch(("a",), 5, fetch) == "first"
+            assert await cache.get_or_fetch(("a",), 5, fetch) == "first"
+        with patch("mezon.api.cache.time.monotonic", return_value=106.0):
+            assert await cache.get_or_fetch(("a",), 5, fetch) == "second"
+
+        assert await cache.get_or_fetch(("b",), 0, fetch) == "third"
+        assert len(cache) == 1
+        assert cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_group_and_inflight_results(self):
+        cache = ResponseCache()
+        await cache.get_or_fetch(("a", 1), 5, AsyncMock(return_value=1))
+        await cache.get_or_fetch(("b", 1), 5, AsyncMock(return_value=2))
+
+        cache.invalidate("a")
+        assert len(cache) == 1
+
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return 3
+
+        pending = asyncio.create_task(cache.get_or_fetch(("a", 2), 5, slow))
+        await asyncio.sleep(0)
+        cache.invalidate("a")
+        release.set()
+
+        assert await pending == 3
+        assert ("a", 2) not in cache._entries
+
+        cache.invalidate()
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_lookup_after_invalidate_starts_a_new_fetch(self):
+        cache = ResponseCache()
+        release = asyncio.Event()
+
+        async def stale():
+            await release.wait()
+            return "stale"
+
+        before = asyncio.create_task(cache.get_or_fetch(("a", 1), 5, stale))
+        await asyncio.sleep(0)
+        cache.invalidate("a")
+        after = asyncio.create_task(
+            cache.get_or_fetch(("a", 1), 5, AsyncMock(return_value="fresh"))
+        )
+        assert await after == "fresh"
+        release.set()
+
+        assert await before == "stale"
+        assert await cache.get_or_fetch(("a", 1), 5, AsyncMock()) == "fresh"
+        assert cache.coalesced == 0
+        assert cache._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared_and_not_cached(self):
+        cache = ResponseCache()
+        fetch = AsyncMock(side_effect=[RuntimeError("down"), "ok"])
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch(("a",), 5, fetch)
+
+        assert await cache.get_or_fetch(("a",), 5, fetch) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_request(self):
+        cache = ResponseCache()
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "value"
+
+        first = asyncio.create_task(cache.get_or_fetch(("a",), 5, slow))
+        second = asyncio.create_task(cache.get_or_fetch(("a",), 5, slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "value"
+
+    @pytest.mark.asyncio
+    async def test_evicts_oldest_entries(self):
+        cache = ResponseCache(max_entries=2)
+        for key in range(3):
+            await cache.get_or_fetch(("a", key), 5, AsyncMock(return_value=key))
+
+        assert list(cache._entries) == [("a", 1), ("a", 2)]
+
+
+class TestMezonApiCoalescing:
+    @pytest.mark.asyncio
+    async def test_identical_reads_share_one_request(self):
+        api = _api()
+        api._send = AsyncMock(return_value=api_pb2.ClanDescList())
+
+        first, second = await asyncio.gather(
+            api.list_clans_descs("token"), api.list_clans_descs("token")
+        )
+        await api.list_clans_descs("other-token")
+
+        assert first == second
+        assert api._send.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_bypass_cache_and_invalidate_reads(self):
+        api = _api()
+        api._send = AsyncMock(return_value=api_pb2.ChannelDescList())
+
+        await api.list_channel_descs("token", clan_id=1)
+        await api.call_api("POST", api.RPC_ENDPOINTS["create_channel_desc"], body=b"x")
+        await api.call_api("POST", api.RPC_ENDPOINTS["create_channel_desc"], body=b"x")
+        await api.list_channel_descs("token", clan_id=1)
+
+        assert api._send.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_ttl_none_disables_endpoint_cache(self):
+        api = _api(cache_ttls={"list_clans_descs": None})
+        api._send = AsyncMock(return_value=api_pb2.ClanDescList())
+
+        await api.list_clans_descs("token")
+        await api.list_clans_descs("token")
+
+        assert api._send.await_count == 2
+        assert api.cache_ttls["list_roles"] == MezonApi.DEFAULT_CACHE_TTLS["list_roles"]
+
+    @pytest.mark.asyncio
+    async def test_invalidate_cache_by_endpoint_name(self):
+        api = _api()
+        api._send = AsyncMock(return_value=api_pb2.ClanDescList())
+
+        await api.list_clans_descs("token")
+        api.invalidate_cache("list_clans_descs", "unknown")
+        await api.list_clans_descs("token")
+        api.invalidate_cache()
+        await api.list_clans_descs("token")
+
+        assert api._send.await_count == 3
+
+
+class TestClientCacheInvalidation:
+    @pytest.mark.asyncio
+    async def test_realtime_events_invalidate_cached_endpoints(self):
+        client = MezonClient(client_id="1", api_key="key", api_cache_ttls={"x": 1})
+        client.api_client = client._create_api_client("https://api.example.com")
+        client.api_client.invalidate_cache = Mock()
+
+        await client.event_manager.emit(Events.CHANNEL_CREATED, object())
+
+        client.api_client.invalidate_cache.assert_called_once_with(
+            "list_channel_descs", "get_channel_detail"
+        )
+        assert client.api_client.cache_ttls["x"] == 1
+
+    @pytest.mark.asyncio
+    async def test_events_before_login_are_ignored(self):
+        client = MezonClient(client_id="1", api_key="key")
+
+        await client.event_manager.emit(Events.ROLE_EVENT, object())
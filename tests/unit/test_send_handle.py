@@ -0,0 +1,139 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from mezon.models import ApiChannelDescription
+from mezon.protobuf.rtapi import realtime_pb2
+from mezon.socket.default_socket import Socket
+from mezon.structures.text_channel import TextChannel
+
+
+class RecordingAdapter:
+    def __init__(self):
+        self.sent = []
+
+    def is_open(self) -> bool:
+        return True
+
+    async def send(self, message) -> None:
+        self.sent.append(message)
+
+
+def _socket(**kwargs):
+    return Socket("sock.example.com", adapter=RecordingAdapter(), **kwargs)
+
+
+def _ack(socket, cid, message_id=1):
+    envelope = realtime_pb2.Envelope(cid=cid)
+    envelope.channel_message_ack.message_id = message_id
+    envelope.channel_message_ack.channel_id = 10
+    socket.cids[cid].resolve(envelope)
+
+
+async def _send(socket, channel_id=10):
+    return await socket.write_chat_message_nowait(
+        clan_id=1, channel_id=channel_id, mode=2, is_public=True, content={"t": "hi"}
+    )
+
+
+class TestSendNowait:
+    @pytest.mark.asyncio
+    async def test_returns_after_frame_is_sent_and_resolves_on_ack(self):
+        socket = _socket()
+
+        first = await _send(socket)
+        second = await _send(socket)
+
+        assert len(socket.adapter.sent) == 2
+        assert socket.unacked_sends == 2
+        assert not first.done()
+
+        _ack(socket, second.cid, message_id=2)
+        _ack(socket, first.cid, message_id=1)
+        acks = await asyncio.gather(first, second)
+
+        assert [ack.message_id for ack in acks] == [1, 2]
+        assert socket.unacked_sends == 0
+        assert socket.cids == {}
+
+    @pytest.mark.asyncio
+    async def test_outstanding_sends_are_bounded(self):
+        socket = _socket(max_unacked_sends=1)
+        first = await _send(socket)
+
+        blocked = asyncio.create_task(_send(socket))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        assert len(socket.adapter.sent) == 1
+
+        _ack(socket, first.cid)
+        second = await asyncio.wait_for(blocked, 1)
+        assert len(socket.adapter.sent) == 2
+        _ack(socket, second.cid)
+        await second
+
+    @pytest.mark.asyncio
+    async def test_errors_and_timeouts_reach_the_handle(self):
+        socket = _socket(send_timeout_ms=10)
+        rejected = await _send(socket)
+        timed_out = await _send(socket)
+        errors = []
+        rejected.add_done_callback(lambda handle: errors.append(handle.exception()))
+
+        socket.cids[rejected.cid].reject(realtime_pb2.Error(message="denied"))
+        await asyncio.sleep(0.05)
+
+        assert len(errors) == 1
+        with pytest.raises(TimeoutError):
+            await timed_out
+        assert socket.unacked_sends == 0
+
+    @pytest.mark.asyncio
+    async def test_unobserved_failures_are_logged(self):
+        socket = _socket()
+        handle = await _send(socket)
+        acked = await _send(socket)
+
+        with patch("mezon.socket.send_handle.logger") as logger:
+            socket.cids[handle.cid].reject(realtime_pb2.Error(message="denied"))
+            _ack(socket, acked.cid)
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+
+        assert handle.done()
+        logger.warning.assert_called_once()
+        assert acked.result().message_id == 1
+        assert acked.exception() is None
+
+    @pytest.mark.asyncio
+    async def test_failed_frame_releases_its_slot(self):
+        socket = _socket(max_unacked_sends=1)
+        socket.adapter.send = AsyncMock(side_effect=ConnectionError("closed"))
+
+        with pytest.raises(ConnectionError):
+            await _send(socket)
+        socket.adapter.is_open = lambda: False
+        with pytest.raises(Exception, match="not been established"):
+            await _send(socket)
+
+        assert socket.cids == {}
+        assert socket._unacked_slots._value == 1
+
+    @pytest.mark.asyncio
+    async def test_text_channel_send_nowait(self):
+        socket_manager = SimpleNamespace(
+            write_chat_message_nowait=AsyncMock(return_value="handle")
+        )
+        channel = TextChannel(
+            ApiChannelDescription(channel_id=10, type=1, channel_private=1),
+            SimpleNamespace(id=1),
+            socket_manager,
+            Mock(),
+        )
+
+        assert await channel.send_nowait({"t": "hi"}) == "handle"
+        kwargs = socket_manager.write_chat_message_nowait.await_args.kwargs
+        assert kwargs["channel_id"] == 10
+        assert kwargs["is_public"] is False
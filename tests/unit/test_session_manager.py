@@ -1,9 +1,10 @@
+import asyncio
 from types import SimpleNamespace
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from mezon.managers.session import SessionManager
+from mezon.managers.session import MIN_REFRESH_DELAY_S, SessionManager
 
 
 class TestSessionManager:
@@ -28,3 +29,147 @@ class TestSessionManager:
         assert kwargs["basic_auth_password"] == "secret"
         assert kwargs["body"].account.appid == "123"
         assert kwargs["body"].account.token == "secret"
+
+
+def _api_session(token="new-token", refresh_token="new-refresh"):
+    return SimpleNamespace(token=token, refresh_token=refresh_token)
+
+
+class TestSessionRefresh:
+    @pytest.mark.asyncio
+    async def test_refresh_requires_credentials(self):
+        manager = SessionManager(api_client=SimpleNamespace())
+
+        with pytest.raises(RuntimeError):
+            await manager.refresh()
+
+    @pytest.mark.asyncio
+    async def test_refresh_updates_session_in_place_and_calls_hook(self):
+        session = SimpleNamespace(token="old", expires_at=0, update=MagicMock())
+        auth_client = SimpleNamespace(
+            mezon_authenticate=AsyncMock(return_value=_api_session())
+        )
+        on_refresh = AsyncMock()
+        manager = SessionManager(
+            api_client=SimpleNamespace(),
+            session=session,
+            auth_api_client=auth_client,
+            on_refresh=on_refresh,
+        )
+        manager._credentials = ("123", "secret")
+
+        result = await manager.refresh()
+
+        assert result is session
+        session.update.assert_called_once_with("new-token", "new-refresh")
+        on_refresh.assert_awaited_once_with(session)
+        assert auth_client.mezon_authenticate.await_args.kwargs[
+            "body"
+        ].account.appid == ("123")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_refreshes_share_one_request(self):
+        release = asyncio.Event()
+
+        async def authenticate(**kwargs):
+            await release.wait()
+            return _api_session()
+
+        api_client = SimpleNamespace(
+            mezon_authenticate=AsyncMock(side_effect=authenticate)
+        )
+        session = SimpleNamespace(token="old", expires_at=0, update=MagicMock())
+        manager = SessionManager(api_client=api_client, session=session)
+        manager._credentials = ("123", "secret")
+
+        calls = [asyncio.create_task(manager.refresh()) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*calls)
+
+        assert all(result is session for result in results)
+        assert api_client.mezon_authenticate.await_count == 1
+        session.update.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_refresh_in_flight_at_stop_is_discarded(self):
+        release = asyncio.Event()
+
+        async def authenticate(**kwargs):
+            await release.wait()
+            return _api_session()
+
+        session = SimpleNamespace(token="old", expires_at=0, update=MagicMock())
+        on_refresh = AsyncMock()
+        manager = SessionManager(
+            api_client=SimpleNamespace(
+                mezon_authenticate=AsyncMock(side_effect=authenticate)
+            ),
+            session=session,
+            on_refresh=on_refresh,
+        )
+        manager._credentials = ("123", "secret")
+
+        pending = asyncio.create_task(manager.refresh())
+        await asyncio.sleep(0)
+        manager.stop_auto_refresh()
+        release.set()
+
+        assert await pending is session
+        session.update.assert_not_called()
+        on_refresh.assert_not_awaited()
+
+    def test_next_refresh_delay_uses_margin(self):
+        session = SimpleNamespace(expires_at=10_000)
+        manager = SessionManager(
+            api_client=SimpleNamespace(), session=session, refresh_margin_s=300
+        )
+
+        assert manager.next_refresh_delay(now=6_400) == 3_300
+        assert manager.next_refresh_delay(now=9_600) == 200
+        assert manager.next_refresh_delay(now=10_500) == MIN_REFRESH_DELAY_S
+
+    @pytest.mark.asyncio
+    async def test_auto_refresh_loop_refreshes_and_stops(self):
+        manager = SessionManager(
+            api_client=SimpleNamespace(), session=SimpleNamespace(expires_at=None)
+        )
+        refreshed = asyncio.Event()
+        manager.refresh = AsyncMock(side_effect=lambda: refreshed.set())
+
+        with patch("mezon.managers.session.MIN_REFRESH_DELAY_S", 0):
+            manager.start_auto_refresh("123", "secret")
+            await asyncio.wait_for(refreshed.wait(), 1)
+            task = manager._refresh_loop_task
+            manager.stop_auto_refresh()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        assert manager._credentials == ("123", "secret")
+        assert manager._refresh_loop_task is None
+
+    @pytest.mark.asyncio
+    async def test_auto_refresh_loop_retries_after_failure(self):
+        manager = SessionManager(
+            api_client=SimpleNamespace(), session=SimpleNamespace(expires_at=None)
+        )
+        attempts = []
+        done = asyncio.Event()
+
+        async def refresh():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("boom")
+            done.set()
+
+        manager.refresh = refresh
+
+        with (
+            patch("mezon.managers.session.MIN_REFRESH_DELAY_S", 0),
+            patch("mezon.managers.session.REFRESH_RETRY_DELAY_S", 0),
+        ):
+            manager.start_auto_refresh("123", "secret")
+            await asyncio.wait_for(done.wait(), 1)
+            manager.stop_auto_refresh()
+
+        assert len(attempts) == 2
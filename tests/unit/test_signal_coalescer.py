@@ -0,0 +1,168 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from mezon.managers.signals import SignalCoalescer
+from mezon.models import ApiChannelDescription
+from mezon.socket.default_socket import Socket
+from mezon.structures.text_channel import TextChannel
+
+
+def _coalescer(**kwargs):
+    socket = SimpleNamespace(send_without_ack=AsyncMock())
+    return SignalCoalescer(lambda: socket, **kwargs), socket
+
+
+def _sent(socket):
+    return [
+        (call.args[0], call.args[1].channel_id)
+        for call in socket.send_without_ack.await_args_list
+    ]
+
+
+class TestSignalCoalescer:
+    @pytest.mark.asyncio
+    async def test_keeps_latest_last_seen_per_channel(self):
+        coalescer, socket = _coalescer(flush_interval=60)
+
+        coalescer.mark_seen(1, 10, 2, message_id=100, timestamp_seconds=5)
+        coalescer.mark_seen(1, 10, 2, message_id=101, timestamp_seconds=6)
+        coalescer.mark_seen(1, 10, 2, message_id=99, timestamp_seconds=4)
+        coalescer.mark_seen(1, 20, 2, message_id=200)
+        assert coalescer.pending == 2
+
+        await coalescer.flush()
+
+        assert _sent(socket) == [
+            ("last_seen_message_event", 10),
+            ("last_seen_message_event", 20),
+        ]
+        assert socket.send_without_ack.await_args_list[0].args[1].message_id == 101
+        assert coalescer.get_metrics() == {"sent": 2, "coalesced": 2, "pending": 0}
+
+    @pytest.mark.asyncio
+    async def test_one_typing_signal_per_interval(self):
+        coalescer, socket = _coalescer(flush_interval=60, typing_interval=60)
+
+        coalescer.typing(1, 10, 2, True)
+        coalescer.typing(1, 10, 2, True)
+        await coalescer.flush()
+        coalescer.typing(1, 10, 2, True)
+        await coalescer.flush()
+
+        assert _sent(socket) == [("message_typing_event", 10)]
+        assert coalescer.coalesced == 2
+
+        coalescer.typing_interval = 0
+        coalescer.typing(1, 10, 2, True)
+        await coalescer.close()
+        assert len(_sent(socket)) == 2
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_timer(self):
+        coalescer, socket = _coalescer(flush_interval=0.01)
+
+        coalescer.mark_seen(1, 10, 2, message_id=100)
+        await asyncio.sleep(0.05)
+
+        assert _sent(socket) == [("last_seen_message_event", 10)]
+
+    @pytest.mark.asyncio
+    async def test_caps_signals_per_flush(self):
+        coalescer, socket = _coalescer(flush_interval=60, max_per_flush=2)
+        for channel_id in (10, 20, 30):
+            coalescer.mark_seen(1, channel_id, 2, message_id=1)
+        coalescer.typing(1, 40, 2, True)
+
+        await coalescer.flush()
+        assert _sent(socket) == [
+            ("message_typing_event", 40),
+            ("last_seen_message_event", 10),
+        ]
+        assert coalescer.pending == 2
+        assert coalescer._timer is not None
+
+        await coalescer.close()
+        assert [channel_id for _, channel_id in _sent(socket)] == [40, 10, 20, 30]
+        assert coalescer.pending == 0
+        assert coalescer._timer is None
+
+    @pytest.mark.asyncio
+    async def test_typing_is_not_starved_by_last_seen_backlog(self):
+        coalescer, socket = _coalescer(
+            flush_interval=60, typing_interval=0, max_per_flush=4
+        )
+        for channel_id in range(100, 120):
+            coalescer.mark_seen(1, channel_id, 2, message_id=1)
+
+        for flush in range(3):
+            coalescer.typing(1, flush, 2, True)
+            coalescer.typing(1, 50 + flush, 2, True)
+            socket.send_without_ack.reset_mock()
+            await coalescer.flush()
+
+            assert [name for name, _ in _sent(socket)] == [
+                "message_typing_event",
+                "last_seen_message_event",
+                "message_typing_event",
+                "last_seen_message_event",
+            ]
+        assert coalescer.pending == 20 - 6
+        await coalescer.close()
+
+    @pytest.mark.asyncio
+    async def test_send_failures_are_dropped(self):
+        coalescer, socket = _coalescer(flush_interval=60)
+        socket.send_without_ack.side_effect = ConnectionError("closed")
+        coalescer.typing(1, 10, 2, True)
+        await coalescer.flush()
+
+        def no_socket():
+            raise RuntimeError("not connected")
+
+        coalescer.get_socket = no_socket
+        coalescer.mark_seen(1, 10, 2, message_id=1)
+        await coalescer.flush()
+
+        assert coalescer.sent == 0
+        assert coalescer.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_socket_sends_envelope_without_cid(self):
+        socket = Socket.__new__(Socket)
+        socket.adapter = SimpleNamespace(is_open=lambda: True, send=AsyncMock())
+
+        coalescer = SignalCoalescer(lambda: socket)
+        coalescer.typing(1, 10, 2, True)
+        await coalescer.flush()
+
+        envelope = socket.adapter.send.await_args.args[0]
+        assert not envelope.cid
+        assert envelope.message_typing_event.channel_id == 10
+
+        socket.adapter.is_open = lambda: False
+        with pytest.raises(Exception, match="not been established"):
+            await socket.send_without_ack("message_typing_event", Mock())
+
+    @pytest.mark.asyncio
+    async def test_text_channel_helpers_use_client_coalescer(self):
+        signals = Mock()
+        clan = SimpleNamespace(id=1, client=SimpleNamespace(signals=signals))
+        channel = TextChannel(
+            ApiChannelDescription(channel_id=10, type=1, channel_private=0),
+            clan,
+            Mock(),
+            Mock(),
+        )
+
+        channel.mark_seen(100, timestamp_seconds=5)
+        channel.typing()
+
+        signals.mark_seen.assert_called_once_with(
+            clan_id=1, channel_id=10, mode=2, message_id=100, timestamp_seconds=5
+        )
+        signals.typing.assert_called_once_with(
+            clan_id=1, channel_id=10, mode=2, is_public=True
+        )
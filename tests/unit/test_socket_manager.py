@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock
 import pytest
 
 from mezon.managers.event import EventManager
+from mezon.managers.members import ClanMember, ClanMemberIndex
 from mezon.managers.socket import SocketManager
 from mezon.messages.db import MessageDB
 from mezon.models import ApiClanDesc
@@ -60,12 +61,12 @@ class TestSocketManager:
 
     @pytest.mark.asyncio
     async def test_join_all_clans_joins_and_populates_cache(self):
-        clan_cache = {}
+        members = ClanMemberIndex()
+        members.replace([ClanMember(5)])
+        clan_cache = {1: SimpleNamespace(members=members)}
         mezon_client = SimpleNamespace(
             client_id=123,
-            clans=SimpleNamespace(
-                set=lambda key, value: clan_cache.setdefault(key, value)
-            ),
+            clans=SimpleNamespace(set=clan_cache.__setitem__, get=clan_cache.get),
         )
         manager = SocketManager(
             ws_url="socket.example.com",
@@ -86,6 +87,9 @@ class TestSocketManager:
 
         assert manager.socket.join_clan_chat.await_count == 2
         assert set(clan_cache) == {1, 2}
+        assert clan_cache[1].members is members
+        assert clan_cache[1].members.loaded
+        assert not clan_cache[2].members.loaded
 
     @pytest.mark.asyncio
     async def test_write_chat_message_delegates_to_socket(self):
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import time
+from functools import partial
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mezon.api.mezon_api import MezonApi
+from mezon.client import MezonClient
+from mezon.messages.snapshot import (
+    SNAPSHOT_VERSION,
+    StateSnapshot,
+    snapshot_path_for,
+)
+from mezon.models import ApiChannelDescription, ApiClanDesc, ApiClanDescList
+from mezon.structures.clan import Clan
+
+
+def _clan(clan_id=10, clan_name="clan", welcome_channel_id=100):
+    return SimpleNamespace(
+        clan_id=clan_id, clan_name=clan_name, welcome_channel_id=welcome_channel_id
+    )
+
+
+def _channel(channel_id=100, clan_id=10):
+    return ApiChannelDescription(
+        channel_id=channel_id,
+        clan_id=clan_id,
+        channel_label="general",
+        type=1,
+        channel_private=0,
+        last_sent_message=None,
+    )
+
+
+class TestStateSnapshot:
+    def test_default_path_is_next_to_message_db(self):
+        assert snapshot_path_for("./cache/messages.db", 7) == (
+            "./cache/mezon-state-7.json"
+        )
+        assert snapshot_path_for("messages.db", 7) == "./mezon-state-7.json"
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        snapshot = StateSnapshot(str(tmp_path / "state" / "bot.json"))
+
+        snapshot.save(1, [_clan()], [_channel()], {5: 500})
+        loaded = snapshot.load(1)
+
+        assert loaded["clans"] == [
+            {"clan_id": 10, "clan_name": "clan", "welcome_channel_id": 100}
+        ]
+        assert loaded["channels"] == [
+            {
+                "channel_id": 100,
+                "clan_id": 10,
+                "channel_label": "general",
+                "type": 1,
+                "channel_private": 0,
+            }
+        ]
+        assert loaded["dm_channels"] == {5: 500}
+
+    def test_load_rejects_missing_corrupt_foreign_and_stale(self, tmp_path):
+        path = tmp_path / "bot.json"
+        snapshot = StateSnapshot(str(path), max_age_s=60)
+
+        assert snapshot.load(1) is None
+
+        path.write_text("{not json")
+        assert snapshot.load(1) is None
+
+        snapshot.save(1, [], [], None)
+        assert snapshot.load(2) is None
+
+        data = json.loads(path.read_text())
+        data["version"] = SNAPSHOT_VERSION + 1
+        path.write_text(json.dumps(data))
+        assert snapshot.load(1) is None
+
+        data.update(version=SNAPSHOT_VERSION, saved_at=time.time() - 120)
+        path.write_text(json.dumps(data))
+        assert snapshot.load(1) is None
+
+    @pytest.mark.asyncio
+    async def test_async_wrappers(self, tmp_path):
+        snapshot = StateSnapshot(str(tmp_path / "bot.json"))
+
+        await snapshot.save_async(1, [_clan()], [], {})
+
+        assert (await snapshot.load_async(1))["clans"][0]["clan_id"] == 10
+
+
+def _warm_client(tmp_path):
+    client = MezonClient(
+        client_id="1",
+        api_key="key",
+        warm_start=True,
+        snapshot_path=str(tmp_path / "bot.json"),
+        message_db=SimpleNamespace(db_path=str(tmp_path / "messages.db")),
+    )
+    client.api_client = SimpleNamespace()
+
+    async def join_all_clans(clans, token):
+        for desc in clans:
+            client.clans.set(
+                desc.clan_id,
+                Clan(
+                    clan_id=desc.clan_id,
+                    clan_name=desc.clan_name,
+                    welcome_channel_id=desc.welcome_channel_id,
+                    client=client,
+                    api_client=client.api_client,
+                    socket_manager=client.socket_manager,
+                    session_token=token,
+                    message_db=client.message_db,
+                ),
+            )
+
+    client.socket_manager = SimpleNamespace(
+        join_all_clans=AsyncMock(side_effect=join_all_clans),
+        connect=AsyncMock(),
+        connect_socket=AsyncMock(),
+    )
+    client.channel_manager = SimpleNamespace(
+        all_dm_channels=None,
+        get_all_dm_channels=lambda: client.channel_manager.all_dm_channels,
+        init_all_dm_channels=AsyncMock(),
+    )
+    return client
+
+
+class TestClientWarmStart:
+    def test_snapshot_disabled_by_default(self):
+        assert MezonClient(client_id="1", api_key="key").snapshot is None
+
+    @pytest.mark.asyncio
+    async def test_apply_snapshot_restores_clans_channels_and_dms(self, tmp_path):
+        client = _warm_client(tmp_path)
+        client.snapshot.save(1, [_clan(), _clan(0, "", None)], [_channel()], {5: 500})
+
+        await client._apply_snapshot(client.snapshot.load(1), "token")
+
+        clan = client.clans.get(10)
+        assert clan.name == "clan"
+        assert clan._channels_loaded is True
+        assert clan.channels.get(100).name == "general"
+        assert client.channels.get(100) is clan.channels.get(100)
+        assert client.channel_manager.all_dm_channels == {5: 500}
+
+    @pytest.mark.asyncio
+    async def test_save_snapshot_from_live_state(self, tmp_path):
+        client = _warm_client(tmp_path)
+        client.snapshot.save(1, [_clan()], [_channel()], {5: 500})
+        await client._apply_snapshot(client.snapshot.load(1), "token")
+        (tmp_path / "bot.json").unlink()
+
+        await client.save_snapshot()
+
+        loaded = client.snapshot.load(1)
+        assert loaded["clans"][0]["clan_name"] == "clan"
+        assert loaded["channels"][0]["channel_label"] == "general"
+        assert loaded["dm_channels"] == {5: 500}
+
+    @pytest.mark.asyncio
+    async def test_reconcile_updates_state_and_saves(self, tmp_path):
+        client = _warm_client(tmp_path)
+        client.snapshot.save(1, [_clan(), _clan(20, "gone")], [_channel()], {})
+        await client._apply_snapshot(client.snapshot.load(1), "token")
+        client.api_client.list_clans_descs = AsyncMock(
+            return_value=ApiClanDescList(
+                clandesc=[
+                    ApiClanDesc(clan_id=10, clan_name="renamed"),
+                    ApiClanDesc(clan_id=30, clan_name="new"),
+                ]
+            )
+        )
+        client.api_client.list_channel_descs = AsyncMock(
+            return_value=SimpleNamespace(channeldesc=[_channel(101)])
+        )
+        client.api_client.iter_channel_descs = partial(
+            MezonApi.iter_channel_descs, client.api_client
+        )
+
+        await client._reconcile_snapshot("token")
+
+        assert client.clans.get(10).name == "renamed"
+        assert client.clans.get(20) is None
+        assert client.clans.get(30).name == "new"
+        assert client.clans.get(10).channels.get(101) is not None
+        client.channel_manager.init_all_dm_channels.assert_awaited_once_with("token")
+        saved_ids = {c["clan_id"] for c in client.snapshot.load(1)["clans"]}
+        assert saved_ids == {0, 10, 30}
+
+    @pytest.mark.asyncio
+    async def test_reconcile_failure_is_logged(self, tmp_path):
+        client = _warm_client(tmp_path)
+        client.api_client.list_clans_descs = AsyncMock(side_effect=RuntimeError("down"))
+
+        await client._reconcile_snapshot("token")
+
+        assert not (tmp_path / "bot.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_initialize_managers_serves_from_snapshot(self, tmp_path):
+        client = _warm_client(tmp_path)
+        client.snapshot.save(1, [_clan()], [_channel()], {5: 500})
+        del client.socket_manager, client.channel_manager
+        sock_session = SimpleNamespace(
+            api_url="https://api.example.com",
+            ws_url="wss://socket.example.com",
+            token="token",
+        )
+        reconciled = asyncio.Event()
+
+        with (
+            patch("mezon.client.SocketManager") as socket_manager_cls,
+            patch("mezon.client.ChannelManager") as channel_manager_cls,
+            patch("mezon.client.SessionManager"),
+            patch.object(
+                client,
+                "_reconcile_snapshot",
+                AsyncMock(side_effect=lambda token: reconciled.set()),
+            ),
+        ):
+            socket_manager = socket_manager_cls.return_value
+            socket_manager.connect = AsyncMock()
+            socket_manager.connect_socket = AsyncMock()
+            socket_manager.join_all_clans = AsyncMock()
+            channel_manager = channel_manager_cls.return_value
+            channel_manager.load_dm_channels = AsyncMock()
+
+            await client.initialize_managers(sock_session)
+            await asyncio.wait_for(reconciled.wait(), 1)
+
+        socket_manager.connect.assert_awaited_once_with(sock_session)
+        socket_manager.connect_socket.assert_not_awaited()
+        channel_manager.load_dm_channels.assert_not_awaited()
+        socket_manager.join_all_clans.assert_awaited_once()
+        assert channel_manager.all_dm_channels == {5: 500}
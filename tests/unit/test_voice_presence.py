@@ -0,0 +1,246 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from mezon.client import MezonClient
+from mezon.constants import ChannelType
+from mezon.managers.voice import VoicePresenceTracker
+from mezon.models import ApiVoiceChannelUser
+from mezon.protobuf.rtapi import realtime_pb2
+
+
+def _fetcher(pages, gate=None):
+    """Fake paginated fetch over the voice users listed per clan."""
+    calls = []
+
+    async def fetch(clan_id):
+        calls.append(clan_id)
+        if gate is not None:
+            await gate.wait()
+        result = pages[clan_id]
+        if isinstance(result, Exception):
+            raise result
+        for voice_user in result:
+            yield voice_user
+
+    fetch.calls = calls
+    return fetch
+
+
+def _voice_user(channel_id, user_id, session_id=None):
+    return ApiVoiceChannelUser(id=session_id, channel_id=channel_id, user_id=user_id)
+
+
+class TestVoicePresenceTracker:
+    def test_join_leave_and_end(self):
+        tracker = VoicePresenceTracker(_fetcher({}))
+        tracker.join(1, 10, 100, "s1")
+        tracker.join(1, 10, 101)
+        tracker.join(1, 11, 100, "s2")
+        tracker.join(1, 10, 102, "s3")
+        tracker.leave(1, 10, 102, "s3")
+        in_ten = tracker.users_in(10)
+
+        assert tracker.users_in(10) == {100, 101}
+        assert tracker.channels_of(100) == {10, 11}
+        assert tracker.active_channels(1) == {10, 11}
+
+        tracker.leave(1, 10, 999, "s1")
+        assert tracker.users_in(10) == {101}
+        assert tracker.channels_of(100) == {11}
+        assert in_ten == {100, 101}
+
+        tracker.join(1, 10, 103, "s4")
+        tracker.end_channel(1, 11)
+        assert tracker.channels_of(100) == frozenset()
+        assert set(tracker._sessions) == {"s4"}
+        assert tracker.users_in(10) == {101, 103}
+        assert tracker.active_channels(1) == {10}
+        assert tracker.users_in(42) == frozenset()
+
+    @pytest.mark.asyncio
+    async def test_seed_once_and_reconcile_corrections(self):
+        pages = {1: [_voice_user(10, 100), _voice_user(10, 101), _voice_user(0, 5)]}
+        fetch = _fetcher(pages)
+        tracker = VoicePresenceTracker(fetch)
+
+        await asyncio.gather(tracker.ensure_seeded(1), tracker.ensure_seeded(1))
+        await tracker.ensure_seeded(1)
+
+        assert fetch.calls == [1]
+        assert tracker.seeded_clans == {1}
+        assert tracker.users_in(10) == {100, 101}
+
+        tracker.leave(1, 10, 101)
+        pages[1] = [_voice_user(10, 100), _voice_user(12, 102)]
+        assert await tracker.reconcile() == 1
+        assert tracker.users_in(12) == {102}
+        assert tracker.corrections == 1
+
+        pages[1] = RuntimeError("down")
+        assert await tracker.reconcile() == 0
+        assert tracker.users_in(10) == {100}
+
+        tracker.forget_clan(1)
+        assert tracker.seeded_clans == set()
+        assert tracker.channels_of(100) == frozenset()
+
+    @pytest.mark.asyncio
+    async def test_events_during_a_fetch_are_kept(self):
+        gate = asyncio.Event()
+        pages = {1: [_voice_user(10, 100), _voice_user(10, 101)]}
+        tracker = VoicePresenceTracker(_fetcher(pages, gate))
+        tracker.replace_clan(1, pages[1])
+
+        reconciling = asyncio.create_task(tracker.reconcile())
+        await asyncio.sleep(0)
+        tracker.join(1, 11, 102)
+        tracker.leave(1, 10, 100)
+        tracker.end_channel(2, 20)
+        gate.set()
+
+        assert await reconciling == 0
+        assert tracker.users_in(10) == {101}
+        assert tracker.users_in(11) == {102}
+        assert tracker.corrections == 0
+
+    @pytest.mark.asyncio
+    async def test_request_seed_runs_in_background_and_backs_off(self):
+        gate = asyncio.Event()
+        pages = {1: RuntimeError("forbidden"), 2: [_voice_user(20, 200)]}
+        fetch = _fetcher(pages, gate)
+        tracker = VoicePresenceTracker(fetch, seed_retry_delay=60)
+
+        tracker.request_seed(1)
+        tracker.request_seed(1)
+        tracker.request_seed(2)
+        tracker.request_seed(0)
+        assert fetch.calls == []
+
+        gate.set()
+        await asyncio.gather(*tracker._seeding.values(), return_exceptions=True)
+        tracker.request_seed(1)
+        tracker.request_seed(2)
+        await asyncio.sleep(0)
+
+        assert sorted(fetch.calls) == [1, 2]
+        assert tracker.seeded_clans == {2}
+        assert tracker.users_in(20) == {200}
+
+        tracker.seed_retry_delay = 0
+        tracker.request_seed(1)
+        await asyncio.gather(*tracker._seeding.values(), return_exceptions=True)
+        assert fetch.calls.count(1) == 2
+
+    @pytest.mark.asyncio
+    async def test_reconcile_loop(self):
+        tracker = VoicePresenceTracker(_fetcher({}), reconcile_interval=0.01)
+        tracker.reconcile = AsyncMock(return_value=0)
+
+        tracker.start()
+        await asyncio.sleep(0.05)
+        await tracker.stop()
+
+        assert tracker.reconcile.await_count >= 2
+        assert tracker._task is None
+
+        disabled = VoicePresenceTracker(_fetcher({}), reconcile_interval=None)
+        disabled.start()
+        assert disabled._task is None
+
+
+class TestClientVoiceEvents:
+    @pytest.mark.asyncio
+    async def test_tracker_is_opt_in(self):
+        client = MezonClient(client_id="100", api_key="key")
+
+        await client._handle_voice_joined_default(
+            realtime_pb2.VoiceJoinedEvent(clan_id=1, voice_channel_id=11, user_id=8)
+        )
+
+        assert client.voice_presence is None
+
+    @pytest.mark.asyncio
+    async def test_events_update_presence_and_seed_in_background(self):
+        client = MezonClient(client_id="100", api_key="key", voice_presence=True)
+        gate = asyncio.Event()
+        pages = {
+            ChannelType.CHANNEL_TYPE_GMEET_VOICE: [_voice_user(10, 7)],
+            ChannelType.CHANNEL_TYPE_MEZON_VOICE: [],
+        }
+        clan = SimpleNamespace(
+            iter_channel_voice_users=Mock(
+                side_effect=lambda channel_type: _fetcher(pages, gate)(channel_type)
+            )
+        )
+        client.clans.set(1, clan)
+        presence = client.voice_presence
+
+        await client._handle_voice_started_default(
+            realtime_pb2.VoiceStartedEvent(id="a", clan_id=1, voice_channel_id=11)
+        )
+        await client._handle_voice_joined_default(
+            realtime_pb2.VoiceJoinedEvent(
+                id="s8", clan_id=1, voice_channel_id=11, user_id=8
+            )
+        )
+        assert presence.users_in(11) == {8}
+        assert presence.seeded_clans == set()
+
+        gate.set()
+        await asyncio.gather(*presence._seeding.values())
+        assert presence.users_in(10) == {7}
+        assert presence.users_in(11) == {8}
+
+        await client._handle_voice_leaved_default(
+            realtime_pb2.VoiceLeavedEvent(
+                id="s8", clan_id=1, voice_channel_id=11, voice_user_id=0
+            )
+        )
+        await client._handle_voice_ended_default(
+            realtime_pb2.VoiceEndedEvent(id=1, clan_id=1, voice_channel_id="10")
+        )
+        assert presence.channels_of(7) == frozenset()
+        assert presence.channels_of(8) == frozenset()
+        assert clan.iter_channel_voice_users.call_count == 2
+
+        await client._handle_voice_joined_default(
+            realtime_pb2.VoiceJoinedEvent(clan_id=2, voice_channel_id=20, user_id=9)
+        )
+        await asyncio.gather(*presence._seeding.values(), return_exceptions=True)
+        assert presence.users_in(20) == {9}
+        assert 2 not in presence.seeded_clans
+
+        client._forget_clan(1)
+        await presence.stop()
+        assert presence.active_channels(1) == frozenset()
+
+    @pytest.mark.asyncio
+    async def test_reconcile_keeps_native_voice_channels(self):
+        client = MezonClient(client_id="100", api_key="key", voice_presence=True)
+        pages = {
+            ChannelType.CHANNEL_TYPE_GMEET_VOICE: [_voice_user(10, 7)],
+            ChannelType.CHANNEL_TYPE_MEZON_VOICE: [],
+        }
+        clan = SimpleNamespace(
+            iter_channel_voice_users=Mock(
+                side_effect=lambda channel_type: _fetcher(pages)(channel_type)
+            )
+        )
+        client.clans.set(1, clan)
+        presence = client.voice_presence
+        await presence.ensure_seeded(1)
+
+        await client._handle_voice_joined_default(
+            realtime_pb2.VoiceJoinedEvent(
+                id="s8", clan_id=1, voice_channel_id=30, user_id=8
+            )
+        )
+        pages[ChannelType.CHANNEL_TYPE_MEZON_VOICE] = [_voice_user(30, 8)]
+
+        assert await presence.reconcile() == 0
+        assert presence.users_in(10) == {7}
+        assert presence.users_in(30) == {8}
+        assert presence.corrections == 0
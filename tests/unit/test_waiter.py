@@ -0,0 +1,120 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from mezon.client import MezonClient
+from mezon.constants import Events
+from mezon.managers.event import EventManager
+from mezon.managers.waiter import WaiterManager
+
+
+def message(channel_id=1, sender_id=2, text="yes"):
+    return SimpleNamespace(
+        channel_id=channel_id, sender_id=sender_id, content={"t": text}
+    )
+
+
+class TestWaiterManager:
+    @pytest.mark.asyncio
+    async def test_resolves_only_matching_buckets(self):
+        waiters = WaiterManager()
+        exact = asyncio.create_task(
+            waiters.wait_for(Events.CHANNEL_MESSAGE, channel_id=1, user_id=2)
+        )
+        other_channel = asyncio.create_task(
+            waiters.wait_for("channel_message", channel_id=9)
+        )
+        by_user = asyncio.create_task(waiters.wait_for("channel_message", user_id=2))
+        await asyncio.sleep(0)
+        assert len(waiters) == 3
+
+        payload = message()
+        assert waiters.dispatch(Events.CHANNEL_MESSAGE, payload) == 2
+
+        assert await exact is payload
+        assert await by_user is payload
+        assert not other_channel.done()
+        other_channel.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await other_channel
+        assert len(waiters) == 0
+
+    @pytest.mark.asyncio
+    async def test_predicate_filters_and_errors_do_not_match(self):
+        waiters = WaiterManager()
+
+        def broken(payload):
+            raise ValueError("bad predicate")
+
+        answer = asyncio.create_task(
+            waiters.wait_for(
+                "channel_message", lambda m: m.content["t"] in ("yes", "no")
+            )
+        )
+        faulty = asyncio.create_task(waiters.wait_for("channel_message", broken))
+        await asyncio.sleep(0)
+
+        waiters.dispatch("channel_message", message(text="maybe"))
+        assert not answer.done()
+        waiters.dispatch("channel_message", message(text="no"))
+
+        assert (await answer).content["t"] == "no"
+        assert not faulty.done()
+        waiters.cancel_all()
+        with pytest.raises(asyncio.CancelledError):
+            await faulty
+
+    @pytest.mark.asyncio
+    async def test_timeouts_share_one_timer(self):
+        waiters = WaiterManager()
+        late = asyncio.create_task(waiters.wait_for("x", timeout=0.2))
+        early = asyncio.create_task(waiters.wait_for("x", timeout=0.01))
+        await asyncio.sleep(0)
+        timer = waiters._timer
+        assert waiters._timer_deadline == waiters._deadlines[0][0]
+
+        with pytest.raises(asyncio.TimeoutError):
+            await early
+        assert timer.cancelled() or waiters._timer is not timer
+
+        waiters.dispatch("x", SimpleNamespace())
+        assert await late is not None
+        await asyncio.sleep(0)
+        assert waiters._timer is None
+        assert len(waiters) == 0
+
+
+class TestEventManagerWaiters:
+    @pytest.mark.asyncio
+    async def test_emit_resolves_waiters_without_handlers_and_after_defaults(self):
+        manager = EventManager()
+        order = []
+
+        async def default_handler(payload):
+            order.append("default")
+
+        default_handler._is_default_handler = True
+        manager.on("with_handlers", default_handler)
+
+        no_handlers = asyncio.create_task(manager.waiters.wait_for("plain"))
+        with_handlers = asyncio.create_task(
+            manager.waiters.wait_for(
+                "with_handlers", lambda p: order.append("waiter") or True
+            )
+        )
+        await asyncio.sleep(0)
+
+        await manager.emit("plain", "payload")
+        await manager.emit("with_handlers", "payload")
+
+        assert await no_handlers == "payload"
+        assert await with_handlers == "payload"
+        assert order == ["default", "waiter"]
+
+    @pytest.mark.asyncio
+    async def test_client_wait_for_times_out(self):
+        client = MezonClient(client_id="1", api_key="key")
+
+        with pytest.raises(asyncio.TimeoutError):
+            await client.wait_for(Events.CHANNEL_MESSAGE, channel_id=1, timeout=0.01)
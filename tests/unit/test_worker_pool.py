@@ -0,0 +1,230 @@
+import asyncio
+import queue
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from mezon.client import MezonClient
+from mezon.managers.worker import WorkerContext, WorkerPool, _run_worker
+from mezon.protobuf.rtapi import realtime_pb2
+from mezon.socket.default_socket import Socket
+
+
+def make_message_bytes(channel_id: int = 1, content: str = "hi") -> bytes:
+    envelope = realtime_pb2.Envelope()
+    envelope.channel_message.channel_id = channel_id
+    envelope.channel_message.message_id = 7
+    envelope.channel_message.content = content
+    return envelope.SerializeToString()
+
+
+async def reply_handler(message, ctx):
+    await ctx.write_chat_message(channel_id=message.channel_id, content="pong")
+
+
+def failing_handler(message, ctx):
+    raise ValueError("boom")
+
+
+class MessageStream:
+    def __init__(self, messages):
+        self._messages = iter(messages)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._messages)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class ListAdapter:
+    def __init__(self, messages):
+        self._socket = MessageStream(messages)
+
+
+class TestSocketForwarder:
+    @pytest.mark.asyncio
+    async def test_listen_forwards_raw_event_bytes(self):
+        raw = make_message_bytes()
+        socket = Socket("example.com", adapter=ListAdapter([raw]))
+        socket.event_manager = None
+        forwarded = []
+        socket.envelope_forwarder = lambda name, data: forwarded.append((name, data))
+
+        await socket._listen()
+
+        assert forwarded == [("channel_message", raw)]
+
+    @pytest.mark.asyncio
+    async def test_forwarder_errors_do_not_stop_listening(self):
+        socket = Socket("example.com", adapter=ListAdapter([make_message_bytes()]))
+        socket.event_manager = None
+        socket.envelope_forwarder = MagicMock(side_effect=RuntimeError("full"))
+
+        await socket._listen()
+
+        socket.envelope_forwarder.assert_called_once()
+
+
+class TestWorkerRuntime:
+    @pytest.mark.asyncio
+    async def test_worker_decodes_and_calls_back_through_context(self):
+        inbound, outbound, results = queue.Queue(), queue.Queue(), queue.Queue()
+        inbound.put(make_message_bytes(channel_id=42))
+
+        async def answer_requests():
+            worker_id, request_id, action, kwargs = await asyncio.to_thread(
+                outbound.get
+            )
+            results.put((request_id, True, {"action": action, **kwargs}))
+            inbound.put(None)
+            return worker_id, action, kwargs
+
+        server = asyncio.create_task(answer_requests())
+        await asyncio.wait_for(
+            _run_worker(
+                0,
+                {"channel_message": [reply_handler, failing_handler]},
+                inbound,
+                outbound,
+                results,
+            ),
+            timeout=5,
+        )
+
+        assert await server == (
+            0,
+            "write_chat_message",
+            {"channel_id": 42, "content": "pong"},
+        )
+
+    @pytest.mark.asyncio
+    async def test_context_rejects_unknown_action_and_propagates_errors(self):
+        outbound, results = queue.Queue(), queue.Queue()
+        context = WorkerContext(0, outbound, results)
+        context.start(asyncio.get_running_loop())
+
+        with pytest.raises(ValueError):
+            await context.call("logout")
+
+        call = asyncio.create_task(context.remove_chat_message(message_id=1))
+        _, request_id, _, _ = await asyncio.to_thread(outbound.get)
+        results.put((request_id, False, "denied"))
+        with pytest.raises(Exception, match="denied"):
+            await asyncio.wait_for(call, timeout=5)
+        context.stop()
+
+    @pytest.mark.asyncio
+    async def test_context_times_out_and_fails_calls_when_reader_stops(self):
+        outbound, results = queue.Queue(), queue.Queue()
+        context = WorkerContext(0, outbound, results)
+        context.start(asyncio.get_running_loop())
+
+        with pytest.raises(TimeoutError):
+            await context.call("remove_chat_message", timeout=0.01, message_id=1)
+        assert context._pending == {}
+
+        call = asyncio.create_task(context.remove_chat_message(message_id=2))
+        await asyncio.to_thread(outbound.get)
+        await asyncio.to_thread(outbound.get)
+        context.stop()
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(call, timeout=5)
+        assert context._pending == {}
+        with pytest.raises(ConnectionError):
+            await context.remove_chat_message(message_id=3)
+
+
+class TestWorkerPool:
+    def test_normalizes_handlers_and_ignores_unselected_events(self):
+        pool = WorkerPool(
+            SimpleNamespace(), {"channel_message": reply_handler}, processes=1
+        )
+        pool._inbound = queue.Queue()
+        pool._workers = [object()]
+
+        pool.forward("message_reaction_event", b"x")
+        pool.forward("channel_message", b"y")
+
+        assert pool.handlers == {"channel_message": [reply_handler]}
+        assert pool.events == frozenset({"channel_message"})
+        assert pool._inbound.get_nowait() == b"y"
+        assert pool.forwarded_count == 1
+
+    @pytest.mark.asyncio
+    async def test_execute_runs_whitelisted_socket_actions(self):
+        socket_manager = SimpleNamespace(
+            write_chat_message=AsyncMock(return_value="ack"),
+            logout=AsyncMock(),
+        )
+        pool = WorkerPool(socket_manager, {"channel_message": reply_handler})
+        pool._results = [queue.Queue()]
+
+        await pool._execute(0, 1, "write_chat_message", {"channel_id": 1})
+        await pool._execute(0, 2, "logout", {})
+
+        assert pool._results[0].get_nowait() == (1, True, "ack")
+        assert pool._results[0].get_nowait()[:2] == (2, False)
+        socket_manager.logout.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_spawned_workers_round_trip(self):
+        socket_manager = SimpleNamespace(
+            write_chat_message=AsyncMock(return_value={"ok": True})
+        )
+        pool = WorkerPool(
+            socket_manager, {"channel_message": reply_handler}, processes=2
+        )
+        pool.start()
+        try:
+            for channel_id in (1, 2, 3):
+                pool.forward("channel_message", make_message_bytes(channel_id))
+
+            for _ in range(300):
+                if socket_manager.write_chat_message.await_count == 3:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await pool.stop()
+
+        channel_ids = sorted(
+            call.kwargs["channel_id"]
+            for call in socket_manager.write_chat_message.await_args_list
+        )
+        assert channel_ids == [1, 2, 3]
+        assert not pool.is_running
+
+
+class TestClientWorkerPool:
+    @pytest.mark.asyncio
+    async def test_start_requires_login(self):
+        client = MezonClient(client_id="1", api_key="key", enable_logging=False)
+
+        with pytest.raises(RuntimeError):
+            await client.start_worker_pool({"channel_message": reply_handler})
+
+    @pytest.mark.asyncio
+    async def test_start_attaches_forwarder_and_stop_detaches(self):
+        client = MezonClient(client_id="1", api_key="key", enable_logging=False)
+        socket = SimpleNamespace(envelope_forwarder=None)
+        client.socket_manager = SimpleNamespace(get_socket=lambda: socket)
+
+        with (
+            patch.object(WorkerPool, "start") as start,
+            patch.object(WorkerPool, "stop", AsyncMock()) as stop,
+        ):
+            pool = await client.start_worker_pool(
+                {"channel_message": reply_handler}, processes=2
+            )
+            assert socket.envelope_forwarder == pool.forward
+            start.assert_called_once()
+
+            await client.stop_worker_pool()
+
+        stop.assert_awaited_once()
+        assert socket.envelope_forwarder is None
+        assert client.worker_pool is None